@@ -0,0 +1,249 @@
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import memory_report
+from game_engine import GameEngine
+from output_sink import PlainTextSink, TerminalSink
+from world_constants import START_PLACE
+from world_generator import generate_world
+from world_snapshot import compile_file, snapshot_path_for
+from world_template import WorldTemplate
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    """Resume tempos em segundos como taxa e latências em microssegundos."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "ops_per_s": round(len(ordered) / total, 1) if total else 0.0,
+        "mean_us": round(total / len(ordered) * 1e6, 3),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 3),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6, 3),
+    }
+
+
+def _timed(func: Callable[[], object], number: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+def _new_engine(template: WorldTemplate) -> GameEngine:
+    return GameEngine(template, sink=PlainTextSink(io.StringIO()))
+
+
+def bench_load(world_path: str, number: int) -> Dict[str, Dict[str, float]]:
+    """Tempo de leitura do JSON, de compilação do snapshot e de abertura do snapshot.
+
+    Mede sobre uma cópia do arquivo em um diretório temporário, para não deixar um .wsnap ao lado do
+    world.json do usuário.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        source = shutil.copy(world_path, os.path.join(directory, "world.json"))
+        snapshot_path = os.path.join(directory, "compiled.wsnap")
+        results = {
+            "json": _timed(lambda: WorldTemplate.load(source), number),
+            "compile_snapshot": _timed(lambda: compile_file(source, snapshot_path), number),
+        }
+        os.replace(snapshot_path, snapshot_path_for(source))
+        results["open_snapshot"] = _timed(lambda: WorldTemplate.load_compiled(source), number)
+    return results
+
+
+def bench_sessions(template: WorldTemplate, number: int) -> Dict[str, float]:
+    """Custo de criar uma sessão sobre um template já carregado e iniciar o jogador."""
+    return _timed(lambda: _new_engine(template).start("Benchmark"), number)
+
+
+def _scenarios(template: WorldTemplate) -> Dict[str, List[Tuple[str, str]]]:
+    """Sequências de comandos repetidas para medir cada verbo; os pares deixam o estado como estava."""
+    start = template.places[START_PLACE]
+    scenarios = {
+        "olhar": [("olhar", "olhar")],
+        "inventario": [("inventario", "inventario")],
+        "status": [("status", "status")],
+        "ajuda": [("ajuda", "ajuda")],
+        "desconhecido": [("desconhecido", "dançar")],
+    }
+    weapon = next((item for item in start.items.values() if item.pickable), None)
+    if weapon is not None:
+        scenarios["pegar"] = [("pegar", f"pegar {weapon.name}"), ("largar", f"largar {weapon.name}")]
+        scenarios["usar"] = [("pegar", f"pegar {weapon.name}"), ("usar", f"usar {weapon.name}"),
+                             ("largar", f"largar {weapon.name}")]
+        scenarios["encadeado"] = [("encadeado", f"pegar {weapon.name}; usar {weapon.name}; largar {weapon.name}")]
+    if start.characters:
+        scenarios["falar com"] = [("falar com", f"falar com {next(iter(start.characters))}")]
+    neighbor = next((name for name in start.takes_to
+                     if name in template.places and START_PLACE in template.places[name].takes_to), None)
+    if neighbor is not None:
+        scenarios["ir para"] = [("ir para", f"ir para {neighbor}"), ("ir para", f"ir para {START_PLACE}")]
+    graph = template.graph
+    far = graph.names[-1]
+    if far != START_PLACE and graph.shortest_path(START_PLACE, far) and graph.shortest_path(far, START_PLACE):
+        scenarios["viajar para"] = [("viajar para", f"viajar para {far}"),
+                                    ("viajar para", f"viajar para {START_PLACE}")]
+    return scenarios
+
+
+def bench_commands(template: WorldTemplate, number: int) -> Dict[str, Dict[str, float]]:
+    """Latência de step() por verbo, sem renderização."""
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for scenario in _scenarios(template).values():
+        engine = _new_engine(template)
+        engine.start("Benchmark")
+        for _ in range(number):
+            for label, command in scenario:
+                started = time.perf_counter()
+                result = engine.step(command)
+                samples.setdefault(label, []).append(time.perf_counter() - started)
+                if not result.ok and label != "desconhecido":
+                    errors[label] = errors.get(label, 0) + 1
+    results = {label: _summary(values) for label, values in samples.items()}
+    for label, count in errors.items():
+        results[label]["errors"] = count
+    return results
+
+
+def bench_render(template: WorldTemplate, number: int) -> Dict[str, Dict[str, float]]:
+    """Custo de montar a descrição do lugar e de formatar um resultado para cada tipo de saída."""
+    engine = _new_engine(template)
+    engine.start("Benchmark")
+    place = engine.current_place
+    result = engine.step("olhar")
+
+    def describe() -> None:
+        place.invalidate()
+        place.get_full_description()
+
+    def render(sink) -> Callable[[], None]:
+        def write() -> None:
+            sink.write_result(result)
+            sink.flush()
+            sink.stream.seek(0)
+            sink.stream.truncate()
+        return write
+
+    return {
+        "describe_uncached": _timed(describe, number),
+        "describe_cached": _timed(place.get_full_description, number),
+        "plain": _timed(render(PlainTextSink(io.StringIO())), number),
+        "terminal": _timed(render(TerminalSink(io.StringIO())), number),
+        "actions": _timed(engine.render_available_actions, number),
+    }
+
+
+def peak_rss() -> Optional[int]:
+    """Maior uso de memória residente do processo, em bytes (None onde resource não existe)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _commit() -> Optional[str]:
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def run(world_path: str, number: int, meta: Dict) -> Dict:
+    """Executa todas as medições sobre o mundo do arquivo e retorna o relatório."""
+    template = WorldTemplate.load(world_path)
+    return {
+        "meta": dict(meta, commit=_commit(), python=platform.python_version(), platform=platform.platform(),
+                     timestamp=time.time(), world=world_path, places=len(template.places),
+                     items=len(template.items), npcs=len(template.npcs), number=number),
+        "load": bench_load(world_path, max(number // 100, 3)),
+        "session": bench_sessions(template, number),
+        "commands": bench_commands(template, number),
+        "render": bench_render(template, number),
+        "bytes_per_object": memory_report.report(2000),
+        "peak_rss_bytes": peak_rss(),
+    }
+
+
+def _flatten(data: Dict, prefix: str = "") -> Dict[str, float]:
+    values = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(_flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+
+def compare(previous: Dict, current: Dict) -> List[str]:
+    """Linhas com a variação de cada métrica de latência, memória e carga entre dois relatórios."""
+    old, new = _flatten(previous), _flatten(current)
+    lines = []
+    for path in sorted(new):
+        if path.startswith("meta.") or path not in old or not old[path]:
+            continue
+        if not path.endswith(("mean_us", "p50_us", "p99_us", "bytes")) and path.split(".")[0] != "bytes_per_object":
+            continue
+        change = (new[path] - old[path]) / old[path] * 100
+        lines.append(f"{path:<45} {old[path]:>14.3f} -> {new[path]:>14.3f} ({change:+.1f}%)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark reproduzível do motor do jogo.")
+    parser.add_argument("--world", help="world.json a medir (padrão: gera um mundo sintético)")
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--npcs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--number", type=int, default=1000, help="repetições por medição")
+    parser.add_argument("-o", "--output", help="arquivo JSON do relatório (padrão: stdout)")
+    parser.add_argument("--compare", help="relatório anterior para comparar")
+    args = parser.parse_args()
+
+    meta = {"seed": args.seed}
+    with tempfile.TemporaryDirectory() as directory:
+        world_path = args.world
+        if world_path is None:
+            world_path = os.path.join(directory, "world.json")
+            with open(world_path, "w", encoding="utf8") as f:
+                json.dump(generate_world(args.places, args.fanout, args.items, args.npcs, seed=args.seed), f)
+            meta["generated"] = {"places": args.places, "fanout": args.fanout, "items": args.items, "npcs": args.npcs}
+        report = run(world_path, args.number, meta)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf8") as f:
+            previous = json.load(f)
+        print("\n".join(compare(previous, report)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
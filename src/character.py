@@ -1,17 +1,25 @@
-from game_object import GameObject
+from game_object import GameObject, intern_name
 from item import Item
+from name_index import NameIndex
 
 class Character(GameObject):
+    __slots__ = ("location", "character_type", "inventory")
+
     def __init__(self, name: str, description: str, location: str = None, character_type: str = "NPC"):
         if not name:
             raise ValueError("O nome do personagem não pode estar vazio.")
         if not description:
             raise ValueError("A descrição do personagem não pode estar vazia.")
         super().__init__(name, description)
-        self.location = location
-        self.character_type = character_type
+        self.location = intern_name(location)
+        self.character_type = intern_name(character_type)
         self.inventory = {}
 
+    def clone(self):
+        character = super().clone()
+        character.inventory = dict(self.inventory)
+        return character
+
     def speak(self):
         return "Olá!"
 
@@ -19,15 +27,42 @@ class Character(GameObject):
         return self.location
 
     def set_location(self, new_location: str):
-        self.location = new_location
+        self.location = intern_name(new_location)
 
 class Player(Character):
+    # Textos de inventário e status ficam em cache até que o estado que os gerou mude
+    __slots__ = (
+        "health", "max_health", "equipped_weapon", "equipped_armor", "inventory_index",
+        "inventory_version", "_inventory_cache", "_status_cache",
+    )
+
     def __init__(self, name: str, description: str = "Um aventureiro corajoso", location: str = "Floresta"):
         super().__init__(name, description, location, "player")
         self.health = 100
         self.max_health = 100
         self.equipped_weapon = None
         self.equipped_armor = None
+        self.inventory_index = NameIndex()
+        self.inventory_version = 0
+        self._inventory_cache: str = None
+        self._status_cache: tuple = None
+
+    def clone(self):
+        player = super().clone()
+        player.inventory_index = self.inventory_index.copy()
+        return player
+
+    def find_item(self, name: str) -> str:
+        """Retorna o nome original de um item do inventário, tolerando acentos, nomes parciais e erros de digitação."""
+        return self.inventory_index.resolve(name)
+
+    def suggest_items(self, name: str) -> list[str]:
+        return self.inventory_index.suggestions(name)
+
+    def invalidate_inventory(self) -> None:
+        """Marca o inventário como alterado, descartando o texto em cache."""
+        self.inventory_version += 1
+        self._inventory_cache = None
 
     def pick_up_item(self, item: Item) -> str:
         if not item.pickable:
@@ -39,8 +74,16 @@ class Player(Character):
         result = item.pick_item()
         if "pegou" in result:
             self.inventory[item.name] = item
+            self.inventory_index.add(item.name)
+            self.invalidate_inventory()
         return result
 
+    def add_to_inventory(self, item: Item) -> None:
+        """Coloca um item no inventário sem as regras de pegar (usado ao restaurar uma sessão)."""
+        self.inventory[item.name] = item
+        self.inventory_index.add(item.name)
+        self.invalidate_inventory()
+
     def drop_item(self, item_name: str) -> str:
         if item_name not in self.inventory:
             return f"Você não está carregando {item_name}."
@@ -49,6 +92,8 @@ class Player(Character):
         result = item.drop()
         if "largou" in result:
             del self.inventory[item_name]
+            self.inventory_index.remove(item_name)
+            self.invalidate_inventory()
             if self.equipped_weapon == item:
                 self.equipped_weapon = None
             if self.equipped_armor == item:
@@ -59,10 +104,11 @@ class Player(Character):
         if not self.inventory:
             return "Seu inventário está vazio."
         
-        inventory_text = "Seu inventário:\n"
-        for item_name, item in self.inventory.items():
-            inventory_text += f"- {item_name}: {item.description}\n"
-        return inventory_text
+        if self._inventory_cache is None:
+            lines = ["Seu inventário:\n"]
+            lines.extend(f"- {item_name}: {item.description}\n" for item_name, item in self.inventory.items())
+            self._inventory_cache = "".join(lines)
+        return self._inventory_cache
 
     def use_item(self, item_name: str) -> str:
         if item_name not in self.inventory:
@@ -81,15 +127,22 @@ class Player(Character):
         return result
 
     def get_status(self) -> str:
-        status = f"Status de {self.name}:\n"
-        status += f"Vida: {self.health}/{self.max_health}\n"
+        key = (self.health, self.max_health, self.equipped_weapon, self.equipped_armor)
+        if self._status_cache is not None and self._status_cache[0] == key:
+            return self._status_cache[1]
+        
+        lines = [f"Status de {self.name}:\n", f"Vida: {self.health}/{self.max_health}\n"]
         if self.equipped_weapon:
-            status += f"Arma equipada: {self.equipped_weapon.name}\n"
+            lines.append(f"Arma equipada: {self.equipped_weapon.name}\n")
         if self.equipped_armor:
-            status += f"Armadura equipada: {self.equipped_armor.name}\n"
+            lines.append(f"Armadura equipada: {self.equipped_armor.name}\n")
+        status = "".join(lines)
+        self._status_cache = (key, status)
         return status
 
 class NPC(Character):
+    __slots__ = ("dialog", "current_dialog_index")
+
     def __init__(self, name: str, description: str, location: str, dialog: list[str] = None):
         super().__init__(name, description, location, "NPC")
         self.dialog = dialog or ["Olá, aventureiro!"]
@@ -0,0 +1,118 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Marca um nó da trie cujos descendentes levam a mais de um comando
+AMBIGUOUS = object()
+
+
+class Command:
+    """Um verbo registrado: nome canônico, handler, sinônimos e texto de ajuda."""
+
+    __slots__ = ("name", "handler", "takes_argument", "aliases", "usage", "help_text")
+
+    def __init__(self, name: str, handler: Callable, takes_argument: bool = False,
+                 aliases: Tuple[str, ...] = (), usage: Optional[str] = None, help_text: Optional[str] = None) -> None:
+        self.name = name
+        self.handler = handler
+        self.takes_argument = takes_argument
+        self.aliases = aliases
+        self.usage = usage or name
+        self.help_text = help_text
+
+
+class _TrieNode:
+    __slots__ = ("children", "command", "unique")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Comando que termina exatamente neste nó
+        self.command: Optional[Command] = None
+        # Único comando alcançável a partir deste nó, ou AMBIGUOUS
+        self.unique = None
+
+
+class CommandParser:
+    """Tabela de comandos compilada em uma trie de caracteres.
+
+    O custo de reconhecer um verbo depende apenas do tamanho do texto digitado, não do número de verbos.
+    Aceita sinônimos e abreviações sem ambiguidade ("inv", "peg espada").
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._commands: Dict[str, Command] = {}
+
+    def __iter__(self) -> Iterator[Command]:
+        return iter(self._commands.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._commands
+
+    def get(self, name: str) -> Optional[Command]:
+        return self._commands.get(name)
+
+    def register(self, name: str, handler: Callable, takes_argument: bool = False, aliases: Tuple[str, ...] = (),
+                 usage: Optional[str] = None, help_text: Optional[str] = None) -> Command:
+        """Registra um verbo (e seus sinônimos); um nome já registrado é substituído."""
+        if name in self._commands:
+            self.unregister(name)
+        command = Command(name, handler, takes_argument, tuple(aliases), usage, help_text)
+        self._commands[name] = command
+        for phrase in (name,) + command.aliases:
+            self._insert(phrase, command)
+        return command
+
+    def unregister(self, name: str) -> None:
+        """Remove um verbo e recompila a trie."""
+        self._commands.pop(name)
+        commands = list(self._commands.values())
+        self._root = _TrieNode()
+        self._commands = {}
+        for command in commands:
+            self._commands[command.name] = command
+            for phrase in (command.name,) + command.aliases:
+                self._insert(phrase, command)
+
+    def alias(self, alias: str, name: str) -> None:
+        """Adiciona um sinônimo a um verbo já registrado."""
+        command = self._commands[name]
+        command.aliases += (alias,)
+        self._insert(alias, command)
+
+    def _insert(self, phrase: str, command: Command) -> None:
+        node = self._root
+        for char in phrase.lower():
+            node = node.children.setdefault(char, _TrieNode())
+            node.unique = command if node.unique in (None, command) else AMBIGUOUS
+        node.command = command
+
+    def parse(self, text: str) -> Tuple[Optional[Command], str]:
+        """Reconhece o verbo em uma única passada e retorna (comando, argumento).
+
+        Fica com a correspondência mais longa que termina em fim de palavra, seja exata ou uma abreviação
+        que leve a um único comando: "ir pa caverna" é "ir para", não "ir" com o argumento "pa caverna".
+        No mesmo ponto, a exata vence a abreviação.
+        """
+        text = " ".join(text.split())
+        length = len(text)
+        node = self._root
+        match: Optional[Tuple[Command, int]] = None
+        position = 0
+        while position < length:
+            node = node.children.get(text[position])
+            if node is None:
+                break
+            position += 1
+            if position == length or text[position] == " ":
+                if node.command is not None:
+                    match = (node.command, position)
+                elif node.unique is not AMBIGUOUS:
+                    match = (node.unique, position)
+
+        if match is None:
+            return None, text
+        command, end = match
+        return command, text[end:].strip()
+
+    def help_lines(self) -> List[str]:
+        """Retorna uma linha de ajuda para cada verbo, na ordem de registro."""
+        return [f"- {command.usage}: {command.help_text}" for command in self._commands.values() if command.help_text]
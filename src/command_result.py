@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, Optional
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_QUIT = "quit"
+
+# Tipos de evento produzidos pelo motor
+EVENT_SEPARATOR = "separator"
+EVENT_SECTION = "section"
+EVENT_TEXT = "text"
+EVENT_GAME = "game"
+EVENT_SUCCESS = "success"
+EVENT_ERROR = "error"
+EVENT_DIALOG = "dialog"
+
+
+# Classes simples em vez de dataclasses: importar dataclasses (e inspect) pesava na partida do motor
+class GameEvent:
+    """Uma mensagem produzida pelo motor, ainda sem formatação de terminal."""
+
+    __slots__ = ("kind", "text", "speaker")
+
+    def __init__(self, kind: str, text: str = "", speaker: Optional[str] = None) -> None:
+        self.kind = kind
+        self.text = text
+        self.speaker = speaker
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GameEvent):
+            return NotImplemented
+        return (self.kind, self.text, self.speaker) == (other.kind, other.text, other.speaker)
+
+    def __repr__(self) -> str:
+        return f"GameEvent(kind={self.kind!r}, text={self.text!r}, speaker={self.speaker!r})"
+
+
+class CommandResult:
+    """Resultado estruturado de um comando: status, eventos de mensagem e mudanças de estado."""
+
+    __slots__ = ("command", "status", "events", "changes")
+
+    def __init__(self, command: str, status: str = STATUS_OK, events: Optional[List[GameEvent]] = None,
+                 changes: Optional[Dict[str, Any]] = None) -> None:
+        self.command = command
+        self.status = status
+        self.events: List[GameEvent] = [] if events is None else events
+        self.changes: Dict[str, Any] = {} if changes is None else changes
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CommandResult):
+            return NotImplemented
+        return ((self.command, self.status, self.events, self.changes)
+                == (other.command, other.status, other.events, other.changes))
+
+    def __repr__(self) -> str:
+        return (f"CommandResult(command={self.command!r}, status={self.status!r}, "
+                f"events={self.events!r}, changes={self.changes!r})")
+
+    @property
+    def running(self) -> bool:
+        """Indica se o jogo deve continuar após este comando."""
+        return self.status != STATUS_QUIT
+
+    @property
+    def ok(self) -> bool:
+        """Indica se o comando foi aceito sem erro."""
+        return self.status == STATUS_OK
+
+    @property
+    def messages(self) -> List[str]:
+        """Retorna os textos dos eventos, sem separadores."""
+        return [event.text for event in self.events if event.kind != EVENT_SEPARATOR]
+
+    def emit(self, kind: str, text: str = "", speaker: Optional[str] = None) -> None:
+        """Adiciona um evento de mensagem ao resultado."""
+        self.events.append(GameEvent(kind, text, speaker))
+
+    def error(self, text: str) -> None:
+        """Marca o resultado como erro e adiciona a mensagem correspondente."""
+        self.status = STATUS_ERROR
+        self.emit(EVENT_ERROR, text)
@@ -1,89 +1,136 @@
 from place import Place
-from character import Character, Player, NPC
-from item import Item, Weapon, Armor, Key, Potion, QuestItem
+from character import Character, Player
+from item import Item
+from name_index import NameIndex
+from world_template import WorldTemplate
+from world_overlay import WorldOverlay
+from world_query import WorldQuery, describe_location
+from command_parser import CommandParser
+from world_constants import START_PLACE
+from output_sink import OutputSink, TerminalSink
+from instrumentation import metrics, instrumented
+from command_result import (
+    CommandResult, STATUS_ERROR, STATUS_QUIT,
+    EVENT_SEPARATOR, EVENT_SECTION, EVENT_TEXT, EVENT_SUCCESS, EVENT_ERROR, EVENT_DIALOG,
+)
 import os
-import json
-from colorama import init, Fore, Style
-from typing import Dict, List, Tuple, Optional
+import re
+from typing import TYPE_CHECKING, Dict, List, Mapping, Tuple, Optional
 
-# Inicializa o colorama
-init()
+if TYPE_CHECKING:
+    from world_tick import WorldScheduler
 
-class TextFormatter:
-    """Gerencia toda a formatação e estilo de texto da interface do jogo."""
-    
-    def __init__(self) -> None:
-        self.separator = "=" * 60
-        self.section_separator = "-" * 60
-
-    def format_separator(self) -> str:
-        """Retorna uma linha separadora formatada."""
-        return f"\n{Fore.CYAN}{self.separator}{Style.RESET_ALL}\n"
-
-    def format_section(self, title: str) -> str:
-        """Retorna um cabeçalho de seção formatado com título e sublinhado."""
-        return f"\n{Fore.YELLOW}{title}\n{'-' * len(title)}{Style.RESET_ALL}"
-
-    def format_game_output(self, text: str) -> str:
-        """Retorna uma mensagem geral do jogo formatada."""
-        return f"{Fore.GREEN}>>> {text}{Style.RESET_ALL}"
-
-    def format_error(self, text: str) -> str:
-        """Retorna uma mensagem de erro formatada."""
-        return f"{Fore.RED}>>> {text}{Style.RESET_ALL}"
-
-    def format_success(self, text: str) -> str:
-        """Retorna uma mensagem de sucesso formatada."""
-        return f"{Fore.GREEN}>>> {text}{Style.RESET_ALL}"
+# Separa comandos encadeados em uma mesma linha
+PIPELINE_SEPARATOR = ";"
 
-    def format_npc_dialog(self, npc_name: str, dialog: str) -> str:
-        """Retorna um diálogo de NPC formatado."""
-        return f"{Fore.MAGENTA}>>> {npc_name}: {dialog}{Style.RESET_ALL}"
 
-    def format_input_prompt(self) -> str:
-        """Retorna um prompt de entrada formatado."""
-        return f"{Fore.CYAN}>>> O que você quer fazer? {Style.RESET_ALL}"
-
-    def format_game_title(self) -> str:
-        """Retorna o título do jogo formatado."""
-        return f"\n{Fore.CYAN}=== AVENTURA TEXTUAL ==={Style.RESET_ALL}\n"
-
-    def format_farewell(self) -> str:
-        """Retorna uma mensagem de despedida formatada."""
-        return f"\n{Fore.GREEN}Obrigado por jogar! Até a próxima aventura!{Style.RESET_ALL}"
+def find_world_path() -> str:
+    """Retorna o caminho do world.json que acompanha o jogo."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'world.json')
 
 
 class GameEngine:
     """Classe principal do motor do jogo que gerencia o estado e a lógica do jogo."""
 
-    def __init__(self) -> None:
-        self.place_object_dict: Dict[str, Place] = {}
-        self.item_object_dict: Dict[str, Item] = {}
-        self.npc_object_dict: Dict[str, Character] = {}
+    commands: CommandParser
+
+    def __init__(self, template: Optional[WorldTemplate] = None, sink: Optional[OutputSink] = None,
+                 lazy: bool = False, max_resident_places: Optional[int] = None, simulate_npcs: bool = False,
+                 admin: bool = False) -> None:
+        self.place_object_dict: Mapping[str, Place] = {}
+        self.item_object_dict: Mapping[str, Item] = {}
+        self.npc_object_dict: Mapping[str, Character] = {}
         self.world: Dict = {}
+        self.world_overlay: Optional[WorldOverlay] = None
+        self.query: Optional[WorldQuery] = None
         self.player: Optional[Player] = None
         self.current_place: Optional[Place] = None
         self.game_running: bool = False
-        self.formatter = TextFormatter()
+        self.sink = sink or TerminalSink()
+        self.formatter = self.sink.formatter
+        self.load_error: Optional[str] = None
+        self.load_warnings: List[str] = []
+        # Modo preguiçoso: lugares, itens e NPCs só são materializados quando acessados
+        self.lazy = lazy
+        self.max_resident_places = max_resident_places
+        # Com simulate_npcs, a sessão vê os NPCs que o relógio do mundo (WorldTemplate.scheduler) move pelo mapa
+        self.simulate_npcs = simulate_npcs
+        self.simulation: Optional["WorldScheduler"] = None
+        # Lugar, tick e NPCs que a sessão viu da última vez que leu o relógio do mundo, e o índice dos nomes deles
+        self._npcs_seen: Optional[Tuple[str, int, Dict[str, Character]]] = None
+        self._npcs_index: Optional[NameIndex] = None
+        # Sessões de administração também aceitam os comandos de consulta ao mundo ('onde', 'consultar')
+        if admin:
+            self.commands = ADMIN_COMMANDS
+        # Ações disponíveis e seu texto formatado, válidos enquanto o local e o inventário não mudarem
+        self._actions_cache: Optional[Tuple[Tuple, List[Tuple[str, List[str]]]]] = None
+        self._actions_text_cache: Optional[Tuple[List, str]] = None
+        if template is not None:
+            self.attach_template(template)
+
+    def attach_template(self, template: WorldTemplate) -> None:
+        """Associa a sessão a um mundo compartilhado, criando um overlay vazio (custo O(1))."""
+        self.world = template.world
+        self.world_overlay = WorldOverlay(template)
+        self.place_object_dict = self.world_overlay.places
+        self.item_object_dict = self.world_overlay.items
+        self.npc_object_dict = self.world_overlay.npcs
+        self.query = WorldQuery(self.world_overlay)
+        self.world_overlay.on_reload = self._after_reload
+        self.load_warnings = template.warnings
+
+    def _after_reload(self, diff) -> None:
+        """Atualiza as referências da sessão depois que um recarregamento do mundo chegou ao overlay."""
+        player = self.player
+        if player is not None:
+            for name, item in list(player.inventory.items()):
+                current = self.item_object_dict.get(name)
+                if current is None or current is item:
+                    continue
+                player.inventory[name] = current
+                if player.equipped_weapon is item:
+                    player.equipped_weapon = current
+                if player.equipped_armor is item:
+                    player.equipped_armor = current
+            player.invalidate_inventory()
+        self._npcs_seen = None
+        if self.current_place is not None:
+            # O lugar atual pode ter ganhado uma cópia da sessão; se foi removido do mundo, o jogador continua nele
+            self.current_place = self.place_object_dict.get(self.current_place.name, self.current_place)
+        self._actions_cache = None
+        self._actions_text_cache = None
 
     def print_separator(self) -> None:
-        """Imprime uma linha separadora."""
-        print(self.formatter.format_separator())
+        """Escreve uma linha separadora no sink."""
+        self.sink.write(self.formatter.format_separator())
 
     def print_section(self, title: str) -> None:
-        """Imprime um cabeçalho de seção."""
-        print(self.formatter.format_section(title))
+        """Escreve um cabeçalho de seção no sink."""
+        self.sink.write(self.formatter.format_section(title))
 
-    def _create_case_insensitive_dict(self, items: Dict[str, any]) -> Dict[str, str]:
-        """Cria um mapeamento case-insensitive de nomes de itens para suas versões originais."""
-        return {name.lower(): name for name in items.keys()}
+    def print_result(self, result: CommandResult) -> None:
+        """Escreve no sink os eventos de um resultado de comando."""
+        self.sink.write_result(result)
 
-    def _get_original_case_name(self, name: str, case_dict: Dict[str, str]) -> Optional[str]:
-        """Obtém a versão original de um nome a partir de um dicionário case-insensitive."""
-        return case_dict.get(name.lower())
+    def read_input(self, prompt: str) -> str:
+        """Envia toda a saída pendente junto com o prompt em uma única escrita e lê a resposta."""
+        self.sink.write(prompt, end="")
+        self.sink.flush()
+        return input().strip()
+
+    def _emit_framed(self, result: CommandResult, text: str) -> None:
+        """Adiciona um texto ao resultado entre duas linhas separadoras."""
+        result.emit(EVENT_SEPARATOR)
+        result.emit(EVENT_TEXT, text)
+        result.emit(EVENT_SEPARATOR)
 
     def get_available_actions(self) -> List[Tuple[str, List[str]]]:
         """Retorna uma lista de ações disponíveis agrupadas por categoria."""
+        characters = self._characters_here()
+        key = (self.current_place, self.current_place.version, self.player.inventory_version, characters)
+        if self._actions_cache is not None and self._actions_cache[0] == key:
+            return self._actions_cache[1]
+        
         actions = []
         
         # Ações sempre disponíveis
@@ -110,9 +157,9 @@ class GameEngine:
             ]))
         
         # Ações relacionadas a NPCs
-        if self.current_place.characters:
+        if characters:
             actions.append(("PERSONAGENS COM QUEM VOCÊ PODE FALAR", [
-                f"falar com {char_name}" for char_name in self.current_place.characters
+                f"falar com {char_name}" for char_name in characters
             ]))
         
         # Ações de movimento
@@ -121,306 +168,539 @@ class GameEngine:
                 f"ir para {place_name}" for place_name in self.current_place.takes_to
             ]))
         
+        self._actions_cache = (key, actions)
         return actions
 
-    def display_available_actions(self) -> None:
-        """Exibe todas as ações disponíveis agrupadas por categoria."""
+    @instrumented("render.actions")
+    def render_available_actions(self) -> str:
+        """Retorna o texto formatado das ações disponíveis, reaproveitando-o enquanto nada mudar."""
         actions = self.get_available_actions()
+        if self._actions_text_cache is not None and self._actions_text_cache[0] is actions:
+            return self._actions_text_cache[1]
+        
+        lines = []
         for section_title, section_actions in actions:
-            self.print_section(section_title)
-            for action in section_actions:
-                print(f"- {action}")
+            lines.append(self.formatter.format_section(section_title))
+            lines.extend(f"- {action}" for action in section_actions)
+        text = "\n".join(lines)
+        self._actions_text_cache = (actions, text)
+        return text
 
-    def show_help(self) -> None:
-        """Exibe o menu de ajuda com todos os comandos disponíveis."""
-        self.print_separator()
-        self.print_section("AJUDA - COMANDOS DISPONÍVEIS")
-        help_text = """
-- olhar: Mostra a descrição detalhada do local atual
-- inventario (ou i): Mostra seus itens
-- pegar <item>: Pega um item do local
-- largar <item>: Larga um item do seu inventário
-- usar <item>: Usa um item do seu inventário
-- falar com <personagem>: Fala com um personagem
-- ir para <lugar>: Move para outro lugar
-- status: Mostra seu status atual
-- ajuda: Mostra esta mensagem
-- sair: Encerra o jogo
-"""
-        print(help_text)
-        self.print_separator()
+    def display_available_actions(self) -> None:
+        """Exibe todas as ações disponíveis agrupadas por categoria."""
+        self.sink.write(self.render_available_actions())
+
+    def show_help(self, result: CommandResult) -> None:
+        """Adiciona ao resultado o menu de ajuda com todos os comandos registrados."""
+        result.emit(EVENT_SEPARATOR)
+        result.emit(EVENT_SECTION, "AJUDA - COMANDOS DISPONÍVEIS")
+        result.emit(EVENT_TEXT, "\n" + "\n".join(self.commands.help_lines()) + "\n")
+        result.emit(EVENT_SEPARATOR)
+
+    def _handle_quit(self, result: CommandResult) -> None:
+        """Processa o comando 'sair'."""
+        result.status = STATUS_QUIT
+
+    def _handle_look(self, result: CommandResult) -> None:
+        """Processa o comando 'olhar'."""
+        self._emit_framed(result, self._describe_place())
 
-    def _handle_pick_item(self, item_name: str) -> bool:
+    def _handle_inventory(self, result: CommandResult) -> None:
+        """Processa o comando 'inventario'."""
+        self._emit_framed(result, self.player.show_inventory())
+
+    def _handle_status(self, result: CommandResult) -> None:
+        """Processa o comando 'status'."""
+        self._emit_framed(result, self.player.get_status())
+
+    def _handle_pick_item(self, item_name: str, result: CommandResult) -> None:
         """Processa o comando 'pegar'."""
-        item_name_lower = item_name.lower()
-        items_lower = self._create_case_insensitive_dict(self.current_place.items)
-        
-        original_item_name = self._get_original_case_name(item_name, items_lower)
+        original_item_name = self.current_place.find_item(item_name)
         if original_item_name:
             item = self.current_place.items[original_item_name]
-            result = self.player.pick_up_item(item)
-            print(self.formatter.format_success(result))
-            if "pegou" in result:
-                self.current_place.remove_item(original_item_name)
+            if item.pickable:
+                item = self.item_object_dict.mutable(original_item_name)
+            message = self.player.pick_up_item(item)
+            result.emit(EVENT_SUCCESS, message)
+            if "pegou" in message:
+                self.world_overlay.take_item(self.current_place.name, original_item_name)
+                self.current_place = self.place_object_dict[self.current_place.name]
+                result.changes["picked"] = original_item_name
+            else:
+                result.status = STATUS_ERROR
         else:
-            print(self.formatter.format_error(f"Não há {item_name} aqui."))
-        return True
+            result.error(self._not_found(f"Não há {item_name} aqui.", self.current_place.suggest_items(item_name)))
 
-    def _handle_drop_item(self, item_name: str) -> bool:
+    def _handle_drop_item(self, item_name: str, result: CommandResult) -> None:
         """Processa o comando 'largar'."""
-        item_name_lower = item_name.lower()
-        inventory_lower = self._create_case_insensitive_dict(self.player.inventory)
-        
-        original_item_name = self._get_original_case_name(item_name, inventory_lower)
+        original_item_name = self.player.find_item(item_name)
         if original_item_name:
-            result = self.player.drop_item(original_item_name)
-            print(self.formatter.format_success(result))
-            if "largou" in result:
-                self.current_place.add_item(self.item_object_dict[original_item_name])
+            message = self.player.drop_item(original_item_name)
+            result.emit(EVENT_SUCCESS, message)
+            if "largou" in message:
+                self.world_overlay.put_item(self.current_place.name, original_item_name)
+                self.current_place = self.place_object_dict[self.current_place.name]
+                result.changes["dropped"] = original_item_name
+            else:
+                result.status = STATUS_ERROR
         else:
-            print(self.formatter.format_error(f"Você não está carregando {item_name}."))
-        return True
+            result.error(self._not_found(f"Você não está carregando {item_name}.", self.player.suggest_items(item_name)))
 
-    def _handle_use_item(self, item_name: str) -> bool:
+    def _handle_use_item(self, item_name: str, result: CommandResult) -> None:
         """Processa o comando 'usar'."""
-        item_name_lower = item_name.lower()
-        inventory_lower = self._create_case_insensitive_dict(self.player.inventory)
-        
-        original_item_name = self._get_original_case_name(item_name, inventory_lower)
+        original_item_name = self.player.find_item(item_name)
         if original_item_name:
-            print(self.formatter.format_success(self.player.use_item(original_item_name)))
+            result.emit(EVENT_SUCCESS, self.player.use_item(original_item_name))
+            result.changes["used"] = original_item_name
         else:
-            print(self.formatter.format_error(f"Você não está carregando {item_name}."))
-        return True
+            result.error(self._not_found(f"Você não está carregando {item_name}.", self.player.suggest_items(item_name)))
 
-    def _handle_talk_to_npc(self, npc_name: str) -> bool:
+    def _handle_talk_to_npc(self, npc_name: str, result: CommandResult) -> None:
         """Processa o comando 'falar com'."""
-        npc_name_lower = npc_name.lower()
-        characters_lower = self._create_case_insensitive_dict(self.current_place.characters)
-        
-        original_npc_name = self._get_original_case_name(npc_name, characters_lower)
+        if self.simulation is not None:
+            names = self._simulated_names()
+            original_npc_name, suggest = names.resolve(npc_name), names.suggestions
+        else:
+            place = self.current_place
+            original_npc_name, suggest = place.find_character(npc_name), place.suggest_characters
         if original_npc_name:
-            npc = self.current_place.characters[original_npc_name]
-            print(self.formatter.format_npc_dialog(npc.name, npc.speak()))
+            npc = self.npc_object_dict.mutable(original_npc_name)
+            result.emit(EVENT_DIALOG, npc.speak(), speaker=npc.name)
+            result.changes["talked_to"] = original_npc_name
         else:
-            print(self.formatter.format_error(f"Não há {npc_name} aqui."))
-        return True
-
-    def _handle_move_to(self, place_name: str) -> bool:
+            result.error(self._not_found(f"Não há {npc_name} aqui.", suggest(npc_name)))
+
+    def _handle_where(self, name: str, result: CommandResult) -> None:
+        """Processa o comando de administração 'onde': mostra o local atual de um item ou NPC."""
+        index = self.query.index
+        item_name = index.resolve_item(name)
+        if item_name is not None:
+            result.emit(EVENT_SUCCESS, f"{item_name} está em: {describe_location(self.query.locate_item(item_name))}.")
+            return
+        npc_name = index.resolve_npc(name)
+        if npc_name is not None:
+            result.emit(EVENT_SUCCESS, f"{npc_name} está em: {describe_location(self.query.locate_npc(npc_name))}.")
+            return
+        result.error(f"Não há {name} no mundo.")
+
+    def _handle_query(self, argument: str, result: CommandResult) -> None:
+        """Processa o comando de administração 'consultar', filtrando itens pelos índices do mundo."""
+        # "tipo=potion lugar=centro da cidade raio=2": valores podem ter espaços, então divide pelas chaves
+        parts = re.split(r"\s*(\w+)=", " " + argument)
+        if len(parts) < 3 or parts[0].strip():
+            result.error(f"Uso: {self.commands.get('consultar').usage}")
+            return
+        filters = dict(zip(parts[1::2], (value.strip() for value in parts[2::2])))
+        unknown = sorted(set(filters) - {"tipo", "lugar", "raio", "pegavel"})
+        if unknown:
+            result.error(f"Filtro desconhecido: {', '.join(unknown)}.")
+            return
+        places = None
+        if "lugar" in filters:
+            place_name = self.world_overlay.template.graph.find(filters["lugar"])
+            if place_name is None:
+                result.error(f"Erro: Local {filters['lugar']} não encontrado.")
+                return
+            radius = int(filters["raio"]) if filters.get("raio", "").isdigit() else 0
+            places = self.query.region(place_name, radius)
+        pickable = {"sim": True, "nao": False, "não": False}.get(filters.get("pegavel"))
+        names = self.query.find_items(filters.get("tipo"), places, pickable)
+        by_location: Dict[str, List[str]] = {}
+        for name in names:
+            by_location.setdefault(describe_location(self.query.locate_item(name)), []).append(name)
+        lines = [f"Itens encontrados: {len(names)}"]
+        lines.extend(f"- {location}: {', '.join(items)}" for location, items in by_location.items())
+        self._emit_framed(result, "\n".join(lines))
+
+    @staticmethod
+    def _not_found(message: str, suggestions: List[str]) -> str:
+        """Acrescenta à mensagem de erro os nomes parecidos, quando houver."""
+        if not suggestions:
+            return message
+        return f"{message} Você quis dizer: {' ou '.join(suggestions)}?"
+
+    def _enter_place(self, place_name: str, message: str, result: CommandResult) -> None:
+        """Move o jogador para um lugar e mostra a descrição dele uma única vez."""
+        self.current_place = self.place_object_dict[place_name]
+        self.player.set_location(place_name)
+        result.emit(EVENT_SEPARATOR)
+        result.emit(EVENT_SUCCESS, message)
+        result.emit(EVENT_TEXT, self._describe_place())
+        result.emit(EVENT_SEPARATOR)
+        result.changes["moved_to"] = place_name
+
+    def _handle_move_to(self, place_name: str, result: CommandResult) -> None:
         """Processa o comando 'ir para'."""
-        place_name_lower = place_name.lower()
-        takes_to_lower = [place.lower() for place in self.current_place.takes_to]
-        
-        if place_name_lower in takes_to_lower:
-            original_place_name = next(place for place in self.current_place.takes_to if place.lower() == place_name_lower)
+        original_place_name = self.current_place.find_destination(place_name)
+        if original_place_name:
             if original_place_name in self.place_object_dict:
-                self.current_place = self.place_object_dict[original_place_name]
-                self.print_separator()
-                print(self.formatter.format_success(f"Você foi para {original_place_name}."))
-                print(self.current_place.get_full_description())
-                self.print_separator()
+                self._enter_place(original_place_name, f"Você foi para {original_place_name}.", result)
             else:
-                print(self.formatter.format_error(f"Erro: Local {place_name} não encontrado."))
+                result.error(f"Erro: Local {place_name} não encontrado.")
+        else:
+            result.error(self._not_found(f"Você não pode ir para {place_name} a partir daqui.",
+                                         self.current_place.suggest_destinations(place_name)))
+
+    def _handle_travel_to(self, place_name: str, result: CommandResult) -> None:
+        """Processa o comando 'viajar para', percorrendo a rota mais curta em um único turno."""
+        graph = self.world_overlay.template.graph
+        target = graph.find(place_name)
+        if target is None or target not in self.place_object_dict:
+            result.error(f"Erro: Local {place_name} não encontrado.")
+            return
+        if target == self.current_place.name:
+            result.error(f"Você já está em {target}.")
+            return
+        route = graph.shortest_path(self.current_place.name, target)
+        if route is None:
+            result.error(f"Não há caminho daqui até {target}.")
+            return
+        stops = route[1:-1]
+        if stops:
+            message = f"Você viajou para {target} passando por {', '.join(stops)}."
+        else:
+            message = f"Você foi para {target}."
+        self._enter_place(target, message, result)
+        result.changes["route"] = route
+
+    def step(self, command: str) -> CommandResult:
+        """Processa um comando sem acessar o terminal e retorna o resultado estruturado.
+
+        Vários comandos podem vir na mesma linha separados por ';' ("pegar espada; usar espada"): eles
+        rodam em ordem, param no primeiro que falhar, e o resultado reúne os eventos de todos.
+        """
+        if PIPELINE_SEPARATOR not in command:
+            return self._step(command)
+        steps = [part for part in (part.strip() for part in command.split(PIPELINE_SEPARATOR)) if part]
+        if len(steps) <= 1:
+            return self._step(steps[0] if steps else "")
+        
+        result = CommandResult(command.lower().strip())
+        for position, step in enumerate(steps):
+            partial = self._step(step)
+            events = partial.events
+            # Evita duas linhas separadoras seguidas entre a saída de um comando e a do próximo
+            if events and result.events and events[0].kind == EVENT_SEPARATOR \
+                    and result.events[-1].kind == EVENT_SEPARATOR:
+                events = events[1:]
+            result.events.extend(events)
+            result.changes.update(partial.changes)
+            if not partial.ok:
+                result.status = partial.status
+                skipped = steps[position + 1:]
+                if skipped and partial.running:
+                    result.emit(EVENT_ERROR, f"Comandos não executados: {'; '.join(skipped)}.")
+                break
+        return result
+
+    def _step(self, command: str) -> CommandResult:
+        """Processa um único comando."""
+        command = command.lower().strip()
+        result = CommandResult(command)
+        
+        if self.simulation is not None:
+            self._sync_npcs(self.current_place.name, result)
+        verb, argument = self.commands.parse(command)
+        if metrics.enabled:
+            token = metrics.begin()
+            self._dispatch(verb, argument, result)
+            metrics.end(f"command.{verb.name if verb else 'desconhecido'}", token, error=not result.ok)
         else:
-            print(self.formatter.format_error(f"Você não pode ir para {place_name} a partir daqui."))
-        return True
+            self._dispatch(verb, argument, result)
+        return result
+
+    def _sync_npcs(self, place_name: str, result: Optional[CommandResult] = None) -> Dict[str, Character]:
+        """Lê do relógio do mundo os NPCs do lugar; com result, conta ao jogador quem chegou ou saiu.
+
+        As posições ficam só nas colunas do relógio, compartilhadas por todas as sessões: a sessão guarda
+        apenas o que viu no lugar em que está, e só relê quando o relógio andou desde a última vez.
+        """
+        simulation = self.simulation
+        seen = self._npcs_seen
+        if seen is not None and seen[0] == place_name and seen[1] == simulation.tick_count:
+            return seen[2]
+        npcs = self.npc_object_dict
+        characters = {name: npcs[name] for name in sorted(simulation.npcs_at(place_name)) if name in npcs}
+        if result is not None and seen is not None and seen[0] == place_name:
+            for name in characters:
+                if name not in seen[2]:
+                    origin = simulation.came_from(name)
+                    text = f"{name} chegou, vindo de {origin}." if origin != place_name else f"{name} chegou."
+                    result.emit(EVENT_TEXT, text)
+            for name in seen[2]:
+                destination = simulation.where(name)
+                if name not in characters and destination is not None:
+                    result.emit(EVENT_TEXT, f"{name} partiu para {destination}.")
+        self._npcs_seen = (place_name, simulation.tick_count, characters)
+        self._npcs_index = None
+        return characters
+
+    def _characters_here(self) -> Mapping[str, Character]:
+        """Personagens do lugar atual: os que o relógio do mundo pôs nele (simulate_npcs) ou os do próprio lugar."""
+        if self.simulation is None:
+            return self.current_place.characters
+        return self._sync_npcs(self.current_place.name)
+
+    def _simulated_names(self) -> NameIndex:
+        """Índice dos nomes dos NPCs simulados no lugar atual, para 'falar com'."""
+        characters = self._sync_npcs(self.current_place.name)
+        if self._npcs_index is None:
+            self._npcs_index = NameIndex(characters)
+        return self._npcs_index
+
+    def _describe_place(self) -> str:
+        """Descrição completa do lugar atual, com os NPCs simulados quando simulate_npcs."""
+        if self.simulation is None:
+            return self.current_place.get_full_description()
+        return self.current_place.get_full_description(self._sync_npcs(self.current_place.name))
+
+    def _dispatch(self, verb, argument: str, result: CommandResult) -> None:
+        """Executa o handler do verbo já reconhecido, ou registra o erro de uso no resultado."""
+        if verb is None or (argument and not verb.takes_argument):
+            result.error("Comando não reconhecido. Digite 'ajuda' para ver os comandos disponíveis.")
+        elif not verb.takes_argument:
+            verb.handler(self, result)
+        elif argument:
+            verb.handler(self, argument, result)
+        else:
+            result.error(f"Uso: {verb.usage}")
 
     def process_command(self, command: str) -> bool:
-        """Processa um comando do jogador e retorna se o jogo deve continuar."""
-        command = command.lower().strip()
-        
-        if command == "sair":
-            return False
-        
-        if command == "ajuda":
-            self.show_help()
-            return True
-        
-        if command == "olhar":
-            self.print_separator()
-            print(self.current_place.get_full_description())
-            self.print_separator()
-            return True
-        
-        if command in ["inventario", "i"]:
-            self.print_separator()
-            print(self.player.show_inventory())
-            self.print_separator()
-            return True
-        
-        if command == "status":
-            self.print_separator()
-            print(self.player.get_status())
-            self.print_separator()
-            return True
-        
-        if command.startswith("pegar "):
-            return self._handle_pick_item(command[6:].strip())
-        
-        if command.startswith("largar "):
-            return self._handle_drop_item(command[7:].strip())
-        
-        if command.startswith("usar "):
-            return self._handle_use_item(command[5:].strip())
-        
-        if command.startswith("falar com "):
-            return self._handle_talk_to_npc(command[10:].strip())
-        
-        if command.startswith("ir para "):
-            return self._handle_move_to(command[8:].strip())
+        """Processa um comando do jogador, escreve a saída no sink e retorna se o jogo deve continuar.
+
+        A saída fica acumulada no sink até o próximo flush, para que o turno inteiro seja enviado de uma vez.
+        Uma linha com vários comandos separados por ';' é um único turno: a saída é formatada uma só vez,
+        no fim, e as ações disponíveis só são mostradas de novo depois dela.
+        """
+        return self._show_result(self.step(command))
+
+    def _show_result(self, result: CommandResult) -> bool:
+        """Escreve no sink o resultado de um turno e retorna se o jogo deve continuar."""
+        if metrics.enabled:
+            with metrics.measure("render.result"):
+                self.print_result(result)
+        else:
+            self.print_result(result)
+        return result.running
+
+    def load_game(self) -> CommandResult:
+        """Carrega o mundo e seus objetos sem acessar o terminal."""
+        result = CommandResult("")
+        self.load_world()
+        if self.load_error:
+            result.error(self.load_error)
+            return result
+        
+        for warning in self.load_warnings:
+            result.emit(EVENT_ERROR, warning)
+        return result
+
+    def start(self, player_name: str) -> CommandResult:
+        """Inicia uma sessão headless: carrega o mundo se necessário, cria o jogador e o posiciona."""
+        if self.place_object_dict:
+            result = CommandResult("")
+        else:
+            result = self.load_game()
+            if not result.ok:
+                return result
         
-        print(self.formatter.format_error("Comando não reconhecido. Digite 'ajuda' para ver os comandos disponíveis."))
-        return True
+        self.player = Player(player_name, location=START_PLACE)
+        self._attach_simulation()
+        self.current_place = self.place_object_dict[START_PLACE]
+        self.game_running = True
+        self._emit_framed(result, self._describe_place())
+        return result
+
+    def _attach_simulation(self) -> None:
+        """Liga a sessão ao relógio do mundo, quando simulate_npcs."""
+        self.simulation = self.world_overlay.template.scheduler if self.simulate_npcs else None
+        self.query.simulation = self.simulation
+        self._npcs_seen = None
+
+    def snapshot_state(self) -> Dict:
+        """Retorna o estado compacto da sessão: jogador, local atual e diferenças em relação ao mundo."""
+        player = self.player
+        return {
+            "player": {
+                "name": player.name,
+                "health": player.health,
+                "max_health": player.max_health,
+                "inventory": list(player.inventory),
+                "equipped_weapon": player.equipped_weapon.name if player.equipped_weapon else None,
+                "equipped_armor": player.equipped_armor.name if player.equipped_armor else None,
+            },
+            "current_place": self.current_place.name,
+            "world": self.world_overlay.deltas(),
+        }
+
+    def restore_state(self, state: Dict) -> None:
+        """Recria a sessão a partir de um estado gerado por snapshot_state()."""
+        if self.world_overlay is None:
+            self.load_world()
+            if self.load_error:
+                raise ValueError(self.load_error)
+        self.attach_template(self.world_overlay.template)
+        self.world_overlay.apply_deltas(state["world"])
+        
+        # Depois de um recarregamento do mundo, itens e lugares removidos são descartados do estado salvo
+        place_name = state["current_place"] if state["current_place"] in self.place_object_dict else START_PLACE
+        data = state["player"]
+        player = Player(data["name"], location=place_name)
+        player.health = data["health"]
+        player.max_health = data["max_health"]
+        items = self.item_object_dict
+        for item_name in data["inventory"]:
+            if item_name in items:
+                player.add_to_inventory(items[item_name])
+        if data["equipped_weapon"] in player.inventory:
+            player.equipped_weapon = items[data["equipped_weapon"]]
+        if data["equipped_armor"] in player.inventory:
+            player.equipped_armor = items[data["equipped_armor"]]
+        
+        self.player = player
+        self._attach_simulation()
+        self.current_place = self.place_object_dict[place_name]
+        self.game_running = True
+
+    def run(self, journal_dir: Optional[str] = None) -> None:
+        """Loop principal do jogo.
 
-    def run(self) -> None:
-        """Loop principal do jogo."""
+        Com journal_dir, a sessão é registrada em um journal (ver journal.py) com o nome do jogador: se
+        o processo cair, jogar de novo com o mesmo nome continua do ponto em que parou.
+        """
         self.print_separator()
-        print(self.formatter.format_game_title())
+        self.sink.write(self.formatter.format_game_title())
         self.print_separator()
         
         # Carrega o mundo do jogo
-        if not self.load_world():
+        result = self.load_game()
+        self.print_result(result)
+        if not result.ok:
+            self.sink.flush()
             return
         
-        self.load_places()
-        self.load_items()
-        self.load_npcs()
-        
-        # Cria o jogador
-        if not self.create_player():
+        # Cria o jogador e define a localização inicial
+        player_name = self.create_player()
+        if not player_name:
+            self.sink.flush()
             return
+        session = None
+        if journal_dir is None:
+            result = self.start(player_name)
+        else:
+            # Importado aqui porque journal.py importa este módulo
+            from journal import open_session
+            session, result = open_session(self, journal_dir, player_name)
+        self.print_result(result)
         
-        # Define a localização inicial
-        self.current_place = self.place_object_dict["Floresta"]
-        self.print_separator()
-        print(self.current_place.get_full_description())
-        self.print_separator()
-        
-        # Loop principal do jogo
-        self.game_running = True
+        # Loop principal do jogo: cada turno é enviado ao sink em uma única escrita
         while self.game_running:
             self.display_available_actions()
             self.print_separator()
-            command = input(self.formatter.format_input_prompt()).strip()
-            self.game_running = self.process_command(command)
+            if session is not None:
+                # O jogo local não tem quem faça o fsync em segundo plano: ele acontece antes de esperar o jogador
+                session.journal.sync()
+            command = self.read_input(self.formatter.format_input_prompt())
+            if self.simulation is not None:
+                # Sem um loop de eventos, o relógio do mundo roda os ticks do tempo que passou esperando o jogador
+                self.simulation.catch_up()
+            if session is None:
+                self.game_running = self.process_command(command)
+            else:
+                self.game_running = self._show_result(session.step(command))
+        if session is not None:
+            session.close()
         
         self.print_separator()
-        print(self.formatter.format_farewell())
+        self.sink.write(self.formatter.format_farewell())
         self.print_separator()
+        self.sink.flush()
 
     def find_world_path(self) -> str:
         """Retorna o caminho para o arquivo world.json."""
-        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'world.json')
+        return find_world_path()
     
+    @instrumented("load.world")
     def load_world(self) -> Dict:
-        """Carrega o mundo do jogo a partir do arquivo world.json."""
+        """Associa a sessão ao mundo compartilhado do processo, lendo world.json só na primeira vez."""
+        # Importado aqui: só o carregamento do mundo precisa do json, não a importação do motor
+        import json
+
+        self.load_error = None
         try:
-            with open(self.find_world_path(), 'r', encoding='utf8') as f:
-                self.world = json.load(f)
-                return self.world
+            self.attach_template(WorldTemplate.shared(self.find_world_path(), self.lazy, self.max_resident_places))
+            return self.world
         except FileNotFoundError:
-            print(self.formatter.format_error("Erro: O arquivo 'world.json' não foi encontrado. Encerrando o jogo..."))
+            self.load_error = "Erro: O arquivo 'world.json' não foi encontrado. Encerrando o jogo..."
         except PermissionError:
-            print(self.formatter.format_error("Erro: Você não tem permissão para acessar 'world.json'. Encerrando o jogo..."))
+            self.load_error = "Erro: Você não tem permissão para acessar 'world.json'. Encerrando o jogo..."
         except json.JSONDecodeError:
-            print(self.formatter.format_error("Erro: Falha ao decodificar JSON — verifique a sintaxe em 'world.json'. Encerrando o jogo..."))
+            self.load_error = "Erro: Falha ao decodificar JSON — verifique a sintaxe em 'world.json'. Encerrando o jogo..."
         except Exception as e:
-            print(self.formatter.format_error(f"Ocorreu um erro inesperado: {e}. Encerrando o jogo."))
+            self.load_error = f"Ocorreu um erro inesperado: {e}. Encerrando o jogo."
         self.world = None
         return None
     
-    def load_places(self) -> None:
-        """Carrega os lugares do mundo do jogo."""
-        if not self.world:
-            raise ValueError('Mundo não foi carregado corretamente.')
-        
-        locations = self.world.get("locations", [])
-        if not locations:
-            raise KeyError("Chave 'locations' não encontrada nos dados do mundo.")
-        
-        for data in locations:
-            name = data.get("name", "")
-            description = data.get("description", "")
-            takes_to = data.get("takes_to", [])
-            self.place_object_dict[name] = Place(name, description, takes_to)
-
-    def load_items(self) -> None:
-        """Carrega os itens do mundo do jogo."""
-        if not self.world:
-            raise ValueError('Mundo não foi carregado corretamente.')
-        
-        items_data = self.world.get("items", [])
-        if not items_data:
-            raise KeyError("Chave 'items' não encontrada nos dados do mundo.")
-        
-        for data in items_data:
-            name = data.get("name")
-            description = data.get("description", "")
-            location = data.get("location")
-            pickable = data.get("pickable", False)
-            item_type = data.get("type", "generic")
-
-            # Cria o tipo apropriado de item
-            if item_type == "weapon":
-                offense_bonus = data.get("offense_bonus", 0)
-                item = Weapon(name, description, location, pickable, offense_bonus)
-            elif item_type == "armor":
-                defense_bonus = data.get("defense_bonus", 0)
-                item = Armor(name, description, location, pickable, defense_bonus)
-            elif item_type == "key":
-                item = Key(name, description, location, pickable)
-            elif item_type == "potion":
-                heal_amount = data.get("heal_amount", 0)
-                item = Potion(name, description, location, pickable, heal_amount)
-            elif item_type == "quest_item":
-                item = QuestItem(name, description, location, pickable)
-            else:
-                item = Item(name, description, location, pickable, item_type)
-
-            self.item_object_dict[name] = item
-            
-            # Adiciona o item ao seu local
-            if location in self.place_object_dict:
-                self.place_object_dict[location].add_item(item)
-            else:
-                print(self.formatter.format_error(f"⚠️ Local '{location}' não encontrado para o item '{name}'"))
-            
-    def load_npcs(self) -> None:
-        """Carrega os NPCs do mundo do jogo."""
-        if not self.world:
-            print(self.formatter.format_error('Mundo não foi carregado corretamente.'))
-            return
-        
-        characters_data = self.world.get("characters", [])
-        for data in characters_data:
-            name = data.get("name")
-            description = data.get("description")
-            location = data.get("location")
-            dialog = data.get("dialog", ["Olá, aventureiro!"])
-            
-            npc = NPC(name, description, location, dialog)
-            self.npc_object_dict[name] = npc
-            
-            # Adiciona o NPC ao seu local
-            if location in self.place_object_dict:
-                self.place_object_dict[location].add_character(npc)
-            else:
-                print(self.formatter.format_error(f"⚠️ Local '{location}' não encontrado para o NPC '{name}'"))
-
-    def create_player(self) -> bool:
-        """Cria o jogador e retorna se a criação foi bem-sucedida."""
-        print(self.formatter.format_game_output("\nBem-vindo à Aventura!"))
+    def create_player(self) -> Optional[str]:
+        """Pergunta o nome do jogador e o retorna, ou None se o jogador desistir."""
+        self.sink.write(self.formatter.format_game_output("\nBem-vindo à Aventura!"))
         while True:
-            name = input("Digite seu nome (ou 'sair' para encerrar): ").strip()
+            name = self.read_input("Digite seu nome (ou 'sair' para encerrar): ")
             if name.lower() == 'sair':
-                return False
+                return None
             if name:
-                self.player = Player(name)
-                print(self.formatter.format_success(f"\nBem-vindo, {name}! Sua aventura está prestes a começar..."))
-                return True
-            print(self.formatter.format_error("Por favor, digite um nome válido."))
+                self.sink.write(self.formatter.format_success(f"\nBem-vindo, {name}! Sua aventura está prestes a começar..."))
+                return name
+            self.sink.write(self.formatter.format_error("Por favor, digite um nome válido."))
+
+
+def build_default_commands() -> CommandParser:
+    """Monta a tabela de verbos padrão do jogo, na ordem em que aparecem na ajuda."""
+    commands = CommandParser()
+    commands.register("olhar", GameEngine._handle_look, aliases=("ver",),
+                      help_text="Mostra a descrição detalhada do local atual")
+    commands.register("inventario", GameEngine._handle_inventory, aliases=("i", "inventário", "inv"),
+                      usage="inventario (ou i)", help_text="Mostra seus itens")
+    commands.register("pegar", GameEngine._handle_pick_item, takes_argument=True, aliases=("apanhar",),
+                      usage="pegar <item>", help_text="Pega um item do local")
+    commands.register("largar", GameEngine._handle_drop_item, takes_argument=True, aliases=("soltar",),
+                      usage="largar <item>", help_text="Larga um item do seu inventário")
+    commands.register("usar", GameEngine._handle_use_item, takes_argument=True, aliases=("equipar", "beber"),
+                      usage="usar <item>", help_text="Usa um item do seu inventário")
+    commands.register("falar com", GameEngine._handle_talk_to_npc, takes_argument=True,
+                      aliases=("falar", "conversar com"),
+                      usage="falar com <personagem>", help_text="Fala com um personagem")
+    commands.register("ir para", GameEngine._handle_move_to, takes_argument=True, aliases=("ir", "ir ao", "ir à"),
+                      usage="ir para <lugar>", help_text="Move para outro lugar")
+    commands.register("viajar para", GameEngine._handle_travel_to, takes_argument=True, aliases=("viajar",),
+                      usage="viajar para <lugar>", help_text="Viaja até um lugar distante pelo caminho mais curto")
+    commands.register("status", GameEngine._handle_status, help_text="Mostra seu status atual")
+    commands.register("ajuda", GameEngine.show_help, aliases=("?",), help_text="Mostra esta mensagem")
+    commands.register("sair", GameEngine._handle_quit, help_text="Encerra o jogo")
+    return commands
+
+
+def build_admin_commands() -> CommandParser:
+    """Tabela padrão acrescida dos comandos de consulta ao mundo usados por administradores."""
+    commands = build_default_commands()
+    commands.register("onde", GameEngine._handle_where, takes_argument=True, aliases=("onde está",),
+                      usage="onde <item ou personagem>", help_text="Mostra onde está um item ou personagem")
+    commands.register("consultar", GameEngine._handle_query, takes_argument=True,
+                      usage="consultar tipo=<tipo> lugar=<lugar> raio=<n> pegavel=<sim|nao>",
+                      help_text="Lista os itens que atendem aos filtros, agrupados por local")
+    return commands
+
+
+# Tabela compartilhada por todas as sessões; novos verbos podem ser registrados sem alterar o motor
+GameEngine.commands = build_default_commands()
+ADMIN_COMMANDS = build_admin_commands()
 
 
 if __name__ == "__main__":
-    game = GameEngine()
-    game.run()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Aventura textual no terminal.")
+    parser.add_argument("--journal-dir", help="diretório dos journals: com ele, o jogo continua de onde o jogador parou")
+    parser.add_argument("--npcs", action="store_true", help="os NPCs andam pelo mapa com o passar do tempo")
+    args = parser.parse_args()
+    game = GameEngine(simulate_npcs=args.npcs)
+    game.run(args.journal_dir)
@@ -1,10 +1,33 @@
+import sys
+
+
+def intern_name(value):
+    """Interna nomes repetidos (lugares, tipos) para que todas as instâncias compartilhem a mesma string."""
+    return sys.intern(value) if type(value) is str else value
+
+
 class GameObject:
+    __slots__ = ("name", "description")
+
     def __init__(self, name: str, description: str):
-        self.name = name
+        self.name = intern_name(name)
         self.description = description
 
     def get_name(self):
         return self.name
     
     def describe(self):
-        return self.description
\ No newline at end of file
+        return self.description
+
+    def clone(self):
+        # Importado aqui: a primeira cópia só acontece quando uma sessão altera o mundo
+        import copy
+
+        return copy.copy(self)
+
+    def update_from(self, other: "GameObject", keep: tuple = ()) -> None:
+        """Copia os atributos de outro objeto da mesma classe (menos os de keep), mantendo esta instância."""
+        for cls in type(other).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if slot not in keep:
+                    setattr(self, slot, getattr(other, slot))
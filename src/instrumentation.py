@@ -0,0 +1,257 @@
+import _thread
+import functools
+import math
+import os
+import sys
+import time
+from array import array
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, TextIO, Tuple
+
+if TYPE_CHECKING:
+    import threading
+
+# Largura relativa dos baldes do histograma: cada balde cobre ~10% a mais que o anterior
+BUCKET_GROWTH = 1.1
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+
+
+class Histogram:
+    """Histograma de latências em microssegundos com baldes logarítmicos (erro relativo de ~10%)."""
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self) -> None:
+        self.counts = array("Q")
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def add(self, micros: float) -> None:
+        bucket = int(math.log1p(micros) / _LOG_GROWTH)
+        counts = self.counts
+        if bucket >= len(counts):
+            counts.extend([0] * (bucket + 1 - len(counts)))
+        counts[bucket] += 1
+        self.count += 1
+        self.total += micros
+        if micros < self.minimum:
+            self.minimum = micros
+        if micros > self.maximum:
+            self.maximum = micros
+
+    def percentile(self, fraction: float) -> float:
+        """Retorna o limite superior do balde que contém o percentil pedido (0 < fraction <= 1)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * fraction))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(math.expm1((bucket + 1) * _LOG_GROWTH), self.maximum)
+        return self.maximum
+
+
+class Metric:
+    """Contadores de uma operação: chamadas, erros, latência e alocações."""
+
+    __slots__ = ("count", "errors", "latency", "allocated")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.allocated = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(latency.total / latency.count / 1000, 4) if latency.count else 0.0,
+            "p50_ms": round(latency.percentile(0.50) / 1000, 4),
+            "p99_ms": round(latency.percentile(0.99) / 1000, 4),
+            "max_ms": round(latency.maximum / 1000, 4),
+            "allocated_bytes": self.allocated,
+        }
+
+
+def _traced_memory() -> int:
+    import tracemalloc
+    return tracemalloc.get_traced_memory()[0]
+
+
+class Instrumentation:
+    """Métricas opcionais por operação (comandos, carregamento e renderização).
+
+    Desligada por padrão: os pontos de medição só testam o atributo enabled e seguem adiante.
+    Com trace_allocations, usa o tracemalloc para somar a variação de memória de cada operação.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace_allocations = False
+        self.metrics: Dict[str, Metric] = {}
+        self.started_at = time.time()
+        # O mesmo lock de threading.Lock(), sem importar o threading na partida do motor
+        self._lock = _thread.allocate_lock()
+
+    def enable(self, trace_allocations: bool = False) -> None:
+        self.trace_allocations = trace_allocations
+        if trace_allocations:
+            # Importado só aqui: o tracemalloc pesa na importação do motor e quase nunca é usado
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self.trace_allocations:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+        self.trace_allocations = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.metrics = {}
+            self.started_at = time.time()
+
+    def begin(self) -> Tuple[float, int]:
+        """Marca o início de uma operação; o valor retornado deve ser passado para end()."""
+        allocated = _traced_memory() if self.trace_allocations else 0
+        return time.perf_counter(), allocated
+
+    def end(self, name: str, token: Tuple[float, int], error: bool = False) -> None:
+        """Registra uma operação iniciada por begin()."""
+        elapsed = time.perf_counter() - token[0]
+        allocated = _traced_memory() - token[1] if self.trace_allocations else 0
+        self.record(name, elapsed, allocated, error)
+
+    def record(self, name: str, seconds: float, allocated: int = 0, error: bool = False) -> None:
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric()
+            metric.count += 1
+            metric.errors += error
+            metric.latency.add(seconds * 1_000_000)
+            metric.allocated += allocated
+
+    def measure(self, name: str) -> "_Measurement":
+        """Context manager que registra a duração do bloco (ou nada, se a instrumentação estiver desligada)."""
+        return _Measurement(self, name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uma cópia das métricas acumuladas, pronta para virar JSON."""
+        with self._lock:
+            operations = {name: metric.snapshot() for name, metric in sorted(self.metrics.items())}
+        return {
+            "since": self.started_at,
+            "uptime_s": round(time.time() - self.started_at, 3),
+            "trace_allocations": self.trace_allocations,
+            "operations": operations,
+        }
+
+    def format_text(self) -> str:
+        """Tabela de texto com uma linha por operação."""
+        lines = [f"{'operação':<28} {'qtd':>8} {'erros':>6} {'p50 ms':>9} {'p99 ms':>9} {'máx ms':>9} {'alocado':>10}"]
+        for name, data in self.snapshot()["operations"].items():
+            lines.append(
+                f"{name:<28} {data['count']:>8} {data['errors']:>6} {data['p50_ms']:>9.3f} "
+                f"{data['p99_ms']:>9.3f} {data['max_ms']:>9.3f} {data['allocated_bytes']:>10}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: Optional[str] = None, fmt: str = "json", stream: Optional[TextIO] = None) -> None:
+        """Grava as métricas em um arquivo (substituído atomicamente) ou em um stream (stderr por padrão)."""
+        import json
+
+        text = json.dumps(self.snapshot(), ensure_ascii=False, indent=2) if fmt == "json" else self.format_text()
+        if path is None:
+            stream = stream or sys.stderr
+            stream.write(text + "\n")
+            stream.flush()
+            return
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf8") as f:
+            f.write(text + "\n")
+        os.replace(temp_path, path)
+
+
+class _Measurement:
+    __slots__ = ("instrumentation", "name", "token", "error")
+
+    def __init__(self, instrumentation: Instrumentation, name: str) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+        self.token = None
+        self.error = False
+
+    def __enter__(self) -> "_Measurement":
+        if self.instrumentation.enabled:
+            self.token = self.instrumentation.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if self.token is not None:
+            self.instrumentation.end(self.name, self.token, self.error or exc_type is not None)
+
+
+class PeriodicDump:
+    """Thread que grava as métricas a cada interval segundos, para coleta externa."""
+
+    def __init__(self, instrumentation: Instrumentation, interval: float = 60.0,
+                 path: Optional[str] = None, fmt: str = "json") -> None:
+        self.instrumentation = instrumentation
+        self.interval = interval
+        self.path = path
+        self.fmt = fmt
+        # Importado aqui: só quem grava as métricas periodicamente precisa do threading
+        import threading
+
+        self._stop = threading.Event()
+        self._thread: Optional["threading.Thread"] = None
+
+    def start(self) -> None:
+        import threading
+
+        self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.instrumentation.dump(self.path, self.fmt)
+
+    def stop(self) -> None:
+        """Para a thread e grava uma última vez."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.instrumentation.dump(self.path, self.fmt)
+
+
+# Instância do processo usada pelos pontos de medição do motor
+metrics = Instrumentation()
+
+
+def instrumented(name: str) -> Callable:
+    """Decorador que mede cada chamada da função quando a instrumentação está ligada."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            token = metrics.begin()
+            try:
+                value = func(*args, **kwargs)
+            except BaseException:
+                metrics.end(name, token, error=True)
+                raise
+            metrics.end(name, token)
+            return value
+        return wrapper
+    return decorator
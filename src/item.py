@@ -1,12 +1,14 @@
-from game_object import GameObject
+from game_object import GameObject, intern_name
 
 class Item(GameObject):
+    __slots__ = ("pickable", "location", "used", "item_type", "in_inventory")
+
     def __init__(self, name: str, description: str, location: str, pickable: bool = False, item_type: str = "generic"):
         super().__init__(name, description)
         self.pickable = pickable
-        self.location = location
+        self.location = intern_name(location)
         self.used = False
-        self.item_type = item_type
+        self.item_type = intern_name(item_type)
         self.in_inventory = False
 
     def examine(self):
@@ -38,6 +40,8 @@ class Item(GameObject):
 
 
 class Weapon(Item):
+    __slots__ = ("offense_bonus",)
+
     def __init__(self, name: str, description: str, location: str, pickable: bool = False, offense_bonus: int = 0):
         super().__init__(name, description, location, pickable, "weapon")
         self.offense_bonus = offense_bonus
@@ -47,6 +51,8 @@ class Weapon(Item):
 
 
 class Armor(Item):
+    __slots__ = ("defense_bonus",)
+
     def __init__(self, name: str, description: str, location: str, pickable: bool = False, defense_bonus: int = 0):
         super().__init__(name, description, location, pickable, "armor")
         self.defense_bonus = defense_bonus
@@ -56,6 +62,8 @@ class Armor(Item):
 
 
 class Key(Item):
+    __slots__ = ()
+
     def __init__(self, name: str, description: str, location: str, pickable: bool = False):
         super().__init__(name, description, location, pickable, "key")
         self.used = False
@@ -68,6 +76,8 @@ class Key(Item):
 
 
 class Potion(Item):
+    __slots__ = ("heal_amount",)
+
     def __init__(self, name: str, description: str, location: str, pickable: bool = False, heal_amount: int = 0):
         super().__init__(name, description, location, pickable, "potion")
         self.heal_amount = heal_amount
@@ -80,6 +90,8 @@ class Potion(Item):
 
 
 class QuestItem(Item):
+    __slots__ = ()
+
     def __init__(self, name: str, description: str, location: str, pickable: bool = False):
         super().__init__(name, description, location, pickable, "quest_item")
 
@@ -88,6 +100,8 @@ class QuestItem(Item):
 
 
 class Armer(Item):
+    __slots__ = ("item_in_use",)
+
     def __init__(self, name: str, description: str, location: str, pickable: bool = False):
         super().__init__(name, description, location, pickable)
         self.item_in_use = False
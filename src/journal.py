@@ -0,0 +1,207 @@
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from command_result import CommandResult, GameEvent, EVENT_SUCCESS
+from game_engine import GameEngine
+
+
+def journal_key(account: str) -> str:
+    """Nome de arquivo seguro para o journal de uma conta (o nome do jogador pode ter qualquer caractere)."""
+    return quote(account, safe="")
+
+
+def fsync_all(descriptors: Iterable[int]) -> None:
+    """Faz o fsync e fecha os descritores de detach_sync(); pode rodar em outra thread."""
+    for descriptor in descriptors:
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+class SessionJournal:
+    """Journal append-only dos comandos aceitos de uma sessão, com checkpoints compactos periódicos.
+
+    As entradas saem do buffer do Python a cada comando (uma queda do processo não as perde), mas
+    append() nunca faz fsync: quem hospeda as sessões chama sync_if_due() (ou detach_sync(), para
+    fazer o fsync em outra thread) periodicamente, e o fsync agrupa todas as entradas pendentes. Ele
+    fica devido quando sync_every entradas estão pendentes, ou sync_interval segundos depois da primeira.
+    """
+
+    def __init__(self, directory: str, session_id: str, sync_every: int = 64, sync_interval: float = 0.05) -> None:
+        self.directory = directory
+        self.session_id = session_id
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.journal_path = os.path.join(directory, f"{session_id}.journal")
+        self.checkpoint_path = os.path.join(directory, f"{session_id}.checkpoint")
+        self.sequence = 0
+        self.checkpoint_sequence = 0
+        self.pending = 0
+        self._first_pending_at = 0.0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self) -> None:
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf8")
+
+    @property
+    def sync_due(self) -> bool:
+        """Indica se as entradas pendentes já pedem fsync: sync_every delas, ou a primeira há sync_interval."""
+        if self.pending == 0:
+            return False
+        return self.pending >= self.sync_every or time.monotonic() - self._first_pending_at >= self.sync_interval
+
+    def append(self, command: str) -> int:
+        """Registra um comando aceito e retorna o seu número de sequência; só escreve, sem fsync."""
+        self._open()
+        self.sequence += 1
+        self._file.write(json.dumps({"seq": self.sequence, "cmd": command}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if self.pending == 0:
+            self._first_pending_at = time.monotonic()
+        self.pending += 1
+        return self.sequence
+
+    def sync(self) -> None:
+        """Grava em disco (fsync) todas as entradas pendentes."""
+        if self._file is None or self.pending == 0:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.pending = 0
+
+    def sync_if_due(self) -> bool:
+        """Faz o fsync se as entradas pendentes já esperaram sync_interval; retorna se fez."""
+        if not self.sync_due:
+            return False
+        self.sync()
+        return True
+
+    def detach_sync(self) -> Optional[int]:
+        """Prepara o fsync das entradas pendentes para ser feito fora da thread da sessão.
+
+        Retorna uma cópia do descritor do journal, que continua válida mesmo que o journal seja fechado
+        ou truncado por um checkpoint no meio tempo (passe-a para fsync_all()), ou None sem pendências.
+        """
+        if self._file is None or self.pending == 0:
+            return None
+        self._file.flush()
+        self.pending = 0
+        return os.dup(self._file.fileno())
+
+    def checkpoint(self, state: Dict) -> None:
+        """Grava o estado atual da sessão e descarta o journal que ele torna desnecessário."""
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w", encoding="utf8") as f:
+            json.dump({"seq": self.sequence, "state": state}, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.checkpoint_path)
+        self.checkpoint_sequence = self.sequence
+        # Entradas com seq <= checkpoint são ignoradas na leitura, então truncar depois é seguro
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        open(self.journal_path, "w", encoding="utf8").close()
+        self.pending = 0
+
+    def load(self) -> Tuple[Optional[Dict], List[str]]:
+        """Retorna o último checkpoint e os comandos registrados depois dele."""
+        state = None
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf8") as f:
+                data = json.load(f)
+            state = data["state"]
+            self.checkpoint_sequence = self.sequence = data["seq"]
+
+        tail: List[str] = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha incompleta de uma queda no meio da escrita
+                        break
+                    if entry["seq"] > self.checkpoint_sequence:
+                        tail.append(entry["cmd"])
+                        self.sequence = entry["seq"]
+        return state, tail
+
+    def close(self) -> None:
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JournaledSession:
+    """Sessão cujos comandos que alteram o estado são registrados no journal, com checkpoint a cada N comandos."""
+
+    def __init__(self, engine: GameEngine, journal: SessionJournal, checkpoint_every: int = 500) -> None:
+        self.engine = engine
+        self.journal = journal
+        self.checkpoint_every = checkpoint_every
+
+    @classmethod
+    def create(cls, engine: GameEngine, journal: SessionJournal, player_name: str,
+               checkpoint_every: int = 500) -> Tuple["JournaledSession", CommandResult]:
+        """Inicia uma sessão nova e grava o checkpoint inicial."""
+        result = engine.start(player_name)
+        session = cls(engine, journal, checkpoint_every)
+        if result.ok:
+            journal.checkpoint(engine.snapshot_state())
+        return session, result
+
+    @classmethod
+    def attach(cls, engine: GameEngine, journal: SessionJournal, checkpoint_every: int = 500) -> "JournaledSession":
+        """Passa a registrar uma sessão já em andamento (retomada de outra fonte), a partir de um checkpoint dela."""
+        journal.checkpoint(engine.snapshot_state())
+        return cls(engine, journal, checkpoint_every)
+
+    @classmethod
+    def restore(cls, engine: GameEngine, journal: SessionJournal,
+                checkpoint_every: int = 500) -> Optional["JournaledSession"]:
+        """Restaura a sessão do último checkpoint e reexecuta só a cauda do journal; None se não houver checkpoint."""
+        state, tail = journal.load()
+        return cls.replay(engine, journal, state, tail, checkpoint_every)
+
+    @classmethod
+    def replay(cls, engine: GameEngine, journal: SessionJournal, state: Optional[Dict], tail: List[str],
+               checkpoint_every: int = 500) -> Optional["JournaledSession"]:
+        """Como restore(), com o checkpoint e a cauda já lidos por journal.load() (por exemplo, em outra thread)."""
+        if state is None:
+            return None
+        engine.restore_state(state)
+        for command in tail:
+            engine.step(command)
+        return cls(engine, journal, checkpoint_every)
+
+    def step(self, command: str) -> CommandResult:
+        result = self.engine.step(command)
+        # Só comandos que mudaram o estado precisam ser reexecutados na restauração
+        if result.changes:
+            self.journal.append(command)
+            if self.journal.sequence - self.journal.checkpoint_sequence >= self.checkpoint_every:
+                self.journal.checkpoint(self.engine.snapshot_state())
+        return result
+
+    def close(self) -> None:
+        self.journal.close()
+
+
+def open_session(engine: GameEngine, directory: str, account: str,
+                 checkpoint_every: int = 500) -> Tuple[JournaledSession, CommandResult]:
+    """Retoma a sessão da conta pelo journal do diretório, ou inicia uma nova se ela ainda não tem checkpoint."""
+    journal = SessionJournal(directory, journal_key(account))
+    session = JournaledSession.restore(engine, journal, checkpoint_every)
+    if session is None:
+        return JournaledSession.create(engine, journal, account, checkpoint_every)
+    result = engine.step("olhar")
+    result.events.insert(0, GameEvent(EVENT_SUCCESS, f"Bem-vindo de volta, {account}!"))
+    return session, result
@@ -0,0 +1,138 @@
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import TYPE_CHECKING, Callable, Dict
+
+from game_object import GameObject
+from item import Item, Weapon, Armor, Key, Potion, QuestItem
+from character import Character, Player, NPC
+from place import Place
+
+if TYPE_CHECKING:
+    from world_template import WorldTemplate
+
+SAMPLE_SIZE = 5000
+# Sessões criadas para medir o custo de uma sessão e das cópias que ela faz do template
+SESSION_SAMPLES = 200
+DESCRIPTION = "Uma descrição compartilhada por todas as instâncias medidas."
+DIALOG = ["Olá, aventureiro!"]
+
+FACTORIES: Dict[str, Callable[[str], object]] = {
+    "GameObject": lambda name: GameObject(name, DESCRIPTION),
+    "Item": lambda name: Item(name, DESCRIPTION, "Floresta", True, "generic"),
+    "Weapon": lambda name: Weapon(name, DESCRIPTION, "Floresta", True, 10),
+    "Armor": lambda name: Armor(name, DESCRIPTION, "Floresta", True, 10),
+    "Key": lambda name: Key(name, DESCRIPTION, "Floresta", True),
+    "Potion": lambda name: Potion(name, DESCRIPTION, "Floresta", True, 20),
+    "QuestItem": lambda name: QuestItem(name, DESCRIPTION, "Floresta", True),
+    "Character": lambda name: Character(name, DESCRIPTION, "Floresta"),
+    "Player": lambda name: Player(name),
+    "NPC": lambda name: NPC(name, DESCRIPTION, "Floresta", DIALOG),
+    "Place": lambda name: Place(name, DESCRIPTION, ["Floresta", "Igreja"]),
+}
+
+
+def measure(factory: Callable[[str], object], count: int = SAMPLE_SIZE) -> float:
+    """Retorna os bytes alocados por objeto, sem contar os nomes (criados e internados antes da medição)."""
+    names = [sys.intern(f"Objeto {i}") for i in range(count)]
+    factory("aquecimento")
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(name) for name in names]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Desconta a lista que guarda os objetos
+    list_bytes = sys.getsizeof(objects)
+    return (after - before - list_bytes) / count
+
+
+def _traced(action: Callable[[], None]) -> int:
+    """Bytes alocados por action que continuam vivos ao fim dela, medidos com tracemalloc."""
+    gc.collect()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    action()
+    after = tracemalloc.get_traced_memory()[0]
+    if not tracing:
+        tracemalloc.stop()
+    return after - before
+
+
+def measure_session(template: "WorldTemplate", count: int = SESSION_SAMPLES) -> Dict[str, float]:
+    """Bytes de uma sessão iniciada sobre o template (engine, overlay, jogador e sink) e de cada cópia
+    própria de lugar, item ou NPC que ela faz, em média sobre count sessões.
+
+    As cópias são medidas em overlays vazios, uma por overlay, percorrendo as entradas do template; a
+    sessão base desconta as cópias que start() já fez.
+    """
+    # Importados aqui: o relatório por objeto não precisa do motor
+    from game_engine import GameEngine
+    from output_sink import BytesSink
+    from world_overlay import WorldOverlay
+
+    costs: Dict[str, float] = {}
+    for kind in ("places", "items", "npcs"):
+        keys = list(getattr(template, kind))
+        overlays = [WorldOverlay(template) for _ in range(count)]
+        if not keys:
+            costs[kind] = 0.0
+            continue
+        copies = [getattr(overlay, kind) for overlay in overlays]
+        costs[kind] = _traced(lambda: [copy.mutable(keys[i % len(keys)]) for i, copy in enumerate(copies)]) / count
+
+    names = [sys.intern(f"Jogador {i}") for i in range(count)]
+    GameEngine(template, sink=BytesSink()).start("aquecimento")
+    engines = []
+
+    def start_sessions() -> None:
+        for name in names:
+            engine = GameEngine(template, sink=BytesSink())
+            engine.start(name)
+            engine.sink.drain()
+            engines.append(engine)
+
+    total = _traced(start_sessions) - sys.getsizeof(engines)
+    for engine in engines:
+        overlay = engine.world_overlay
+        total -= sum(len(getattr(overlay, kind).owned()) * costs[kind] for kind in costs)
+    return {"session": total / count, "place_copy": costs["places"], "item_copy": costs["items"],
+            "npc_copy": costs["npcs"]}
+
+
+def report(count: int = SAMPLE_SIZE) -> Dict[str, float]:
+    """Mede os bytes por objeto de cada classe da hierarquia."""
+    return {name: measure(factory, count) for name, factory in FACTORIES.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Relatório de memória por objeto da hierarquia GameObject.")
+    parser.add_argument("--count", type=int, default=SAMPLE_SIZE)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    parser.add_argument("--session", metavar="WORLD", help="também mede uma sessão sobre este world.json")
+    args = parser.parse_args()
+
+    results = report(args.count)
+    session = None
+    if args.session:
+        # Importado aqui: o relatório por objeto não precisa do mundo
+        from world_template import WorldTemplate
+        session = measure_session(WorldTemplate.load(args.session))
+    if args.json:
+        output = {"bytes_per_object": results}
+        if session is not None:
+            output["session_bytes"] = session
+        print(json.dumps(output, indent=2))
+    else:
+        for name, size in results.items():
+            print(f"{name:<12} {size:8.1f} bytes/objeto")
+        for name, size in (session or {}).items():
+            print(f"sessão/{name:<12} {size:8.1f} bytes")
+
+
+if __name__ == "__main__":
+    main()
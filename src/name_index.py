@@ -0,0 +1,197 @@
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Quantos candidatos (os que mais compartilham trigramas) passam pela distância de edição
+MAX_TYPO_CANDIDATES = 32
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> str:
+    """Chave de busca de um nome: sem acentos, em casefold e com espaços normalizados ("Poção" -> "pocao")."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+@lru_cache(maxsize=65536)
+def trigrams(text: str) -> Tuple[str, ...]:
+    return tuple({text[i:i + 3] for i in range(len(text) - 2)})
+
+
+def typo_limit(key: str) -> int:
+    """Quantas edições são toleradas para uma consulta desse tamanho."""
+    if len(key) <= 4:
+        return 1
+    return 2 if len(key) <= 8 else 3
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Distância de Damerau-Levenshtein (transposição adjacente) limitada a limit.
+
+    Só calcula a faixa da matriz a até limit da diagonal e para assim que a faixa inteira passa do limite;
+    qualquer resultado acima de limit é devolvido como limit + 1.
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > limit:
+        return limit + 1
+    over = limit + 1
+    previous2: List[int] = []
+    previous = [j if j <= limit else over for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        low, high = max(1, i - limit), min(len_b, i + limit)
+        current = [over] * (len_b + 1)
+        current[0] = i if i <= limit else over
+        char = a[i - 1]
+        row_min = current[0]
+        for j in range(low, high + 1):
+            value = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1] and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value if value < over else over
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous2, previous = previous, current
+    return previous[len_b]
+
+
+def _is_word_prefix(query: str, key: str) -> bool:
+    """Indica se cada palavra da consulta começa uma palavra do nome, na mesma ordem ("esp enf" -> "espada enferrujada")."""
+    words = key.split()
+    position = 0
+    for part in query.split():
+        while position < len(words) and not words[position].startswith(part):
+            position += 1
+        if position == len(words):
+            return False
+        position += 1
+    return True
+
+
+class NameIndex:
+    """Índice de nomes normalizados para os nomes originais, atualizado a cada inclusão ou remoção.
+
+    Além da busca exata, resolve nomes parciais e com erros de digitação por um índice de trigramas,
+    criado na primeira busca aproximada e depois mantido junto com os nomes.
+    """
+
+    __slots__ = ("_names", "_grams")
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._names: Dict[str, str] = {normalize_name(name): name for name in names}
+        self._grams: Optional[Dict[str, Set[str]]] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str) -> None:
+        key = normalize_name(name)
+        if self._grams is not None and key not in self._names:
+            for gram in trigrams(f" {key} "):
+                self._grams.setdefault(gram, set()).add(key)
+        self._names[key] = name
+
+    def remove(self, name: str) -> None:
+        key = normalize_name(name)
+        if self._names.get(key) == name:
+            del self._names[key]
+            if self._grams is not None:
+                for gram in trigrams(f" {key} "):
+                    keys = self._grams.get(gram)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del self._grams[gram]
+
+    def get(self, query: str) -> Optional[str]:
+        """Retorna o nome original que corresponde à consulta, ignorando caixa e acentos."""
+        return self._names.get(normalize_name(query))
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Como get(), mas também aceita nomes parciais ou com erros de digitação, desde que sem ambiguidade."""
+        key = normalize_name(query)
+        name = self._names.get(key)
+        if name is not None:
+            return name
+        matches = self._matches(key)
+        return self._names[matches[0]] if len(matches) == 1 else None
+
+    def suggestions(self, query: str, limit: int = 3) -> List[str]:
+        """Nomes parecidos com a consulta, para sugerir ao jogador quando resolve() não decide."""
+        return [self._names[key] for key in self._matches(normalize_name(query))[:limit]]
+
+    def _build_grams(self) -> Dict[str, Set[str]]:
+        grams: Dict[str, Set[str]] = {}
+        for key in self._names:
+            for gram in trigrams(f" {key} "):
+                grams.setdefault(gram, set()).add(key)
+        self._grams = grams
+        return grams
+
+    def _matches(self, key: str) -> List[str]:
+        """Chaves que correspondem à consulta: primeiro por prefixo de palavras, depois por distância de edição."""
+        if len(key) < 2 or not self._names:
+            return []
+        grams = self._grams if self._grams is not None else self._build_grams()
+
+        def frequency(gram: str) -> int:
+            return len(grams.get(gram, ()))
+
+        # Prefixos de palavras: as chaves precisam conter os trigramas de " palavra" de cada palavra da consulta
+        prefix_grams = sorted({gram for word in key.split() for gram in trigrams(f" {word}")}, key=frequency)
+        if prefix_grams:
+            candidates = grams.get(prefix_grams[0], set())
+            for gram in prefix_grams[1:]:
+                if not candidates:
+                    break
+                candidates = candidates & grams[gram]
+        else:
+            candidates = self._names.keys()
+        partial = sorted((candidate for candidate in candidates if _is_word_prefix(key, candidate)), key=len)
+        if partial:
+            return partial
+
+        # Erros de digitação: candidatos que mais compartilham trigramas, conferidos pela distância de edição.
+        # Cada edição destrói no máximo 3 trigramas, então quem está a limit edições compartilha ao menos
+        # len(query_grams) - 3 * limit deles e tem algum dos 3 * limit + 1 mais raros: só esses são contados.
+        limit = typo_limit(key)
+        query_grams = sorted(trigrams(f" {key} "), key=frequency)
+        rare = 3 * limit + 1 if len(query_grams) > 3 * limit else len(query_grams)
+        shared: Counter = Counter()
+        for gram in query_grams[:rare]:
+            shared.update(grams.get(gram, ()))
+        for gram in query_grams[rare:]:
+            keys = grams.get(gram)
+            if keys:
+                for candidate in shared:
+                    if candidate in keys:
+                        shared[candidate] += 1
+        single_word = " " not in key
+        best, best_distance = [], limit + 1
+        for candidate, count in shared.most_common(MAX_TYPO_CANDIDATES):
+            bound = min(limit, best_distance)
+            if count < len(query_grams) - 3 * bound:
+                break
+            distance = edit_distance(key, candidate, bound)
+            if single_word and distance > bound:
+                # Uma palavra só também vale contra cada palavra do nome ("elmo" -> "elmo de ferro")
+                distance = min(edit_distance(key, word, bound) for word in candidate.split())
+            if distance < best_distance:
+                best, best_distance = [candidate], distance
+            elif distance == best_distance and distance <= limit:
+                best.append(candidate)
+        return best
+
+    def copy(self) -> "NameIndex":
+        index = NameIndex()
+        index._names = dict(self._names)
+        return index
@@ -0,0 +1,94 @@
+import sys
+from typing import Optional, TextIO
+
+from command_result import CommandResult, GameEvent
+from text_formatter import TextFormatter, PlainTextFormatter, init_terminal
+
+
+class OutputSink:
+    """Destino da saída do jogo: acumula o texto de um turno inteiro e o envia de uma vez em flush()."""
+
+    def __init__(self, formatter: Optional[TextFormatter] = None) -> None:
+        self.formatter = formatter or PlainTextFormatter()
+        self._parts: list = []
+
+    def write(self, text: str, end: str = "\n") -> None:
+        """Acumula um texto, com a mesma semântica de print()."""
+        self._parts.append(text)
+        if end:
+            self._parts.append(end)
+
+    def write_event(self, event: GameEvent) -> None:
+        self.write(self.formatter.format_event(event))
+
+    def write_result(self, result: CommandResult) -> None:
+        """Acumula todos os eventos de um resultado de comando."""
+        format_event = self.formatter.format_event
+        for event in result.events:
+            self._parts.append(format_event(event))
+            self._parts.append("\n")
+
+    def getvalue(self) -> str:
+        """Retorna o texto acumulado e ainda não enviado."""
+        return "".join(self._parts)
+
+    def flush(self) -> None:
+        """Envia o texto acumulado em uma única escrita."""
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts.clear()
+            self._write_out(text)
+
+    def _write_out(self, text: str) -> None:
+        raise NotImplementedError
+
+
+class StreamSink(OutputSink):
+    """Saída para um stream de texto (sys.stdout por padrão)."""
+
+    def __init__(self, stream: Optional[TextIO] = None, formatter: Optional[TextFormatter] = None) -> None:
+        super().__init__(formatter)
+        self.stream = stream
+
+    def _write_out(self, text: str) -> None:
+        # sys.stdout é lido a cada flush porque o colorama pode tê-lo substituído
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+
+class TerminalSink(StreamSink):
+    """Saída colorida para o terminal interativo."""
+
+    def __init__(self, stream: Optional[TextIO] = None, formatter: Optional[TextFormatter] = None) -> None:
+        init_terminal()
+        super().__init__(stream, formatter or TextFormatter())
+
+
+class PlainTextSink(StreamSink):
+    """Saída de texto puro, sem códigos de cor, para pipes e captura de logs."""
+
+    def __init__(self, stream: Optional[TextIO] = None, formatter: Optional[TextFormatter] = None) -> None:
+        super().__init__(stream, formatter or PlainTextFormatter())
+
+
+class BytesSink(OutputSink):
+    """Saída em buffer de bytes para sockets: o servidor envia o conteúdo com uma escrita por turno."""
+
+    def __init__(self, formatter: Optional[TextFormatter] = None, encoding: str = "utf8", newline: str = "\r\n") -> None:
+        super().__init__(formatter or PlainTextFormatter())
+        self.encoding = encoding
+        self.newline = newline
+        self.buffer = bytearray()
+
+    def _write_out(self, text: str) -> None:
+        if self.newline != "\n":
+            text = text.replace("\n", self.newline)
+        self.buffer += text.encode(self.encoding)
+
+    def drain(self) -> bytes:
+        """Envia o texto pendente para o buffer e retorna (e esvazia) os bytes acumulados."""
+        self.flush()
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
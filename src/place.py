@@ -1,13 +1,36 @@
-from game_object import GameObject
+from game_object import GameObject, intern_name
 from item import Item
 from character import Character
+from name_index import NameIndex
 
 class Place(GameObject):
+    # Os índices de nomes são criados na primeira busca e depois mantidos por add_*/remove_*;
+    # a descrição renderizada fica em cache até que itens ou personagens mudem
+    __slots__ = (
+        "takes_to", "items", "characters", "_items_index", "_characters_index", "_takes_to_index",
+        "version", "_description_cache",
+    )
+
     def __init__(self, name: str, description: str, takes_to: list[str] = None):
         super().__init__(name, description)
-        self.takes_to = takes_to or []
+        self.takes_to = [intern_name(place) for place in takes_to or []]
         self.items: dict[str, Item] = {}
         self.characters: dict[str, Character] = {}
+        self._items_index: NameIndex = None
+        self._characters_index: NameIndex = None
+        self._takes_to_index: NameIndex = None
+        self.version = 0
+        self._description_cache: str = None
+
+    def clone(self) -> "Place":
+        place = super().clone()
+        place.items = dict(self.items)
+        place.characters = dict(self.characters)
+        if self._items_index is not None:
+            place._items_index = self._items_index.copy()
+        if self._characters_index is not None:
+            place._characters_index = self._characters_index.copy()
+        return place
 
     def get_description(self) -> str:
         return self.description
@@ -18,42 +41,114 @@ class Place(GameObject):
     def get_takes_to(self) -> list[str]:
         return self.takes_to
     
+    def update(self, description: str, takes_to: list[str]) -> None:
+        """Troca a descrição e as saídas (recarregamento do mundo), mantendo itens e personagens."""
+        self.description = description
+        self.takes_to = [intern_name(place) for place in takes_to]
+        self._takes_to_index = None
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Marca o conteúdo do local como alterado, descartando a descrição em cache."""
+        self.version += 1
+        self._description_cache = None
+
     def add_item(self, item: Item) -> None:
         self.items[item.name] = item
+        self.invalidate()
+        if self._items_index is not None:
+            self._items_index.add(item.name)
     
     def remove_item(self, item_name: str) -> Item:
-        return self.items.pop(item_name, None)
+        item = self.items.pop(item_name, None)
+        if item is not None:
+            self.invalidate()
+            if self._items_index is not None:
+                self._items_index.remove(item_name)
+        return item
     
     def add_character(self, character: Character) -> None:
         self.characters[character.name] = character
+        self.invalidate()
+        if self._characters_index is not None:
+            self._characters_index.add(character.name)
     
     def remove_character(self, character_name: str) -> Character:
-        return self.characters.pop(character_name, None)
+        character = self.characters.pop(character_name, None)
+        if character is not None:
+            self.invalidate()
+            if self._characters_index is not None:
+                self._characters_index.remove(character_name)
+        return character
+
+    def _item_names(self) -> NameIndex:
+        if self._items_index is None:
+            self._items_index = NameIndex(self.items)
+        return self._items_index
+
+    def _character_names(self) -> NameIndex:
+        if self._characters_index is None:
+            self._characters_index = NameIndex(self.characters)
+        return self._characters_index
+
+    def _destination_names(self) -> NameIndex:
+        if self._takes_to_index is None:
+            self._takes_to_index = NameIndex(self.takes_to)
+        return self._takes_to_index
+
+    def find_item(self, name: str) -> str:
+        """Retorna o nome original do item deste local, tolerando acentos, nomes parciais e erros de digitação."""
+        return self._item_names().resolve(name)
+
+    def find_character(self, name: str) -> str:
+        """Retorna o nome original do personagem deste local, tolerando acentos, nomes parciais e erros de digitação."""
+        return self._character_names().resolve(name)
+
+    def find_destination(self, name: str) -> str:
+        """Retorna o nome original de um lugar acessível a partir daqui, com a mesma tolerância de find_item."""
+        return self._destination_names().resolve(name)
+
+    def suggest_items(self, name: str) -> list[str]:
+        return self._item_names().suggestions(name)
+
+    def suggest_characters(self, name: str) -> list[str]:
+        return self._character_names().suggestions(name)
+
+    def suggest_destinations(self, name: str) -> list[str]:
+        return self._destination_names().suggestions(name)
     
     def get_items_description(self) -> str:
         if not self.items:
             return "Não há itens aqui."
         
-        items_text = "Itens neste local:\n"
-        for item_name, item in self.items.items():
-            items_text += f"- {item_name}: {item.description}\n"
-        return items_text
+        lines = ["Itens neste local:"]
+        lines.extend(f"- {item_name}: {item.description}" for item_name, item in self.items.items())
+        return "\n".join(lines) + "\n"
     
-    def get_characters_description(self) -> str:
-        if not self.characters:
+    def get_characters_description(self, characters: dict[str, Character] = None) -> str:
+        characters = self.characters if characters is None else characters
+        if not characters:
             return "Não há personagens aqui."
         
-        characters_text = "Personagens neste local:\n"
-        for char_name, character in self.characters.items():
-            characters_text += f"- {char_name}: {character.description}\n"
-        return characters_text
-    
-    def get_full_description(self) -> str:
-        description = f"\n{self.name}\n"
-        description += f"{self.description}\n\n"
-        description += self.get_items_description() + "\n"
-        description += self.get_characters_description() + "\n"
-        description += "Lugares acessíveis:\n"
-        for place in self.takes_to:
-            description += f"- {place}\n"
-        return description
+        lines = ["Personagens neste local:"]
+        lines.extend(f"- {char_name}: {character.description}" for char_name, character in characters.items())
+        return "\n".join(lines) + "\n"
+    
+    def get_full_description(self, characters: dict[str, Character] = None) -> str:
+        """Descrição completa do local; characters substitui os personagens dele (os NPCs que o relógio do
+        mundo pôs aqui), e esse texto não fica em cache."""
+        if characters is not None:
+            return self._render_description(characters)
+        if self._description_cache is None:
+            self._description_cache = self._render_description(self.characters)
+        return self._description_cache
+
+    def _render_description(self, characters: dict[str, Character]) -> str:
+        parts = [
+            f"\n{self.name}\n{self.description}\n\n",
+            self.get_items_description(), "\n",
+            self.get_characters_description(characters), "\n",
+            "Lugares acessíveis:\n",
+        ]
+        parts.extend(f"- {place}\n" for place in self.takes_to)
+        return "".join(parts)
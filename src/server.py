@@ -0,0 +1,444 @@
+import argparse
+import asyncio
+import functools
+import signal
+import sys
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from game_engine import GameEngine, find_world_path
+from instrumentation import PeriodicDump, metrics
+from journal import JournaledSession, SessionJournal, fsync_all, journal_key
+from output_sink import BytesSink
+from session_store import SessionStore
+from world_reload import WorldDiff, reload_file
+from world_template import WorldTemplate
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4000
+
+
+class SessionProtocol:
+    """Diálogo de uma sessão, independente de E/S: primeiro o nome do jogador, depois os comandos.
+
+    Recebe uma linha por vez e escreve as respostas no sink do engine; quem o usa decide como enviá-las.
+    Com um SessionStore, o nome do jogador identifica a conta: uma conta salva é retomada, e o estado é
+    salvo depois de cada comando que o altera. Com journal_dir, os comandos que alteram o estado também
+    entram no journal da conta (JournaledSession), que é retomado antes do store por ser mais recente.
+
+    A E/S bloqueante do nome fica fora de feed(): prefetch() lê o journal e o store, e write_checkpoint()
+    grava o checkpoint inicial de uma conta que ainda não tinha journal. O servidor chama as duas fora
+    do loop de eventos; quem não as chama tem a leitura feita por feed() e o checkpoint pelo próximo
+    feed() ou por close().
+
+    Não há autenticação: o nome digitado é a conta, então qualquer cliente que digite o nome de uma conta
+    existente a retoma (e passa a salvar sobre ela). Não exponha o servidor com store ou journal_dir fora
+    de uma rede confiável.
+    """
+
+    def __init__(self, engine: GameEngine, store: Optional[SessionStore] = None,
+                 journal_dir: Optional[str] = None) -> None:
+        self.engine = engine
+        self.sink = engine.sink
+        self.store = store
+        self.journal_dir = journal_dir
+        self.journaled: Optional[JournaledSession] = None
+        self.account: Optional[str] = None
+        self.started = False
+        # (nome, journal, checkpoint, cauda do journal, estado do store) lidos por prefetch() para o próximo feed()
+        self._prefetched: Optional[Tuple[str, Optional[SessionJournal], Optional[Dict], List[str],
+                                         Optional[Dict]]] = None
+        # Estado que write_checkpoint() grava como primeiro checkpoint do journal da conta
+        self._checkpoint: Optional[Dict] = None
+
+    def open(self) -> None:
+        """Escreve a abertura da sessão: título e pedido do nome."""
+        self.sink.write(self.sink.formatter.format_game_title())
+        self.sink.write("Digite seu nome (ou 'sair' para encerrar): ", end="")
+
+    def resume(self, state: Dict) -> None:
+        """Retoma uma sessão já iniciada a partir de um estado de snapshot_state().
+
+        Com journal_dir, o checkpoint que reabre o journal da conta fica para write_checkpoint().
+        """
+        self.engine.restore_state(state)
+        self.account = state["player"]["name"]
+        self.started = True
+        if self.journal_dir is not None:
+            self.journaled = JournaledSession(self.engine, self._journal(self.account))
+            self._checkpoint = self.engine.snapshot_state()
+
+    def _journal(self, account: str) -> SessionJournal:
+        return SessionJournal(self.journal_dir, journal_key(account))
+
+    def sync_journal(self) -> Optional[int]:
+        """Descritor para o fsync das entradas do journal que já esperaram demais (ver SessionJournal.detach_sync)."""
+        if self.journaled is None or not self.journaled.journal.sync_due:
+            return None
+        return self.journaled.journal.detach_sync()
+
+    @property
+    def checkpoint_pending(self) -> bool:
+        """Indica se há um checkpoint inicial esperando write_checkpoint()."""
+        return self._checkpoint is not None
+
+    def write_checkpoint(self) -> None:
+        """Grava (com fsync) o checkpoint inicial pendente no journal da conta; pode rodar em outra thread."""
+        state, self._checkpoint = self._checkpoint, None
+        if state is not None and self.journaled is not None:
+            self.journaled.journal.checkpoint(state)
+
+    def close(self) -> None:
+        """Grava o que estiver pendente no journal e o fecha; a sessão não recebe mais linhas depois disso."""
+        self.write_checkpoint()
+        if self.journaled is not None:
+            self.journaled.close()
+            self.journaled = None
+
+    def prefetch(self, line: str) -> None:
+        """Lê o journal e o estado salvo da conta, se a linha for o nome do jogador.
+
+        O servidor a chama fora do loop de eventos antes de feed(), que usa o que já foi lido. Sem
+        prefetch(), feed() faz essa leitura ele mesmo.
+        """
+        if self.started or not line or line.lower() == "sair":
+            return
+        self._prefetched = self._load(line)
+
+    def _load(self, name: str) -> Tuple[str, Optional[SessionJournal], Optional[Dict], List[str], Optional[Dict]]:
+        journal = self._journal(name) if self.journal_dir is not None else None
+        checkpoint, tail = journal.load() if journal is not None else (None, [])
+        # O journal é mais recente que o store: só sem checkpoint o store é consultado
+        state = self.store.load(name) if checkpoint is None and self.store is not None else None
+        return name, journal, checkpoint, tail, state
+
+    def feed(self, line: str) -> bool:
+        """Processa uma linha do cliente e retorna se a sessão continua."""
+        if not self.started:
+            return self._feed_name(line)
+        # O checkpoint inicial tem que chegar ao journal antes do primeiro comando registrado nele
+        self.write_checkpoint()
+        formatter = self.sink.formatter
+        result = self.journaled.step(line) if self.journaled is not None else self.engine.step(line)
+        if self.store is not None and result.changes:
+            self.store.save(self.account, self.engine.snapshot_state())
+        if not result.running:
+            self.sink.write(formatter.format_farewell())
+            return False
+        self.sink.write_result(result)
+        self.sink.write(formatter.format_input_prompt(), end="")
+        return True
+
+    def _feed_name(self, name: str) -> bool:
+        if name.lower() == "sair":
+            return False
+        if not name:
+            self.sink.write(self.sink.formatter.format_error("Por favor, digite um nome válido."))
+            return True
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is None or prefetched[0] != name:
+            prefetched = self._load(name)
+        _, journal, checkpoint, tail, state = prefetched
+        journaled = JournaledSession.replay(self.engine, journal, checkpoint, tail) if journal is not None else None
+        if journaled is None and state is not None:
+            self.engine.restore_state(state)
+        if journaled is not None or state is not None:
+            self.sink.write(self.sink.formatter.format_success(f"Bem-vindo de volta, {name}!"))
+            result = self.engine.step("olhar")
+        else:
+            result = self.engine.start(name)
+        self.sink.write_result(result)
+        self.sink.write(self.sink.formatter.format_input_prompt(), end="")
+        self.started = result.ok
+        if not result.ok:
+            return False
+        self.account = name
+        if journal is not None and journaled is None:
+            journaled = JournaledSession(self.engine, journal)
+            self._checkpoint = self.engine.snapshot_state()
+        self.journaled = journaled
+        if self.store is not None and state is None:
+            self.store.save(name, self.engine.snapshot_state())
+        return True
+
+
+class Session:
+    """Uma conexão de jogador com o seu próprio GameEngine (Player e current_place)."""
+
+    def __init__(self, session_id: int, writer: asyncio.StreamWriter, engine: Optional[GameEngine] = None,
+                 store: Optional[SessionStore] = None, journal_dir: Optional[str] = None) -> None:
+        self.session_id = session_id
+        self.writer = writer
+        self.engine = engine
+        self.sink = engine.sink if engine is not None else None
+        self.protocol = SessionProtocol(engine, store, journal_dir) if engine is not None else None
+        self.commands = 0
+
+    @property
+    def peer(self) -> str:
+        return str(self.writer.get_extra_info("peername"))
+
+
+class GameServer:
+    """Servidor asyncio de protocolo por linhas que multiplexa várias sessões em um único loop."""
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_sessions: int = 1000,
+        idle_timeout: Optional[float] = 600.0,
+        drain_timeout: float = 10.0,
+        write_buffer_limit: int = 64 * 1024,
+        max_line_length: int = 1024,
+        engine_factory: Callable[..., GameEngine] = GameEngine,
+        store: Optional[SessionStore] = None,
+        journal_dir: Optional[str] = None,
+        journal_sync_interval: float = 0.05,
+        tick_interval: Optional[float] = None,
+        template: Optional[WorldTemplate] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.drain_timeout = drain_timeout
+        self.write_buffer_limit = write_buffer_limit
+        self.max_line_length = max_line_length
+        self.engine_factory = engine_factory
+        self.store = store
+        self.journal_dir = journal_dir
+        self.journal_sync_interval = journal_sync_interval
+        # Com tick_interval, o relógio do mundo compartilhado (WorldTemplate.scheduler) anda sozinho nesse ritmo
+        self.tick_interval = tick_interval
+        # Mundo em que as sessões são criadas; sem ele, o do world.json padrão (ver world_template)
+        self.template = template
+        self.sessions: Dict[int, Session] = {}
+        self.rejected_sessions = 0
+        self._next_session_id = 1
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._journal_task: Optional[asyncio.Task] = None
+        self._clock_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Abre o socket de escuta e retorna o servidor asyncio."""
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, limit=self.max_line_length
+        )
+        # Com porta 0 o sistema escolhe uma porta livre
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.journal_dir is not None:
+            self._journal_task = asyncio.ensure_future(self._sync_journals())
+        if self.tick_interval is not None:
+            self._clock_task = asyncio.ensure_future(self._run_world_clock())
+        return self._server
+
+    @property
+    def world_template(self) -> WorldTemplate:
+        """Mundo compartilhado pelas sessões deste servidor, carregado na primeira vez se não foi dado."""
+        if self.template is None:
+            self.template = WorldTemplate.shared(find_world_path())
+        return self.template
+
+    async def serve_forever(self) -> None:
+        """Inicia o servidor e atende conexões até ser cancelado."""
+        server = self._server or await self.start()
+        async with server:
+            await server.serve_forever()
+
+    async def close(self) -> None:
+        """Para de aceitar conexões e encerra as sessões abertas."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._journal_task is not None:
+            self._journal_task.cancel()
+            self._journal_task = None
+        if self._clock_task is not None:
+            self._clock_task.cancel()
+            self._clock_task = None
+        for session in list(self.sessions.values()):
+            session.writer.close()
+
+    def _protocols(self) -> Iterable[SessionProtocol]:
+        """Sessões abertas neste processo, para o fsync periódico dos journals."""
+        return [session.protocol for session in self.sessions.values() if session.protocol is not None]
+
+    async def _sync_journals(self) -> None:
+        """Faz o fsync dos journals com entradas pendentes há mais de journal_sync_interval.
+
+        Sem isso, as últimas entradas de uma sessão que ficou ociosa esperariam por um próximo comando.
+        O fsync roda em outra thread para não parar o loop.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.journal_sync_interval)
+            descriptors = [descriptor for descriptor in (protocol.sync_journal() for protocol in self._protocols())
+                           if descriptor is not None]
+            if descriptors:
+                await loop.run_in_executor(None, fsync_all, descriptors)
+
+    async def _run_world_clock(self) -> None:
+        """Avança o relógio do mundo a cada tick_interval segundos, com ou sem comandos dos jogadores.
+
+        Um tick só percorre os NPCs que se movem nele; cada sessão vê as mudanças do lugar em que está
+        no seu próximo comando.
+        """
+        scheduler = self.world_template.scheduler
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            scheduler.tick()
+
+    async def _send(self, writer: asyncio.StreamWriter, data: bytes) -> None:
+        """Envia ao cliente a saída de um turno em uma escrita, aguardando o buffer esvaziar (backpressure)."""
+        if data:
+            writer.write(data)
+        await asyncio.wait_for(writer.drain(), self.drain_timeout)
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> Optional[str]:
+        """Lê uma linha do cliente, ou None se a conexão terminou ou ficou ociosa."""
+        try:
+            data = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+            return None
+        if not data:
+            return None
+        return data.decode("utf8", errors="replace").strip()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende um cliente do início ao fim da sessão."""
+        writer.transport.set_write_buffer_limits(high=self.write_buffer_limit)
+        if len(self.sessions) >= self.max_sessions:
+            self.rejected_sessions += 1
+            sink = BytesSink()
+            sink.write(sink.formatter.format_error("Servidor cheio. Tente novamente mais tarde."))
+            try:
+                await self._send(writer, sink.drain())
+            except (ConnectionError, asyncio.TimeoutError):
+                pass
+            await self._close_writer(writer)
+            return
+
+        session = self._create_session(self._next_session_id, writer)
+        self._next_session_id += 1
+        self.sessions[session.session_id] = session
+        try:
+            await self._run_session(session, reader)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            del self.sessions[session.session_id]
+            await self._close_session(session)
+            await self._close_writer(writer)
+
+    def reload_world(self, path: Optional[str] = None) -> WorldDiff:
+        """Recarrega o world.json no mundo compartilhado pelas sessões, sem derrubá-las."""
+        return reload_file(self.world_template, path or find_world_path())
+
+    def _create_session(self, session_id: int, writer: asyncio.StreamWriter) -> Session:
+        return Session(session_id, writer, self.engine_factory(template=self.world_template, sink=BytesSink()), self.store, self.journal_dir)
+
+    async def _close_session(self, session: Session) -> None:
+        """Libera os recursos da sessão depois que a conexão terminou (o fsync final do journal fica fora do loop)."""
+        if session.protocol is not None:
+            await asyncio.get_running_loop().run_in_executor(None, session.protocol.close)
+
+    async def _open(self, session: Session) -> bytes:
+        """Retorna a abertura da sessão, já codificada."""
+        session.protocol.open()
+        return session.sink.drain()
+
+    async def _feed(self, session: Session, line: str) -> Tuple[bytes, bool]:
+        """Processa uma linha do cliente e retorna a resposta codificada e se a sessão continua."""
+        running = await self._feed_protocol(session, session.protocol, line)
+        return session.sink.drain(), running
+
+    async def _feed_protocol(self, session: Session, protocol: SessionProtocol, line: str) -> bool:
+        """Passa a linha ao protocolo com a E/S do nome do jogador (journal, store e checkpoint) fora do loop."""
+        if protocol.started:
+            session.commands += 1
+            return protocol.feed(line)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, protocol.prefetch, line)
+        running = protocol.feed(line)
+        if protocol.checkpoint_pending:
+            await loop.run_in_executor(None, protocol.write_checkpoint)
+        return running
+
+    async def _run_session(self, session: Session, reader: asyncio.StreamReader) -> None:
+        """Conduz o diálogo de uma sessão: nome do jogador e depois comandos."""
+        await self._send(session.writer, await self._open(session))
+        while True:
+            line = await self._read_line(reader)
+            if line is None:
+                return
+            data, running = await self._feed(session, line)
+            await self._send(session.writer, data)
+            if not running:
+                return
+
+    async def _close_writer(self, writer: asyncio.StreamWriter) -> None:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor multi-sessão da aventura textual.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--idle-timeout", type=float, default=600.0)
+    parser.add_argument("--metrics", action="store_true", help="liga as métricas por comando")
+    parser.add_argument("--metrics-allocations", action="store_true", help="inclui alocações (tracemalloc)")
+    parser.add_argument("--metrics-interval", type=float, default=60.0, help="segundos entre gravações das métricas")
+    parser.add_argument("--metrics-file", help="arquivo das métricas (padrão: stderr)")
+    parser.add_argument("--metrics-format", choices=("json", "text"), default="json")
+    parser.add_argument("--admin", action="store_true", help="aceita os comandos de administração ('onde', 'consultar')")
+    parser.add_argument("--store", help="banco SQLite das contas; sem ele as sessões não são persistidas "
+                        "(sem autenticação: o nome digitado é a conta)")
+    parser.add_argument("--store-flush-interval", type=float, default=0.5, help="segundos entre gravações em lote")
+    parser.add_argument("--journal-dir", help="diretório dos journals das contas (comandos desde o último checkpoint)")
+    parser.add_argument("--journal-sync-interval", type=float, default=0.05, help="segundos até o fsync do journal")
+    parser.add_argument("--npcs", action="store_true", help="os NPCs andam pelo mapa, um tick a cada --tick-interval")
+    parser.add_argument("--tick-interval", type=float, default=1.0, help="segundos entre ticks do relógio do mundo")
+    args = parser.parse_args()
+
+    dump = None
+    if args.metrics or args.metrics_allocations:
+        metrics.enable(trace_allocations=args.metrics_allocations)
+        dump = PeriodicDump(metrics, args.metrics_interval, args.metrics_file, args.metrics_format)
+        dump.start()
+
+    engine_factory = functools.partial(GameEngine, admin=args.admin, simulate_npcs=args.npcs)
+    store = SessionStore(args.store, args.store_flush_interval) if args.store else None
+    server = GameServer(args.host, args.port, args.max_sessions, args.idle_timeout, engine_factory=engine_factory,
+                        store=store, journal_dir=args.journal_dir, journal_sync_interval=args.journal_sync_interval,
+                        tick_interval=args.tick_interval if args.npcs else None)
+
+    def reload_world() -> None:
+        try:
+            print(f"Mundo recarregado: {server.reload_world().summary()}", file=sys.stderr)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Falha ao recarregar o mundo: {error}", file=sys.stderr)
+
+    async def serve() -> None:
+        # SIGUSR1 recarrega o world.json nas sessões abertas
+        if hasattr(signal, "SIGUSR1"):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, reload_world)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+        if dump is not None:
+            dump.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from game_engine import GameEngine
+from instrumentation import Metric, metrics
+from memory_report import measure_session
+from output_sink import BytesSink
+from server import DEFAULT_HOST, DEFAULT_PORT, GameServer, Session, SessionProtocol
+from session_store import SessionStore
+
+if TYPE_CHECKING:
+    from world_template import WorldTemplate
+
+
+def estimate_session_bytes(protocol: SessionProtocol, costs: Dict[str, float]) -> int:
+    """Memória aproximada de uma sessão residente, calculada em O(1) pelo número de cópias do overlay.
+
+    costs vem de memory_report.measure_session() sobre o mundo da sessão.
+    """
+    overlay = protocol.engine.world_overlay
+    if overlay is None:
+        return int(costs["session"])
+    return int(costs["session"] + len(overlay.places.owned()) * costs["place_copy"]
+               + len(overlay.items.owned()) * costs["item_copy"] + len(overlay.npcs.owned()) * costs["npc_copy"])
+
+
+def _write_state(path: str, state: Dict) -> None:
+    data = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(zlib.compress(data.encode("utf8"), 1))
+    os.replace(temp_path, path)
+
+
+def _read_state(path: str) -> Dict:
+    with open(path, "rb") as f:
+        return json.loads(zlib.decompress(f.read()).decode("utf8"))
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class _Resident:
+    __slots__ = ("protocol", "last_active", "size")
+
+    def __init__(self, protocol: SessionProtocol, last_active: float, size: int) -> None:
+        self.protocol = protocol
+        self.last_active = last_active
+        self.size = size
+
+
+class SessionManager:
+    """Mantém em memória só as sessões usadas mais recentemente; as ociosas vão para disco.
+
+    Quando o número de sessões residentes passa de max_resident, ou a memória estimada delas passa de
+    max_memory, as sessões usadas há mais tempo e ociosas há pelo menos idle_after segundos são gravadas
+    em directory (snapshot_state() em JSON compactado) e o engine delas é descartado. O próximo get()
+    da sessão a recria a partir do arquivo, sem que o jogador perceba. Sessões que ainda não passaram do
+    nome do jogador não têm estado a gravar e ficam residentes. Com journal_dir, o journal de uma sessão
+    é fechado ao despejá-la e reaberto (com um checkpoint) ao recriá-la.
+
+    O despejo não faz E/S no chamador: o snapshot fica em memória até uma thread de escrita gravá-lo (e
+    fechar o journal), e uma sessão pedida antes disso volta direto desse snapshot, depois que o journal
+    foi fechado. get_async() lê do disco e reabre o journal fora do loop de eventos. A memória de cada
+    sessão é estimada com custos medidos sobre o mundo servido (memory_report.measure_session) por
+    calibrate(), ou na primeira sessão criada se ninguém a chamou.
+    """
+
+    def __init__(self, directory: str, engine_factory: Callable[..., GameEngine] = GameEngine,
+                 max_resident: Optional[int] = 1000, max_memory: Optional[int] = None, idle_after: float = 30.0,
+                 store: Optional[SessionStore] = None, clock: Callable[[], float] = time.monotonic,
+                 journal_dir: Optional[str] = None) -> None:
+        self.directory = directory
+        self.engine_factory = engine_factory
+        self.max_resident = max_resident
+        self.max_memory = max_memory
+        self.idle_after = idle_after
+        self.store = store
+        self.clock = clock
+        self.journal_dir = journal_dir
+        # Da sessão usada há mais tempo para a mais recente
+        self._resident: "OrderedDict[int, _Resident]" = OrderedDict()
+        self._evicted: set = set()
+        # Sessão despejada -> snapshot ainda não gravado pela thread de escrita
+        self._writing: Dict[int, Dict] = {}
+        # Sessão despejada -> gravação (e fechamento do journal) pedida à thread de escrita
+        self._writes: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        # Uma thread só: gravações e remoções do mesmo arquivo acontecem na ordem em que foram pedidas
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="session-evict")
+        self.costs: Optional[Dict[str, float]] = None
+        self.resident_bytes = 0
+        self.evictions = Metric()
+        self.rehydrations = Metric()
+        os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._evicted)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._resident or key in self._evicted
+
+    @property
+    def resident_count(self) -> int:
+        return len(self._resident)
+
+    @property
+    def evicted_count(self) -> int:
+        return len(self._evicted)
+
+    def _path(self, key: int) -> str:
+        return os.path.join(self.directory, f"{key}.session")
+
+    def _new_protocol(self) -> SessionProtocol:
+        return SessionProtocol(self.engine_factory(sink=BytesSink()), self.store, self.journal_dir)
+
+    def calibrate(self, template: "WorldTemplate") -> None:
+        """Mede os custos de memória de uma sessão sobre o mundo servido; leva algumas centenas de sessões,
+        então o servidor a chama fora do loop de eventos antes de aceitar conexões."""
+        self.costs = measure_session(template)
+
+    def _estimate(self, protocol: SessionProtocol) -> int:
+        if self.costs is None:
+            overlay = protocol.engine.world_overlay
+            if overlay is None:
+                return 0
+            self.costs = measure_session(overlay.template)
+        return estimate_session_bytes(protocol, self.costs)
+
+    def _add(self, key: int, protocol: SessionProtocol) -> None:
+        resident = self._resident[key] = _Resident(protocol, self.clock(), self._estimate(protocol))
+        self.resident_bytes += resident.size
+
+    def protocols(self) -> List[SessionProtocol]:
+        """Sessões residentes (as despejadas já fecharam o journal)."""
+        return [resident.protocol for resident in self._resident.values()]
+
+    def open(self, key: int) -> SessionProtocol:
+        """Cria a sessão de uma conexão nova."""
+        protocol = self._new_protocol()
+        self._add(key, protocol)
+        self.evict()
+        return protocol
+
+    def get(self, key: int) -> SessionProtocol:
+        """Sessão pronta para a próxima linha do jogador, recriada do disco se tinha sido despejada."""
+        resident = self._resident.get(key)
+        if resident is None:
+            started = time.perf_counter()
+            state, write = self._take_pending(key)
+            if write is not None:
+                write.result()
+            protocol = self._resume(state or _read_state(self._path(key)))
+            protocol.write_checkpoint()
+            return self._readmit(key, protocol, started)
+        resident.last_active = self.clock()
+        self._resident.move_to_end(key)
+        return resident.protocol
+
+    async def get_async(self, key: int) -> SessionProtocol:
+        """Como get(), mas a E/S de uma sessão despejada (leitura e checkpoint do journal) roda fora do loop."""
+        if key in self._resident:
+            return self.get(key)
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        state, write = self._take_pending(key)
+        if write is not None:
+            await asyncio.wrap_future(write)
+        if state is None:
+            state = await loop.run_in_executor(None, _read_state, self._path(key))
+        protocol = self._resume(state)
+        await loop.run_in_executor(None, protocol.write_checkpoint)
+        return self._readmit(key, protocol, started)
+
+    def _take_pending(self, key: int) -> Tuple[Optional[Dict], Optional[Future]]:
+        """Snapshot ainda não gravado da sessão despejada e a gravação dela, que fecha o journal.
+
+        Sem o snapshot, a thread de escrita apaga o arquivo que gravar; a sessão só pode reabrir o
+        journal depois que essa gravação terminar.
+        """
+        if key not in self._evicted:
+            raise KeyError(key)
+        write = self._writes.pop(key, None)
+        with self._lock:
+            return self._writing.pop(key, None), write
+
+    def touch(self, key: int) -> None:
+        """Atualiza a memória estimada da sessão depois de um comando e despeja outras se o orçamento estourou."""
+        resident = self._resident.get(key)
+        if resident is None:
+            return
+        size = self._estimate(resident.protocol)
+        self.resident_bytes += size - resident.size
+        resident.size = size
+        self.evict()
+
+    def close(self, key: int) -> None:
+        """Descarta a sessão de uma conexão encerrada, residente ou em disco."""
+        resident = self._resident.pop(key, None)
+        if resident is not None:
+            self.resident_bytes -= resident.size
+            resident.protocol.close()
+        if key in self._evicted:
+            self._evicted.discard(key)
+            self._writes.pop(key, None)
+            with self._lock:
+                self._writing.pop(key, None)
+            self._writer.submit(_remove, self._path(key))
+
+    def flush(self) -> None:
+        """Espera a thread de escrita gravar os despejos pedidos até agora."""
+        # Com uma thread só, a tarefa vazia termina depois de todas as anteriores
+        self._writer.submit(lambda: None).result()
+
+    def shutdown(self) -> None:
+        """Espera a thread de escrita terminar as gravações pendentes."""
+        self._writer.shutdown(wait=True)
+
+    def _over_budget(self) -> bool:
+        if self.max_resident is not None and len(self._resident) > self.max_resident:
+            return True
+        return self.max_memory is not None and self.resident_bytes > self.max_memory
+
+    def evict(self) -> int:
+        """Despeja sessões ociosas, da usada há mais tempo para a mais recente, até voltar ao orçamento."""
+        if not self._over_budget():
+            return 0
+        excess_count = len(self._resident) - self.max_resident if self.max_resident is not None else 0
+        excess_bytes = self.resident_bytes - self.max_memory if self.max_memory is not None else 0
+        deadline = self.clock() - self.idle_after
+        victims = []
+        for key, resident in self._resident.items():
+            if (excess_count <= 0 and excess_bytes <= 0) or resident.last_active > deadline:
+                # Orçamento atendido, ou as sessões seguintes foram usadas ainda mais recentemente
+                break
+            if resident.protocol.started:
+                victims.append((key, resident))
+                excess_count -= 1
+                excess_bytes -= resident.size
+        for key, resident in victims:
+            self._evict(key, resident)
+        return len(victims)
+
+    def _evict(self, key: int, resident: _Resident) -> None:
+        started = time.perf_counter()
+        state = resident.protocol.engine.snapshot_state()
+        del self._resident[key]
+        self.resident_bytes -= resident.size
+        self._evicted.add(key)
+        with self._lock:
+            self._writing[key] = state
+        self._writes[key] = self._writer.submit(self._write_evicted, key, state, resident.protocol)
+        self._record(self.evictions, "session.evict", time.perf_counter() - started)
+
+    def _write_evicted(self, key: int, state: Dict, protocol: SessionProtocol) -> None:
+        """Na thread de escrita: fecha o journal da sessão despejada e grava o snapshot."""
+        protocol.close()
+        path = self._path(key)
+        _write_state(path, state)
+        with self._lock:
+            if self._writing.get(key) is state:
+                del self._writing[key]
+                return
+        # Recriada ou fechada durante a gravação: o arquivo não vale mais
+        _remove(path)
+
+    def _resume(self, state: Dict) -> SessionProtocol:
+        protocol = self._new_protocol()
+        protocol.resume(state)
+        return protocol
+
+    def _readmit(self, key: int, protocol: SessionProtocol, started: float) -> SessionProtocol:
+        """Volta a sessão recriada (com o journal já reaberto) para as residentes."""
+        self._writer.submit(_remove, self._path(key))
+        self._evicted.discard(key)
+        self._add(key, protocol)
+        self._record(self.rehydrations, "session.rehydrate", time.perf_counter() - started)
+        self.evict()
+        return protocol
+
+    @staticmethod
+    def _record(metric: Metric, name: str, seconds: float) -> None:
+        metric.count += 1
+        metric.latency.add(seconds * 1e6)
+        if metrics.enabled:
+            metrics.record(name, seconds)
+
+    def stats(self) -> Dict:
+        return {
+            "resident": len(self._resident),
+            "evicted": len(self._evicted),
+            "resident_bytes": self.resident_bytes,
+            "evict": self.evictions.snapshot(),
+            "rehydrate": self.rehydrations.snapshot(),
+        }
+
+
+class ManagedGameServer(GameServer):
+    """GameServer cujas sessões passam por um SessionManager: só as usadas recentemente ficam em memória.
+
+    A conexão (Session) não guarda o engine; cada linha busca a sessão no gerenciador, que a recria do
+    disco se ela tinha sido despejada.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 manager: Optional[SessionManager] = None, **kwargs) -> None:
+        super().__init__(host, port, **kwargs)
+        if manager is None:
+            engine_factory = functools.partial(self.engine_factory, template=self.world_template)
+            manager = SessionManager(os.path.join(os.getcwd(), "sessions"), engine_factory, store=self.store,
+                                     journal_dir=self.journal_dir)
+        self.manager = manager
+
+    def _protocols(self) -> List[SessionProtocol]:
+        return self.manager.protocols()
+
+    async def start(self) -> asyncio.AbstractServer:
+        if self.manager.costs is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.manager.calibrate, self.world_template)
+        return await super().start()
+
+    def _create_session(self, session_id: int, writer: asyncio.StreamWriter) -> Session:
+        self.manager.open(session_id)
+        return Session(session_id, writer)
+
+    async def _close_session(self, session: Session) -> None:
+        self.manager.close(session.session_id)
+
+    async def _open(self, session: Session) -> bytes:
+        protocol = await self.manager.get_async(session.session_id)
+        protocol.open()
+        return protocol.sink.drain()
+
+    async def _feed(self, session: Session, line: str) -> Tuple[bytes, bool]:
+        protocol = await self.manager.get_async(session.session_id)
+        running = await self._feed_protocol(session, protocol, line)
+        data = protocol.sink.drain()
+        self.manager.touch(session.session_id)
+        return data, running
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor da aventura textual que despeja sessões ociosas em disco.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--idle-timeout", type=float, default=600.0)
+    parser.add_argument("--sessions-dir", default="sessions", help="diretório das sessões despejadas")
+    parser.add_argument("--max-resident", type=int, default=200, help="sessões mantidas em memória")
+    parser.add_argument("--max-memory", type=int, help="memória estimada das sessões residentes, em bytes")
+    parser.add_argument("--idle-after", type=float, default=30.0, help="segundos sem comandos para poder despejar")
+    parser.add_argument("--store", help="banco SQLite das contas; sem ele as sessões não são persistidas "
+                        "(sem autenticação: o nome digitado é a conta)")
+    parser.add_argument("--journal-dir", help="diretório dos journals das contas (comandos desde o último checkpoint)")
+    args = parser.parse_args()
+
+    store = SessionStore(args.store) if args.store else None
+    manager = SessionManager(args.sessions_dir, GameEngine, args.max_resident, args.max_memory, args.idle_after, store,
+                             journal_dir=args.journal_dir)
+    server = ManagedGameServer(args.host, args.port, manager, max_sessions=args.max_sessions,
+                               idle_timeout=args.idle_timeout, store=store, journal_dir=args.journal_dir)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.shutdown()
+        if store is not None:
+            store.close()
+        print(json.dumps(manager.stats(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
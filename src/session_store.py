@@ -0,0 +1,364 @@
+import argparse
+import json
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    account TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    health INTEGER NOT NULL,
+    max_health INTEGER NOT NULL,
+    current_place TEXT NOT NULL,
+    equipped_weapon TEXT,
+    equipped_armor TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    account TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (account, slot)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS item_locations (
+    account TEXT NOT NULL,
+    item TEXT NOT NULL,
+    location TEXT,
+    PRIMARY KEY (account, item)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS used_items (
+    account TEXT NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (account, item)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS npc_dialogs (
+    account TEXT NOT NULL,
+    npc TEXT NOT NULL,
+    dialog_index INTEGER NOT NULL,
+    PRIMARY KEY (account, npc)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS orphan_items (
+    account TEXT NOT NULL,
+    item TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (account, item)
+) WITHOUT ROWID;
+"""
+
+# Tabelas com várias linhas por conta, regravadas por inteiro a cada escrita da conta
+CHILD_TABLES = ("inventory", "item_locations", "used_items", "npc_dialogs", "orphan_items")
+# Limite de parâmetros por consulta "IN (...)" na leitura em lote
+LOAD_CHUNK = 500
+
+
+class ConnectionPool:
+    """Conexões SQLite reaproveitadas entre threads, abertas sob demanda até size.
+
+    O banco fica em modo WAL, então as leituras de retomada de sessão não esperam a escrita em lote.
+    """
+
+    def __init__(self, path: str, size: int = 4, timeout: float = 5.0) -> None:
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit: as transações são abertas explicitamente por quem escreve
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Empresta uma conexão; espera até timeout segundos quando todas estão em uso."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._idle.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+def _rows(account: str, state: Dict, updated_at: float) -> Tuple[Tuple, ...]:
+    """Linhas de cada tabela para um estado de GameEngine.snapshot_state()."""
+    player = state["player"]
+    world = state["world"]
+    row = (
+        account, player["name"], player["health"], player["max_health"], state["current_place"],
+        player["equipped_weapon"], player["equipped_armor"],
+        updated_at,
+    )
+    return (
+        row,
+        [(account, slot, item) for slot, item in enumerate(player["inventory"])],
+        [(account, item, location) for item, location in world["item_locations"].items()],
+        [(account, item) for item in world["used"]],
+        [(account, npc, index) for npc, index in world["dialog_indexes"].items()],
+        # Itens guardados pela sessão que saíram do mundo: o registro inteiro, em JSON
+        [(account, item, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+         for item, data in world.get("orphans", {}).items()],
+    )
+
+
+class SessionStore:
+    """Estado persistente das contas em SQLite, com escrita adiada e agrupada em uma thread própria.
+
+    save() só guarda o estado mais recente da conta em memória; a thread de escrita grava todas as
+    contas pendentes em uma única transação a cada flush_interval segundos (ou antes, quando max_batch
+    contas estão pendentes). Várias gravações da mesma conta entre dois flushes viram uma só. As leituras
+    enxergam o que ainda não foi gravado.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5, max_batch: int = 5000, pool_size: int = 4) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        # Conta -> estado a gravar (None para apagar); _flushing é o lote que está sendo gravado agora
+        self._pending: Dict[str, Optional[Dict]] = {}
+        self._flushing: Dict[str, Optional[Dict]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.saves = 0
+        self.coalesced = 0
+        self.written = 0
+        self.flushes = 0
+        self.flush_time = 0.0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="session-store", daemon=True)
+        self._thread.start()
+
+    def save(self, account: str, state: Dict) -> None:
+        """Agenda a gravação do estado da conta (um dict de snapshot_state()); não faz E/S."""
+        with self._lock:
+            if account in self._pending:
+                self.coalesced += 1
+            self._pending[account] = state
+            self.saves += 1
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def delete(self, account: str) -> None:
+        with self._lock:
+            self._pending[account] = None
+
+    def load(self, account: str) -> Optional[Dict]:
+        """Estado mais recente da conta, ou None se ela não existe."""
+        return self.load_many([account]).get(account)
+
+    def load_many(self, accounts: Iterable[str]) -> Dict[str, Dict]:
+        """Estados de várias contas com poucas consultas, para retomar sessões em lote."""
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        with self._lock:
+            for account in accounts:
+                if account in self._pending:
+                    state = self._pending[account]
+                elif account in self._flushing:
+                    state = self._flushing[account]
+                else:
+                    missing.append(account)
+                    continue
+                if state is not None:
+                    found[account] = state
+        if missing:
+            with self.pool.connection() as conn:
+                for start in range(0, len(missing), LOAD_CHUNK):
+                    found.update(self._read(conn, missing[start:start + LOAD_CHUNK]))
+        return found
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, accounts: List[str]) -> Dict[str, Dict]:
+        marks = ",".join("?" * len(accounts))
+        states: Dict[str, Dict] = {}
+        for (account, name, health, max_health, current_place, weapon, armor, _) in conn.execute(
+                f"SELECT * FROM players WHERE account IN ({marks})", accounts):
+            states[account] = {
+                "player": {
+                    "name": name, "health": health, "max_health": max_health, "inventory": [],
+                    "equipped_weapon": weapon, "equipped_armor": armor,
+                },
+                "current_place": current_place,
+                "world": {"item_locations": {}, "orphans": {}, "used": [], "dialog_indexes": {}},
+            }
+        for account, item in conn.execute(
+                f"SELECT account, item FROM inventory WHERE account IN ({marks}) ORDER BY account, slot", accounts):
+            states[account]["player"]["inventory"].append(item)
+        for account, item, location in conn.execute(
+                f"SELECT account, item, location FROM item_locations WHERE account IN ({marks})", accounts):
+            states[account]["world"]["item_locations"][item] = location
+        for account, item in conn.execute(
+                f"SELECT account, item FROM used_items WHERE account IN ({marks}) ORDER BY account, item", accounts):
+            states[account]["world"]["used"].append(item)
+        for account, npc, index in conn.execute(
+                f"SELECT account, npc, dialog_index FROM npc_dialogs WHERE account IN ({marks})", accounts):
+            states[account]["world"]["dialog_indexes"][npc] = index
+        for account, item, data in conn.execute(
+                f"SELECT account, item, data FROM orphan_items WHERE account IN ({marks})", accounts):
+            states[account]["world"]["orphans"][item] = json.loads(data)
+        return states
+
+    def flush(self) -> int:
+        """Grava agora todas as contas pendentes em uma transação e retorna quantas foram gravadas."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+            except BaseException as error:
+                # Devolve o lote sem sobrescrever o que foi salvo durante a tentativa
+                with self._lock:
+                    for account, state in batch.items():
+                        self._pending.setdefault(account, state)
+                    self._flushing = {}
+                if not isinstance(error, sqlite3.Error):
+                    raise
+                self._count_error(error)
+                return 0
+            with self._lock:
+                self._flushing = {}
+            self.flushes += 1
+            self.written += len(batch)
+            self.flush_time += time.perf_counter() - started
+            return len(batch)
+
+    def _write(self, batch: Dict[str, Optional[Dict]]) -> None:
+        now = time.time()
+        accounts = [(account,) for account in batch]
+        players: List[Tuple] = []
+        children: Dict[str, List[Tuple]] = {table: [] for table in CHILD_TABLES}
+        for account, state in batch.items():
+            if state is None:
+                continue
+            player, *rows = _rows(account, state, now)
+            players.append(player)
+            for table, table_rows in zip(CHILD_TABLES, rows):
+                children[table].extend(table_rows)
+
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in CHILD_TABLES:
+                    conn.executemany(f"DELETE FROM {table} WHERE account = ?", accounts)
+                conn.executemany("DELETE FROM players WHERE account = ?",
+                                 [(account,) for account, state in batch.items() if state is None])
+                conn.executemany("INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?)", players)
+                conn.executemany("INSERT INTO inventory VALUES (?, ?, ?)", children["inventory"])
+                conn.executemany("INSERT INTO item_locations VALUES (?, ?, ?)", children["item_locations"])
+                conn.executemany("INSERT INTO used_items VALUES (?, ?)", children["used_items"])
+                conn.executemany("INSERT INTO npc_dialogs VALUES (?, ?, ?)", children["npc_dialogs"])
+                conn.executemany("INSERT INTO orphan_items VALUES (?, ?, ?)", children["orphan_items"])
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _count_error(self, error: BaseException) -> None:
+        self.errors += 1
+        self.last_error = repr(error)
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as error:
+                # Um estado que não vira linhas não pode parar a thread: o lote já voltou para _pending
+                self._count_error(error)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "saves": self.saves,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "flushes": self.flushes,
+            "flush_ms": round(self.flush_time * 1000 / self.flushes, 3) if self.flushes else 0.0,
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        """Para a thread de escrita, grava o que estiver pendente e fecha as conexões."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self.pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede a gravação em lote do SessionStore com contas sintéticas.")
+    parser.add_argument("database", help="arquivo SQLite (criado se não existir)")
+    parser.add_argument("--accounts", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5, help="vezes que cada conta é salva")
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Importado aqui para que o módulo não dependa do motor
+    from game_engine import GameEngine
+    from output_sink import BytesSink
+
+    engine = GameEngine(sink=BytesSink())
+    engine.start("Jogador")
+    engine.step("pegar Espada")
+    state = engine.snapshot_state()
+
+    store = SessionStore(args.database, args.flush_interval)
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for account in range(args.accounts):
+            store.save(f"conta-{account}", state)
+    saved = time.perf_counter() - started
+    store.close()
+    elapsed = time.perf_counter() - started
+    total = args.accounts * args.rounds
+    print(f"{total} gravações em {saved * 1000:.1f}ms no laço ({saved / total * 1e6:.2f}us cada), "
+          f"{elapsed:.3f}s até gravar tudo")
+    print(store.stats())
+
+    reader = SessionStore(args.database)
+    started = time.perf_counter()
+    states = reader.load_many(f"conta-{account}" for account in range(args.accounts))
+    print(f"{len(states)} contas lidas em {(time.perf_counter() - started) * 1000:.1f}ms")
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple
+
+from game_engine import GameEngine, find_world_path
+from output_sink import BytesSink
+from server import DEFAULT_HOST, DEFAULT_PORT, GameServer, Session, SessionProtocol
+from session_store import SessionStore
+from world_reload import reload_file
+from world_snapshot import SnapshotError, WorldSnapshot, compile_world, snapshot_path_for
+from world_template import WorldTemplate
+
+
+class WorkerError(ConnectionError):
+    """O worker encerrou ou falhou ao processar uma requisição."""
+
+
+def attach_shared_world(name: str) -> shared_memory.SharedMemory:
+    """Anexa o bloco de memória compartilhada do mundo sem assumir a posse dele.
+
+    Até o Python 3.12, anexar um bloco também o registra no resource_tracker, que o removeria (com
+    avisos de vazamento) quando o worker terminasse; quem cria e remove o bloco é o processo de frente.
+    Um worker iniciado pelo multiprocessing usa o mesmo resource_tracker da frente, onde o registro
+    repetido não tem efeito e cancelá-lo apagaria o da frente; só um tracker próprio é desfeito aqui.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    inherited = resource_tracker._resource_tracker._fd is not None
+    shm = shared_memory.SharedMemory(name)
+    if os.name == "posix" and not inherited:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def worker_main(conn: Connection, shm_name: str, size: int, max_resident_places: Optional[int] = None,
+                store_path: Optional[str] = None) -> None:
+    """Laço de um worker: recebe requisições do processo de frente e responde na mesma ordem.
+
+    O mundo é lido direto da memória compartilhada; cada worker só materializa os lugares que suas
+    sessões visitam. Com store_path, cada worker grava as contas das suas sessões no mesmo banco.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shm = attach_shared_world(shm_name)
+    # Somente leitura: uma escrita por engano aqui corromperia o mundo de todos os workers
+    view = shm.buf[:size]
+    buffer = view.toreadonly()
+    view.release()
+    template = WorldTemplate.from_snapshot(WorldSnapshot(buffer), max_resident_places)
+    sessions: Dict[int, SessionProtocol] = {}
+    store = SessionStore(store_path) if store_path else None
+
+    def new_session(session_id: int) -> SessionProtocol:
+        protocol = SessionProtocol(GameEngine(template, sink=BytesSink()), store)
+        sessions[session_id] = protocol
+        return protocol
+
+    while True:
+        try:
+            kind, request_id, *args = conn.recv()
+        except EOFError:
+            break
+        try:
+            if kind == "open":
+                protocol = new_session(args[0])
+                protocol.open()
+                reply: Any = (protocol.sink.drain(), True)
+            elif kind == "line":
+                protocol = sessions[args[0]]
+                # Só as linhas depois do nome do jogador contam como comandos
+                command = protocol.started
+                running = protocol.feed(args[1])
+                if not running:
+                    del sessions[args[0]]
+                reply = (protocol.sink.drain(), running, command)
+            elif kind == "close":
+                reply = sessions.pop(args[0], None) is not None
+            elif kind == "ping":
+                reply = len(sessions)
+            elif kind == "export":
+                reply = {
+                    session_id: protocol.engine.snapshot_state() if protocol.started else None
+                    for session_id, protocol in sessions.items()
+                }
+            elif kind == "import":
+                for session_id, state in args[0].items():
+                    protocol = new_session(session_id)
+                    if state is not None:
+                        protocol.resume(state)
+                reply = len(sessions)
+            elif kind == "reload":
+                reply = reload_file(template, args[0]).summary()
+            elif kind == "stop":
+                if store is not None:
+                    store.close()
+                conn.send((request_id, True, None))
+                break
+            else:
+                raise ValueError(f"Requisição desconhecida: {kind}")
+        except Exception as error:
+            conn.send((request_id, False, repr(error)))
+        else:
+            conn.send((request_id, True, reply))
+    if store is not None:
+        store.close()
+    conn.close()
+    template.snapshot.close()
+    buffer.release()
+    shm.close()
+
+
+class RemoteSession(Session):
+    """Sessão cujo GameEngine vive em um worker; a frente só guarda a conexão e o índice do worker."""
+
+    def __init__(self, session_id: int, writer: asyncio.StreamWriter, worker: int) -> None:
+        super().__init__(session_id, writer)
+        self.worker = worker
+
+
+class WorkerHandle:
+    """Um processo worker visto pelo processo de frente.
+
+    O objeto continua o mesmo quando o processo é reiniciado, para que as sessões roteadas para ele
+    (roteamento fixo por índice) passem a usar o novo processo sem perceber.
+    """
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.sessions: set = set()
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ready = asyncio.Event()
+        self.restarts = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+
+class ShardedGameServer(GameServer):
+    """Servidor com um processo de frente que roteia cada sessão para um worker de um pool de processos.
+
+    O snapshot binário do mundo é gravado uma única vez em multiprocessing.shared_memory e todos os
+    workers o leem sem copiá-lo. Cada sessão fica presa ao seu worker; verificações periódicas de saúde
+    substituem workers mortos ou travados, e restart_worker() troca um worker sem derrubar as sessões,
+    migrando o estado delas com snapshot_state().
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: Optional[int] = None,
+        world_path: Optional[str] = None,
+        health_interval: float = 5.0,
+        health_timeout: float = 5.0,
+        request_timeout: Optional[float] = 30.0,
+        max_resident_places: Optional[int] = None,
+        store_path: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(host, port, **kwargs)
+        self.worker_count = workers or os.cpu_count() or 1
+        self.world_path = world_path or find_world_path()
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.request_timeout = request_timeout
+        self.max_resident_places = max_resident_places
+        self.store_path = store_path
+        self.workers: List[WorkerHandle] = []
+        self.shared_world: Optional[shared_memory.SharedMemory] = None
+        self.world_size = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._request_ids = itertools.count(1)
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        self._share_world()
+        self.workers = [WorkerHandle(index) for index in range(self.worker_count)]
+        for handle in self.workers:
+            self._spawn(handle)
+            handle.ready.set()
+        self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+        return await super().start()
+
+    def _share_world(self) -> None:
+        """Copia o snapshot do mundo para a memória compartilhada, compilando-o se necessário."""
+        path = snapshot_path_for(self.world_path)
+        try:
+            fresh = WorldSnapshot.open(path).is_fresh(self.world_path)
+        except (OSError, ValueError, SnapshotError):
+            fresh = False
+        if fresh:
+            with open(path, "rb") as f:
+                data = f.read()
+        else:
+            with open(self.world_path, "r", encoding="utf8") as f:
+                data = compile_world(json.load(f), self.world_path)
+        self.world_size = len(data)
+        self.shared_world = shared_memory.SharedMemory(create=True, size=self.world_size)
+        self.shared_world.buf[:self.world_size] = data
+
+    async def reload_world(self) -> List[str]:
+        """Recarrega o world.json em todos os workers, sem reiniciá-los nem derrubar sessões.
+
+        Um novo snapshot vai para a memória compartilhada antes, para que workers reiniciados depois
+        já partam do mundo novo; o bloco antigo continua mapeado pelos workers que já o usam.
+        """
+        old_world = self.shared_world
+        self._share_world()
+        if old_world is not None:
+            old_world.close()
+            old_world.unlink()
+        return await asyncio.gather(*(self._request(handle, "reload", self.world_path) for handle in self.workers))
+
+    def _spawn(self, handle: WorkerHandle) -> None:
+        """Inicia o processo de um worker e passa a ler as respostas dele no loop."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=worker_main, name=f"game-worker-{handle.index}", daemon=True,
+            args=(child_conn, self.shared_world.name, self.world_size, self.max_resident_places, self.store_path),
+        )
+        process.start()
+        child_conn.close()
+        handle.process, handle.conn = process, parent_conn
+        asyncio.get_running_loop().add_reader(parent_conn.fileno(), self._on_reply, handle, parent_conn)
+
+    def _on_reply(self, handle: WorkerHandle, conn: Connection) -> None:
+        try:
+            while conn.poll():
+                request_id, ok, payload = conn.recv()
+                future = handle.pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(WorkerError(payload))
+        except (EOFError, OSError):
+            self._detach(handle, conn)
+
+    def _detach(self, handle: WorkerHandle, conn: Connection) -> None:
+        """Desliga o pipe de um worker e falha as requisições que esperavam por ele."""
+        try:
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+        except (OSError, ValueError):
+            pass
+        conn.close()
+        if handle.conn is conn:
+            handle.conn = None
+            for future in handle.pending.values():
+                if not future.done():
+                    future.set_exception(WorkerError(f"Worker {handle.index} encerrado."))
+            handle.pending.clear()
+
+    async def _request(self, handle: WorkerHandle, kind: str, *args: Any,
+                       timeout: Optional[float] = None, wait_ready: bool = True) -> Any:
+        if wait_ready:
+            await handle.ready.wait()
+        if handle.conn is None:
+            raise WorkerError(f"Worker {handle.index} encerrado.")
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        handle.pending[request_id] = future
+        try:
+            handle.conn.send((kind, request_id, *args))
+        except OSError as error:
+            handle.pending.pop(request_id, None)
+            raise WorkerError(str(error)) from error
+        try:
+            return await asyncio.wait_for(future, timeout or self.request_timeout)
+        finally:
+            handle.pending.pop(request_id, None)
+
+    def _create_session(self, session_id: int, writer: asyncio.StreamWriter) -> RemoteSession:
+        # Novas sessões vão para o worker com menos sessões e ficam nele até o fim
+        handle = min(self.workers, key=lambda worker: len(worker.sessions))
+        handle.sessions.add(session_id)
+        return RemoteSession(session_id, writer, handle.index)
+
+    async def _open(self, session: RemoteSession) -> bytes:
+        data, _ = await self._request(self.workers[session.worker], "open", session.session_id)
+        return data
+
+    async def _feed(self, session: RemoteSession, line: str) -> Tuple[bytes, bool]:
+        handle = self.workers[session.worker]
+        restarts = handle.restarts
+        await handle.ready.wait()
+        if handle.restarts != restarts:
+            # Linha enviada antes do aviso de reinício: a sessão reaberta espera o nome do jogador
+            return b"", True
+        try:
+            data, running, command = await self._request(handle, "line", session.session_id, line)
+        except WorkerError:
+            if handle.restarts == restarts and handle.conn is not None:
+                raise
+            # O worker caiu com a linha em andamento
+            return self._notice("O servidor da sua sessão parou. Conecte-se de novo para continuar."), False
+        if command:
+            session.commands += 1
+        return data, running
+
+    @staticmethod
+    def _notice(message: str) -> bytes:
+        sink = BytesSink()
+        sink.write(sink.formatter.format_error(message))
+        return sink.drain()
+
+    async def _close_session(self, session: RemoteSession) -> None:
+        handle = self.workers[session.worker]
+        handle.sessions.discard(session.session_id)
+        if handle.conn is not None:
+            try:
+                await self._request(handle, "close", session.session_id)
+            except (WorkerError, asyncio.TimeoutError):
+                pass
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for handle in self.workers:
+                if handle.ready.is_set() and not await self.check_worker(handle):
+                    await self.restart_worker(handle.index, graceful=False)
+
+    async def check_worker(self, handle: WorkerHandle) -> bool:
+        """Indica se o worker está vivo e respondendo dentro de health_timeout."""
+        if not handle.alive or handle.conn is None:
+            return False
+        try:
+            await self._request(handle, "ping", timeout=self.health_timeout)
+        except (WorkerError, asyncio.TimeoutError):
+            return False
+        return True
+
+    async def restart_worker(self, index: int, graceful: bool = True) -> None:
+        """Troca o processo de um worker.
+
+        No modo gracioso as requisições novas esperam, as pendentes terminam e o estado das sessões é
+        migrado para o novo processo. Sem ele (worker morto ou travado), o estado das sessões se perdeu:
+        elas são reabertas no novo processo, e cada jogador recebe um aviso e o pedido do nome (uma
+        conta do store é retomada).
+        """
+        handle = self.workers[index]
+        handle.ready.clear()
+        old_process, old_conn = handle.process, handle.conn
+        states: Dict[int, Optional[Dict]] = {}
+        if graceful and old_conn is not None:
+            await asyncio.gather(*handle.pending.values(), return_exceptions=True)
+            states = await self._request(handle, "export", wait_ready=False)
+            await self._request(handle, "stop", wait_ready=False)
+        if old_conn is not None:
+            self._detach(handle, old_conn)
+        await asyncio.get_running_loop().run_in_executor(None, self._reap, old_process)
+
+        self._spawn(handle)
+        handle.restarts += 1
+        if states:
+            await self._request(handle, "import", states, wait_ready=False)
+        elif not graceful:
+            await self._reopen_sessions(handle)
+        handle.ready.set()
+
+    async def _reopen_sessions(self, handle: WorkerHandle) -> None:
+        """Abre no worker novo as sessões conectadas que o worker perdido atendia e avisa os jogadores."""
+        notice = self._notice("O servidor da sua sessão reiniciou e o jogo em andamento foi perdido.")
+        for session_id in list(handle.sessions):
+            session = self.sessions.get(session_id)
+            if session is None or session.writer.is_closing():
+                handle.sessions.discard(session_id)
+                continue
+            data, _ = await self._request(handle, "open", session_id, wait_ready=False)
+            # Sem esperar o buffer esvaziar: um cliente lento não atrasa o reinício dos demais
+            session.writer.write(notice + data)
+
+    async def rolling_restart(self) -> None:
+        """Reinicia todos os workers, um de cada vez, sem derrubar sessões."""
+        for handle in self.workers:
+            await self.restart_worker(handle.index)
+
+    def _reap(self, process: Optional[multiprocessing.process.BaseProcess]) -> None:
+        if process is None:
+            return
+        process.join(self.health_timeout)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"worker": handle.index, "pid": handle.process.pid if handle.process else None,
+             "alive": handle.alive, "sessions": len(handle.sessions), "restarts": handle.restarts}
+            for handle in self.workers
+        ]
+
+    async def close(self) -> None:
+        await super().close()
+        if self._health_task is not None:
+            self._health_task.cancel()
+        for handle in self.workers:
+            handle.ready.clear()
+            if handle.conn is not None:
+                try:
+                    await self._request(handle, "stop", wait_ready=False, timeout=self.health_timeout)
+                except (WorkerError, asyncio.TimeoutError):
+                    pass
+                if handle.conn is not None:
+                    self._detach(handle, handle.conn)
+            await asyncio.get_running_loop().run_in_executor(None, self._reap, handle.process)
+        if self.shared_world is not None:
+            self.shared_world.close()
+            self.shared_world.unlink()
+            self.shared_world = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor da aventura textual com sessões distribuídas entre processos.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--idle-timeout", type=float, default=600.0)
+    parser.add_argument("--health-interval", type=float, default=5.0)
+    parser.add_argument("--world", help="caminho do world.json")
+    parser.add_argument("--store", help="banco SQLite das contas, compartilhado pelos workers "
+                        "(sem autenticação: o nome digitado é a conta)")
+    args = parser.parse_args()
+
+    server = ShardedGameServer(
+        args.host, args.port, workers=args.workers, world_path=args.world, health_interval=args.health_interval,
+        max_sessions=args.max_sessions, idle_timeout=args.idle_timeout, store_path=args.store,
+    )
+
+    async def reload_world() -> None:
+        try:
+            summaries = await server.reload_world()
+        except (OSError, ValueError, WorkerError) as error:
+            print(f"Falha ao recarregar o mundo: {error}", file=sys.stderr)
+        else:
+            print(f"Mundo recarregado: {summaries[0] if summaries else ''}", file=sys.stderr)
+
+    async def serve() -> None:
+        await server.start()
+        loop = asyncio.get_running_loop()
+        # SIGHUP reinicia os workers um a um, por exemplo depois de atualizar o código
+        if hasattr(signal, "SIGHUP"):
+            loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(server.rolling_restart()))
+        # SIGUSR1 recarrega o world.json nas sessões abertas, sem reiniciar os workers
+        if hasattr(signal, "SIGUSR1"):
+            loop.add_signal_handler(signal.SIGUSR1, lambda: loop.create_task(reload_world()))
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
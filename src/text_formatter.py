@@ -0,0 +1,136 @@
+from typing import Any
+
+from command_result import (
+    CommandResult, GameEvent,
+    EVENT_SEPARATOR, EVENT_SECTION, EVENT_GAME, EVENT_SUCCESS, EVENT_ERROR, EVENT_DIALOG,
+)
+
+# colorama.Fore e colorama.Style, importados por load_colors(): só a saída colorida precisa do colorama
+Fore: Any = None
+Style: Any = None
+
+_terminal_ready = False
+
+
+def load_colors() -> None:
+    """Importa os códigos de cor do colorama, sem o init() que troca o sys.stdout."""
+    global Fore, Style
+    if Fore is None:
+        from colorama import Fore, Style
+
+
+def init_terminal() -> None:
+    """Prepara o terminal para os códigos de cor (no Windows, via colorama), uma única vez por processo.
+
+    Chamada só quando um TerminalSink é criado: ferramentas e servidores que não mostram saída colorida
+    não importam o colorama nem têm o sys.stdout substituído por ele.
+    """
+    global _terminal_ready
+    if _terminal_ready:
+        return
+    _terminal_ready = True
+    load_colors()
+    from colorama import init
+    init()
+
+
+class TextFormatter:
+    """Gerencia toda a formatação e estilo de texto da interface do jogo."""
+
+    # Formatadores sem cor não carregam o colorama
+    colored = True
+
+    def __init__(self) -> None:
+        if self.colored:
+            load_colors()
+        self.separator = "=" * 60
+        self.section_separator = "-" * 60
+
+    def format_separator(self) -> str:
+        """Retorna uma linha separadora formatada."""
+        return f"\n{Fore.CYAN}{self.separator}{Style.RESET_ALL}\n"
+
+    def format_section(self, title: str) -> str:
+        """Retorna um cabeçalho de seção formatado com título e sublinhado."""
+        return f"\n{Fore.YELLOW}{title}\n{'-' * len(title)}{Style.RESET_ALL}"
+
+    def format_game_output(self, text: str) -> str:
+        """Retorna uma mensagem geral do jogo formatada."""
+        return f"{Fore.GREEN}>>> {text}{Style.RESET_ALL}"
+
+    def format_error(self, text: str) -> str:
+        """Retorna uma mensagem de erro formatada."""
+        return f"{Fore.RED}>>> {text}{Style.RESET_ALL}"
+
+    def format_success(self, text: str) -> str:
+        """Retorna uma mensagem de sucesso formatada."""
+        return f"{Fore.GREEN}>>> {text}{Style.RESET_ALL}"
+
+    def format_npc_dialog(self, npc_name: str, dialog: str) -> str:
+        """Retorna um diálogo de NPC formatado."""
+        return f"{Fore.MAGENTA}>>> {npc_name}: {dialog}{Style.RESET_ALL}"
+
+    def format_input_prompt(self) -> str:
+        """Retorna um prompt de entrada formatado."""
+        return f"{Fore.CYAN}>>> O que você quer fazer? {Style.RESET_ALL}"
+
+    def format_game_title(self) -> str:
+        """Retorna o título do jogo formatado."""
+        return f"\n{Fore.CYAN}=== AVENTURA TEXTUAL ==={Style.RESET_ALL}\n"
+
+    def format_farewell(self) -> str:
+        """Retorna uma mensagem de despedida formatada."""
+        return f"\n{Fore.GREEN}Obrigado por jogar! Até a próxima aventura!{Style.RESET_ALL}"
+
+    def format_event(self, event: GameEvent) -> str:
+        """Retorna um evento do motor formatado conforme o seu tipo."""
+        if event.kind == EVENT_SEPARATOR:
+            return self.format_separator()
+        if event.kind == EVENT_SECTION:
+            return self.format_section(event.text)
+        if event.kind == EVENT_GAME:
+            return self.format_game_output(event.text)
+        if event.kind == EVENT_SUCCESS:
+            return self.format_success(event.text)
+        if event.kind == EVENT_ERROR:
+            return self.format_error(event.text)
+        if event.kind == EVENT_DIALOG:
+            return self.format_npc_dialog(event.speaker, event.text)
+        return event.text
+
+    def render(self, result: CommandResult) -> str:
+        """Retorna todos os eventos de um resultado como um único texto, um por linha."""
+        return "".join(self.format_event(event) + "\n" for event in result.events)
+
+
+class PlainTextFormatter(TextFormatter):
+    """Formatação sem códigos de cor, usada por clientes de rede e logs."""
+
+    colored = False
+
+    def format_separator(self) -> str:
+        return f"\n{self.separator}\n"
+
+    def format_section(self, title: str) -> str:
+        return f"\n{title}\n{'-' * len(title)}"
+
+    def format_game_output(self, text: str) -> str:
+        return f">>> {text}"
+
+    def format_error(self, text: str) -> str:
+        return f">>> {text}"
+
+    def format_success(self, text: str) -> str:
+        return f">>> {text}"
+
+    def format_npc_dialog(self, npc_name: str, dialog: str) -> str:
+        return f">>> {npc_name}: {dialog}"
+
+    def format_input_prompt(self) -> str:
+        return ">>> O que você quer fazer? "
+
+    def format_game_title(self) -> str:
+        return "\n=== AVENTURA TEXTUAL ===\n"
+
+    def format_farewell(self) -> str:
+        return "\nObrigado por jogar! Até a próxima aventura!"
@@ -0,0 +1,241 @@
+import argparse
+import json
+import sys
+import time
+from array import array
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from world_constants import START_PLACE
+from world_graph import WorldGraph
+
+
+@dataclass
+class WorldReport:
+    """Resultado da análise de um mundo: erros que quebram o jogo e avisos de conteúdo suspeito."""
+    place_count: int = 0
+    edge_count: int = 0
+    item_count: int = 0
+    npc_count: int = 0
+    start_place: str = START_PLACE
+    missing_start: bool = False
+    duplicate_places: Dict[str, int] = field(default_factory=dict)
+    duplicate_items: Dict[str, int] = field(default_factory=dict)
+    duplicate_npcs: Dict[str, int] = field(default_factory=dict)
+    dangling_links: List[Tuple[str, str]] = field(default_factory=list)
+    dangling_items: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+    dangling_npcs: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+    unreachable: List[str] = field(default_factory=list)
+    dead_ends: List[str] = field(default_factory=list)
+    traps: List[str] = field(default_factory=list)
+    one_way_links: int = 0
+    component_count: int = 0
+    largest_component: int = 0
+    out_degree: Dict[str, float] = field(default_factory=dict)
+    in_degree: Dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def errors(self) -> List[str]:
+        """Problemas que fazem o mundo carregar diferente do que o autor escreveu."""
+        errors = []
+        if self.missing_start:
+            errors.append(f"Lugar inicial '{self.start_place}' não existe.")
+        for kind, duplicates in (("lugar", self.duplicate_places), ("item", self.duplicate_items),
+                                 ("NPC", self.duplicate_npcs)):
+            errors.extend(f"Nome de {kind} duplicado: '{name}' ({count}x)" for name, count in duplicates.items())
+        errors.extend(f"'{place}' leva a '{target}', que não existe" for place, target in self.dangling_links)
+        errors.extend(f"Local '{location}' não encontrado para o item '{name}'" for name, location in self.dangling_items)
+        errors.extend(f"Local '{location}' não encontrado para o NPC '{name}'" for name, location in self.dangling_npcs)
+        errors.extend(f"'{place}' não é alcançável a partir de '{self.start_place}'" for place in self.unreachable)
+        return errors
+
+    @property
+    def warnings(self) -> List[str]:
+        """Situações permitidas, mas que costumam ser erro de conteúdo."""
+        warnings = [f"'{place}' não tem saídas" for place in self.dead_ends]
+        warnings.extend(f"De '{place}' não há caminho de volta para '{self.start_place}'" for place in self.traps)
+        return warnings
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["errors"] = self.errors
+        data["warnings"] = self.warnings
+        return data
+
+
+def _duplicates(records: List[Dict]) -> Dict[str, int]:
+    counts = Counter(data.get("name") for data in records)
+    return {name: count for name, count in counts.items() if count > 1}
+
+
+def _reachable(start: int, size: int, offsets: array, targets: array) -> bytearray:
+    """BFS por camadas; retorna uma máscara com 1 para cada lugar alcançado."""
+    seen = bytearray(size)
+    seen[start] = 1
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for position in frontier:
+            for neighbor in targets[offsets[position]:offsets[position + 1]]:
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return seen
+
+
+def _components(size: int, offsets: array, targets: array,
+                reverse_offsets: array, reverse_targets: array) -> array:
+    """Componentes fortemente conexos (Kosaraju iterativo); retorna o id do componente de cada lugar."""
+    visited = bytearray(size)
+    order = array("i")
+    stack = array("i")
+    cursor = array("i")
+    for root in range(size):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        stack.append(root)
+        cursor.append(offsets[root])
+        while stack:
+            node = stack[-1]
+            index = cursor[-1]
+            end = offsets[node + 1]
+            while index < end and visited[targets[index]]:
+                index += 1
+            if index < end:
+                cursor[-1] = index + 1
+                neighbor = targets[index]
+                visited[neighbor] = 1
+                stack.append(neighbor)
+                cursor.append(offsets[neighbor])
+            else:
+                stack.pop()
+                cursor.pop()
+                order.append(node)
+
+    component = array("i", [-1]) * size
+    count = 0
+    for root in reversed(order):
+        if component[root] >= 0:
+            continue
+        component[root] = count
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            for neighbor in reverse_targets[reverse_offsets[node]:reverse_offsets[node + 1]]:
+                if component[neighbor] < 0:
+                    component[neighbor] = count
+                    pending.append(neighbor)
+        count += 1
+    return component
+
+
+def _degree_stats(degrees: List[int]) -> Dict[str, float]:
+    if not degrees:
+        return {"min": 0, "max": 0, "mean": 0.0, "median": 0, "zero": 0}
+    ordered = sorted(degrees)
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "median": ordered[len(ordered) // 2],
+        "zero": len(ordered) - len([degree for degree in ordered if degree]),
+    }
+
+
+def analyze(world: Dict, start_place: str = START_PLACE) -> WorldReport:
+    """Analisa os dados de um mundo (o conteúdo do world.json) sem construir os objetos do jogo."""
+    started = time.perf_counter()
+    locations = world.get("locations", [])
+    items = world.get("items", [])
+    characters = world.get("characters", [])
+    report = WorldReport(start_place=start_place, item_count=len(items), npc_count=len(characters))
+    report.duplicate_places = _duplicates(locations)
+    report.duplicate_items = _duplicates(items)
+    report.duplicate_npcs = _duplicates(characters)
+
+    # Como no carregamento, um nome repetido substitui o anterior
+    rows: Dict[str, List[str]] = {}
+    for data in locations:
+        rows[data.get("name", "")] = data.get("takes_to", [])
+    for place, takes_to in rows.items():
+        report.dangling_links.extend((place, target) for target in takes_to if target not in rows)
+    report.dangling_items = [(data.get("name"), data.get("location")) for data in items
+                             if data.get("location") not in rows]
+    report.dangling_npcs = [(data.get("name"), data.get("location")) for data in characters
+                            if data.get("location") not in rows]
+
+    graph = WorldGraph.from_adjacency(rows.items())
+    names, offsets, targets = graph.names, graph.offsets, graph.targets
+    size = len(names)
+    report.place_count = size
+    report.edge_count = len(targets)
+    reverse_offsets, reverse_targets = graph.transposed()
+
+    out_degrees = [offsets[position + 1] - offsets[position] for position in range(size)]
+    in_degrees = [reverse_offsets[position + 1] - reverse_offsets[position] for position in range(size)]
+    report.out_degree = _degree_stats(out_degrees)
+    report.in_degree = _degree_stats(in_degrees)
+    report.dead_ends = [names[position] for position in range(size) if not out_degrees[position]]
+
+    # Ligações sem volta: a -> b sem b -> a
+    edges = set()
+    for source in range(size):
+        base = source * size
+        edges.update(base + target for target in targets[offsets[source]:offsets[source + 1]])
+    report.one_way_links = sum(1 for edge in edges if (edge % size) * size + edge // size not in edges)
+
+    start = graph.positions.get(start_place)
+    if start is None:
+        report.missing_start = True
+    else:
+        forward = _reachable(start, size, offsets, targets)
+        backward = _reachable(start, size, reverse_offsets, reverse_targets)
+        report.unreachable = [names[position] for position in range(size) if not forward[position]]
+        report.traps = [names[position] for position in range(size) if forward[position] and not backward[position]]
+
+    component = _components(size, offsets, targets, reverse_offsets, reverse_targets)
+    sizes = Counter(component)
+    report.component_count = len(sizes)
+    report.largest_component = max(sizes.values(), default=0)
+    report.elapsed = round(time.perf_counter() - started, 3)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Valida o grafo e as referências de um world.json.")
+    parser.add_argument("world", help="caminho do world.json")
+    parser.add_argument("--start", default=START_PLACE, help="lugar inicial do jogador")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    parser.add_argument("--limit", type=int, default=20, help="máximo de problemas listados por tipo")
+    parser.add_argument("--strict", action="store_true", help="também falha quando houver avisos")
+    args = parser.parse_args()
+
+    with open(args.world, "r", encoding="utf8") as f:
+        report = analyze(json.load(f), args.start)
+
+    errors, warnings = report.errors, report.warnings
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(f"{report.place_count} lugares, {report.edge_count} ligações, {report.item_count} itens, "
+              f"{report.npc_count} NPCs ({report.elapsed}s)")
+        print(f"{report.component_count} componentes fortemente conexos (maior: {report.largest_component}), "
+              f"{report.one_way_links} ligações sem volta")
+        print(f"Grau de saída: {report.out_degree}")
+        print(f"Grau de entrada: {report.in_degree}")
+        for title, messages in (("Erros", errors), ("Avisos", warnings)):
+            if messages:
+                print(f"\n{title} ({len(messages)}):")
+                for message in messages[:args.limit]:
+                    print(f"- {message}")
+                if len(messages) > args.limit:
+                    print(f"- ... e mais {len(messages) - args.limit}")
+    sys.exit(1 if errors or (args.strict and warnings) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# Lugar onde todo jogador começa; um world.json jogável precisa ter um lugar com este nome.
+# Fica fora do game_engine para que as ferramentas offline (analisador, gerador, solver) não importem o motor.
+START_PLACE = "Floresta"
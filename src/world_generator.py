@@ -0,0 +1,126 @@
+import argparse
+import json
+import random
+from typing import Dict, List, Optional
+
+from world_constants import START_PLACE
+
+# Proporção padrão de cada tipo de item no mundo gerado
+DEFAULT_ITEM_MIX: Dict[str, float] = {
+    "weapon": 0.2,
+    "armor": 0.15,
+    "key": 0.15,
+    "potion": 0.3,
+    "quest_item": 0.2,
+}
+
+ITEM_LABELS = {
+    "weapon": "Espada",
+    "armor": "Armadura",
+    "key": "Chave",
+    "potion": "Poção",
+    "quest_item": "Relíquia",
+}
+# Objetivos do mundo (os GOAL_TYPES de world_solver): sempre pegáveis, para o mundo gerado poder ser cumprido
+GOAL_TYPES = ("quest_item", "key")
+
+ADJECTIVES = ["antiga", "escura", "silenciosa", "úmida", "iluminada", "abandonada", "estreita", "ampla"]
+NOUNS = ["floresta", "caverna", "ponte", "torre", "praça", "capela", "estrada", "ruína"]
+DIALOG = [
+    "Olá, aventureiro!",
+    "Dizem que há um tesouro escondido perto daqui.",
+    "Cuidado com as estradas à noite.",
+    "Se encontrar algo estranho, me avise.",
+    "Esta região já foi próspera, sabia?",
+]
+
+
+def _description(rng: random.Random) -> str:
+    return f"Uma {rng.choice(NOUNS)} {rng.choice(ADJECTIVES)}, perto de uma {rng.choice(NOUNS)} {rng.choice(ADJECTIVES)}."
+
+
+def generate_world(places: int = 100, fanout: int = 3, items: int = 200, npcs: int = 50, dialog_lines: int = 3,
+                   seed: int = 0, item_mix: Optional[Dict[str, float]] = None) -> Dict:
+    """Gera um mundo válido e reproduzível: a mesma semente produz sempre o mesmo world.json.
+
+    Todos os lugares são alcançáveis a partir de START_PLACE (uma árvore de ligações de ida e volta
+    garante isso), o lugar inicial sempre tem uma arma pegável e um NPC, e as chaves e os itens de
+    missão são sempre pegáveis: só os demais itens podem ficar presos no lugar.
+    """
+    rng = random.Random(seed)
+    places = max(places, 2)
+    names = [START_PLACE] + [f"Lugar {i}" for i in range(1, places)]
+    takes_to: List[List[str]] = [[] for _ in names]
+    links = [set() for _ in names]
+
+    def link(source: int, target: int) -> None:
+        if source != target and target not in links[source]:
+            links[source].add(target)
+            takes_to[source].append(names[target])
+
+    for position in range(1, places):
+        parent = rng.randrange(position)
+        link(position, parent)
+        link(parent, position)
+    for position in range(places):
+        for _ in range(max(fanout - len(takes_to[position]), 0)):
+            link(position, rng.randrange(places))
+
+    locations = [
+        {"name": name, "description": _description(rng), "takes_to": takes_to[position]}
+        for position, name in enumerate(names)
+    ]
+
+    mix = item_mix or DEFAULT_ITEM_MIX
+    kinds, weights = list(mix), list(mix.values())
+    items_data = []
+    for i in range(items):
+        item_type = "weapon" if i == 0 else rng.choices(kinds, weights)[0]
+        data = {
+            "name": f"{ITEM_LABELS[item_type]} {i}",
+            "description": _description(rng),
+            "location": START_PLACE if i == 0 else rng.choice(names),
+            # Sorteado antes de olhar o tipo: a mesma semente continua gerando os mesmos itens
+            "pickable": i == 0 or rng.random() < 0.9 or item_type in GOAL_TYPES,
+            "type": item_type,
+        }
+        if item_type == "weapon":
+            data["offense_bonus"] = rng.randint(1, 30)
+        elif item_type == "armor":
+            data["defense_bonus"] = rng.randint(1, 30)
+        elif item_type == "potion":
+            data["heal_amount"] = rng.randint(5, 50)
+        items_data.append(data)
+
+    characters = [
+        {
+            "name": f"Personagem {i}",
+            "description": _description(rng),
+            "location": START_PLACE if i == 0 else rng.choice(names),
+            "type": "NPC",
+            "dialog": rng.sample(DIALOG, min(dialog_lines, len(DIALOG))),
+        }
+        for i in range(npcs)
+    ]
+    return {"locations": locations, "items": items_data, "characters": characters}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera um world.json sintético e reproduzível.")
+    parser.add_argument("-o", "--output", default="world.json", help="arquivo de saída")
+    parser.add_argument("--places", type=int, default=100)
+    parser.add_argument("--fanout", type=int, default=3, help="ligações por lugar (mínimo)")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--npcs", type=int, default=50)
+    parser.add_argument("--dialog-lines", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    world = generate_world(args.places, args.fanout, args.items, args.npcs, args.dialog_lines, args.seed)
+    with open(args.output, "w", encoding="utf8") as f:
+        json.dump(world, f, ensure_ascii=False, indent=1)
+    print(args.output)
+
+
+if __name__ == "__main__":
+    main()
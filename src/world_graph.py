@@ -0,0 +1,258 @@
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from name_index import NameIndex
+
+if TYPE_CHECKING:
+    from world_snapshot import WorldSnapshot
+
+# Linhas trocadas por recarregamentos ficam na tabela de transbordo até passarem desta fração dos lugares
+OVERFLOW_LIMIT = 0.125
+
+
+class WorldGraph:
+    """Grafo de ligações entre lugares (takes_to) em formato CSR, com rotas mais curtas por BFS.
+
+    O lugar i liga-se aos lugares targets[offsets[i]:offsets[i + 1]], a não ser que um recarregamento
+    tenha trocado a linha dele por uma de outro tamanho: essas ficam em overflow (posição -> destinos)
+    até a próxima compact(). Destinos que não existem no mundo ficam de fora do grafo. As rotas
+    calculadas ficam em cache até a próxima alteração do grafo.
+    """
+
+    def __init__(self, names: List[str], offsets: array, targets: array, path_cache_size: int = 4096) -> None:
+        self.names = names
+        self.positions: Dict[str, int] = {name: position for position, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.overflow: Dict[int, array] = {}
+        self.version = 0
+        self.path_cache_size = path_cache_size
+        self._paths: "OrderedDict[Tuple[int, int], Optional[Tuple[int, ...]]]" = OrderedDict()
+        self._index: Optional[NameIndex] = None
+        self._transposed: Optional[Tuple[array, array]] = None
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Iterable[Tuple[str, Iterable[str]]]) -> "WorldGraph":
+        """Compila pares (lugar, destinos) em arrays de inteiros."""
+        rows = list(adjacency)
+        names = [name for name, _ in rows]
+        positions = {name: position for position, name in enumerate(names)}
+        offsets = array("i", [0])
+        targets = array("i")
+        for _, takes_to in rows:
+            targets.extend(positions[name] for name in takes_to if name in positions)
+            offsets.append(len(targets))
+        return cls(names, offsets, targets)
+
+    @classmethod
+    def from_places(cls, places: Mapping) -> "WorldGraph":
+        """Compila o grafo a partir dos objetos Place de um template."""
+        return cls.from_adjacency((name, place.takes_to) for name, place in places.items())
+
+    @classmethod
+    def from_snapshot(cls, snapshot: "WorldSnapshot") -> "WorldGraph":
+        """Compila o grafo direto das seções do snapshot, sem materializar nenhum lugar."""
+        from world_snapshot import PLACE_FIELDS
+        records = snapshot.sections["places"]
+        adjacency = snapshot.sections["adjacency"]
+        # Os nomes são deduplicados na tabela de strings, então o id da string identifica o lugar
+        name_ids = records[0::PLACE_FIELDS]
+        positions = {string_id: position for position, string_id in enumerate(name_ids)}
+        names = [snapshot.string(string_id) for string_id in name_ids]
+        offsets = array("i", [0])
+        targets = array("i")
+        for position in range(len(names)):
+            start = records[position * PLACE_FIELDS + 2]
+            count = records[position * PLACE_FIELDS + 3]
+            targets.extend(
+                positions[string_id] for string_id in adjacency[start:start + count] if string_id in positions
+            )
+            offsets.append(len(targets))
+        return cls(names, offsets, targets)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        offsets = self.offsets
+        return len(self.targets) + sum(len(row) - (offsets[position + 1] - offsets[position])
+                                       for position, row in self.overflow.items())
+
+    def row(self, position: int) -> array:
+        """Destinos do lugar na posição, vindos da tabela de transbordo quando a linha foi trocada."""
+        row = self.overflow.get(position)
+        if row is None:
+            row = self.targets[self.offsets[position]:self.offsets[position + 1]]
+        return row
+
+    def neighbors(self, name: str) -> List[str]:
+        names = self.names
+        return [names[target] for target in self.row(self.positions[name])]
+
+    def within(self, name: str, radius: int) -> List[str]:
+        """Lugares a até radius ligações de name (incluindo ele), em ordem de distância."""
+        start = self.positions[name]
+        row = self.row
+        seen = {start}
+        order = [start]
+        frontier = [start]
+        for _ in range(radius):
+            next_frontier = []
+            for position in frontier:
+                for neighbor in row(position):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        next_frontier.append(neighbor)
+            order.extend(next_frontier)
+            frontier = next_frontier
+        names = self.names
+        return [names[position] for position in order]
+
+    def find(self, query: str) -> Optional[str]:
+        """Retorna o nome do lugar que corresponde à consulta, tolerando acentos, nomes parciais e erros de digitação."""
+        if self._index is None:
+            self._index = NameIndex(self.names)
+        return self._index.resolve(query)
+
+    def update(self, name: str, takes_to: Iterable[str]) -> None:
+        """Troca as ligações de um lugar (criando-o se for novo) e descarta as rotas em cache."""
+        self.update_many({name: takes_to})
+
+    def update_many(self, links: Mapping[str, Iterable[str]]) -> None:
+        """Troca as ligações de vários lugares sem recompilar os arrays.
+
+        Uma linha do mesmo tamanho da antiga é gravada no lugar dela; as outras vão para a tabela de
+        transbordo, incorporada aos arrays por compact() quando passa de OVERFLOW_LIMIT dos lugares.
+        Lugares existentes mantêm suas posições e os novos entram no fim, então quem guarda posições
+        (como o relógio do mundo) continua válido.
+        """
+        names, positions, offsets = self.names, self.positions, self.offsets
+        added = [name for name in links if name not in positions]
+        for name in added:
+            positions[name] = len(names)
+            names.append(name)
+            offsets.append(offsets[-1])
+        targets = self.targets
+        for name, takes_to in links.items():
+            position = positions[name]
+            row = array("i", (positions[target] for target in takes_to if target in positions))
+            start, end = offsets[position], offsets[position + 1]
+            if len(row) == end - start:
+                targets[start:end] = row
+                self.overflow.pop(position, None)
+            else:
+                self.overflow[position] = row
+        if len(self.overflow) > len(names) * OVERFLOW_LIMIT:
+            self.compact()
+        if self._index is not None:
+            for name in added:
+                self._index.add(name)
+        self.invalidate()
+
+    def compact(self) -> None:
+        """Recompila os arrays com as linhas da tabela de transbordo, esvaziando-a."""
+        if not self.overflow:
+            return
+        offsets = array("i", [0])
+        targets = array("i")
+        for position in range(len(self.names)):
+            targets.extend(self.row(position))
+            offsets.append(len(targets))
+        self.offsets, self.targets = offsets, targets
+        self.overflow = {}
+
+    def invalidate(self) -> None:
+        """Marca o grafo como alterado, descartando as rotas em cache."""
+        self.version += 1
+        self._paths.clear()
+        self._transposed = None
+
+    def transposed(self) -> Tuple[array, array]:
+        """Grafo reverso em CSR (quem leva a cada lugar), montado por contagem e guardado até a próxima alteração."""
+        if self._transposed is None:
+            size = len(self.names)
+            reverse_offsets = array("i", [0]) * (size + 1)
+            for position in range(size):
+                for target in self.row(position):
+                    reverse_offsets[target + 1] += 1
+            for position in range(size):
+                reverse_offsets[position + 1] += reverse_offsets[position]
+            cursor = array("i", reverse_offsets)
+            reverse_targets = array("i", [0]) * reverse_offsets[size]
+            for source in range(size):
+                for target in self.row(source):
+                    reverse_targets[cursor[target]] = source
+                    cursor[target] += 1
+            self._transposed = (reverse_offsets, reverse_targets)
+        return self._transposed
+
+    def bfs_tree(self, source: int, reverse: bool = False) -> array:
+        """Pai de cada lugar numa BFS por camadas a partir de source (-1 para os não alcançados).
+
+        Com reverse, segue as ligações ao contrário: os alcançados são os lugares que chegam a source.
+        """
+        if reverse:
+            offsets, targets = self.transposed()
+
+            def row(position: int) -> array:
+                return targets[offsets[position]:offsets[position + 1]]
+        else:
+            row = self.row
+        parents = array("i", [-1]) * len(self.names)
+        parents[source] = source
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for position in frontier:
+                for neighbor in row(position):
+                    if parents[neighbor] < 0:
+                        parents[neighbor] = position
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return parents
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Retorna a rota mais curta de source até target (incluindo os dois), ou None se não houver."""
+        source_position = self.positions.get(source)
+        target_position = self.positions.get(target)
+        if source_position is None or target_position is None:
+            return None
+        key = (source_position, target_position)
+        if key in self._paths:
+            self._paths.move_to_end(key)
+            route = self._paths[key]
+        else:
+            route = self._search(source_position, target_position)
+            self._paths[key] = route
+            if len(self._paths) > self.path_cache_size:
+                self._paths.popitem(last=False)
+        if route is None:
+            return None
+        names = self.names
+        return [names[position] for position in route]
+
+    def _search(self, source: int, target: int) -> Optional[Tuple[int, ...]]:
+        """BFS por camadas sobre os arrays CSR, parando assim que o destino é alcançado."""
+        if source == target:
+            return (source,)
+        row = self.row
+        parents = array("i", [-1]) * len(self.names)
+        parents[source] = source
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for position in frontier:
+                for neighbor in row(position):
+                    if parents[neighbor] >= 0:
+                        continue
+                    parents[neighbor] = position
+                    if neighbor == target:
+                        route = [target]
+                        while route[-1] != source:
+                            route.append(parents[route[-1]])
+                        return tuple(reversed(route))
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
+        return None
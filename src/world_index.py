@@ -0,0 +1,130 @@
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from name_index import NameIndex
+
+if TYPE_CHECKING:
+    from world_snapshot import WorldSnapshot
+
+# Local dos itens que estão no inventário do jogador
+INVENTORY = None
+
+
+def _add(index: Dict, key, name: str) -> None:
+    index.setdefault(key, set()).add(name)
+
+
+def _discard(index: Dict, key, name: str) -> None:
+    names = index.get(key)
+    if names is not None:
+        names.discard(name)
+        if not names:
+            del index[key]
+
+
+class WorldIndex:
+    """Índices secundários do mundo: itens por tipo, por local e pegáveis; NPCs por local.
+
+    Cada índice guarda chave -> conjunto de nomes e é atualizado a cada inclusão ou remoção de registro,
+    para que perguntas como "todas as poções" ou "o que há na Igreja" não percorram todos os objetos.
+    """
+
+    def __init__(self) -> None:
+        self.item_types: Dict[str, Set[str]] = {}
+        self.item_locations: Dict[Optional[str], Set[str]] = {}
+        self.pickable: Set[str] = set()
+        self.npc_locations: Dict[Optional[str], Set[str]] = {}
+        # nome -> (tipo, local) e nome -> local, para desfazer a entrada antiga ao mover ou substituir
+        self._items: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._npcs: Dict[str, Optional[str]] = {}
+        self._item_names: Optional[NameIndex] = None
+        self._npc_names: Optional[NameIndex] = None
+
+    @classmethod
+    def from_objects(cls, items: Mapping, npcs: Mapping) -> "WorldIndex":
+        """Indexa os objetos Item e NPC de um template."""
+        index = cls()
+        for item in items.values():
+            index.add_item(item.name, item.item_type, item.location, item.pickable)
+        for npc in npcs.values():
+            index.add_npc(npc.name, npc.location)
+        return index
+
+    @classmethod
+    def from_snapshot(cls, snapshot: "WorldSnapshot") -> "WorldIndex":
+        """Indexa direto dos registros do snapshot, sem materializar itens nem NPCs."""
+        from world_snapshot import ITEM_FIELDS, NPC_FIELDS
+        index = cls()
+        string = snapshot.string
+        items = snapshot.sections["items"]
+        for start in range(0, len(items), ITEM_FIELDS):
+            index.add_item(string(items[start]), string(items[start + 3]), string(items[start + 2]),
+                           bool(items[start + 4]))
+        npcs = snapshot.sections["npcs"]
+        for start in range(0, len(npcs), NPC_FIELDS):
+            index.add_npc(string(npcs[start]), string(npcs[start + 2]))
+        return index
+
+    def add_item(self, name: str, item_type: str, location: Optional[str], pickable: bool) -> None:
+        """Inclui um item, substituindo a entrada anterior de mesmo nome."""
+        if name in self._items:
+            self.remove_item(name)
+        self._items[name] = (item_type, location)
+        _add(self.item_types, item_type, name)
+        _add(self.item_locations, location, name)
+        if pickable:
+            self.pickable.add(name)
+        if self._item_names is not None:
+            self._item_names.add(name)
+
+    def remove_item(self, name: str) -> None:
+        item_type, location = self._items.pop(name)
+        _discard(self.item_types, item_type, name)
+        _discard(self.item_locations, location, name)
+        self.pickable.discard(name)
+        if self._item_names is not None:
+            self._item_names.remove(name)
+
+    def add_npc(self, name: str, location: Optional[str]) -> None:
+        if name in self._npcs:
+            self.remove_npc(name)
+        self._npcs[name] = location
+        _add(self.npc_locations, location, name)
+        if self._npc_names is not None:
+            self._npc_names.add(name)
+
+    def remove_npc(self, name: str) -> None:
+        _discard(self.npc_locations, self._npcs.pop(name), name)
+        if self._npc_names is not None:
+            self._npc_names.remove(name)
+
+    def item_names(self) -> Iterable[str]:
+        return self._items.keys()
+
+    def npc_names(self) -> Iterable[str]:
+        return self._npcs.keys()
+
+    def item_location(self, name: str) -> Optional[str]:
+        return self._items[name][1]
+
+    def item_type(self, name: str) -> str:
+        return self._items[name][0]
+
+    def npc_location(self, name: str) -> Optional[str]:
+        return self._npcs[name]
+
+    def has_item(self, name: str) -> bool:
+        return name in self._items
+
+    def has_npc(self, name: str) -> bool:
+        return name in self._npcs
+
+    def resolve_item(self, query: str) -> Optional[str]:
+        """Nome do item que corresponde à consulta, tolerando acentos, nomes parciais e erros de digitação."""
+        if self._item_names is None:
+            self._item_names = NameIndex(self._items)
+        return self._item_names.resolve(query)
+
+    def resolve_npc(self, query: str) -> Optional[str]:
+        if self._npc_names is None:
+            self._npc_names = NameIndex(self._npcs)
+        return self._npc_names.resolve(query)
@@ -0,0 +1,211 @@
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Set, TypeVar
+
+from world_template import WorldTemplate, build_item, item_record
+
+T = TypeVar("T")
+
+
+class CopyOnWriteDict(Mapping[str, T]):
+    """Mapeamento que lê do template compartilhado e só copia uma entrada quando ela vai ser alterada."""
+
+    def __init__(self, base: Mapping[str, T]) -> None:
+        self._base = base
+        self._own: Dict[str, T] = {}
+
+    def __getitem__(self, key: str) -> T:
+        own = self._own.get(key)
+        if own is not None:
+            return own
+        return self._base[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._own or key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._base
+        # Cópias da sessão cuja entrada saiu do template num recarregamento do mundo
+        base = self._base
+        for key in self._own:
+            if key not in base:
+                yield key
+
+    def __len__(self) -> int:
+        base = self._base
+        return len(base) + sum(1 for key in self._own if key not in base)
+
+    def mutable(self, key: str) -> T:
+        """Retorna a cópia da sessão para a entrada, criando-a na primeira alteração."""
+        own = self._own.get(key)
+        if own is None:
+            own = self._base[key].clone()
+            self._own[key] = own
+        return own
+
+    def discard(self, key: str) -> None:
+        """Descarta a cópia da sessão para a entrada, se houver."""
+        self._own.pop(key, None)
+
+    def owned(self) -> Dict[str, T]:
+        """Retorna apenas as entradas copiadas pela sessão."""
+        return self._own
+
+
+class WorldOverlay:
+    """Estado de uma sessão sobre um WorldTemplate, guardando apenas o que o jogador alterou."""
+
+    def __init__(self, template: WorldTemplate) -> None:
+        self.template = template
+        self.places: CopyOnWriteDict = CopyOnWriteDict(template.places)
+        self.items: CopyOnWriteDict = CopyOnWriteDict(template.items)
+        self.npcs: CopyOnWriteDict = CopyOnWriteDict(template.npcs)
+        # Itens que mudaram de lugar: nome -> lugar atual (None quando está no inventário)
+        self.item_locations: Dict[str, Optional[str]] = {}
+        # O mesmo registro invertido (lugar -> itens que a sessão levou para lá), para as consultas por local
+        self.items_moved_to: Dict[Optional[str], Set[str]] = {}
+        # Chamado depois que um recarregamento do mundo chega a este overlay (o engine atualiza suas referências)
+        self.on_reload: Optional[Callable[[Any], None]] = None
+        template.overlays.add(self)
+
+    def _move_item(self, item_name: str, location: Optional[str]) -> None:
+        """Registra o novo local de um item (None quando está no inventário)."""
+        if item_name in self.item_locations:
+            self.items_moved_to[self.item_locations[item_name]].discard(item_name)
+        self.item_locations[item_name] = location
+        self.items_moved_to.setdefault(location, set()).add(item_name)
+
+    def take_item(self, place_name: str, item_name: str) -> Any:
+        """Remove um item de um lugar e o registra como carregado pelo jogador."""
+        self.places.mutable(place_name).remove_item(item_name)
+        self._move_item(item_name, None)
+        return self.items[item_name]
+
+    def put_item(self, place_name: str, item_name: str) -> None:
+        """Coloca um item da sessão em um lugar."""
+        item = self.items.mutable(item_name)
+        self.places.mutable(place_name).add_item(item)
+        self._move_item(item_name, place_name)
+
+    def deltas(self) -> Dict[str, Any]:
+        """Retorna um resumo compacto das diferenças da sessão em relação ao template.
+
+        Itens que a sessão guarda mas que saíram do mundo num recarregamento vão junto, com o registro
+        completo, para que a restauração os recrie.
+        """
+        items = self.template.items
+        return {
+            "item_locations": dict(self.item_locations),
+            "orphans": {name: item_record(item) for name, item in self.items.owned().items() if name not in items},
+            "used": sorted(name for name, item in self.items.owned().items() if item.used),
+            "dialog_indexes": {
+                name: npc.current_dialog_index
+                for name, npc in self.npcs.owned().items() if npc.current_dialog_index
+            },
+        }
+
+    def apply_deltas(self, deltas: Dict[str, Any]) -> None:
+        """Reaplica sobre este overlay as diferenças produzidas por deltas().
+
+        Itens, lugares e NPCs que saíram do mundo num recarregamento depois do estado salvo são ignorados,
+        a não ser os itens que a sessão guardava (ver deltas()).
+        """
+        items, npcs = self.template.items, self.template.npcs
+        for name, data in deltas.get("orphans", {}).items():
+            if name not in items:
+                self.items.owned()[name] = build_item(data)
+        for name, location in deltas.get("item_locations", {}).items():
+            if name not in self.items or (location is not None and location not in self.places):
+                continue
+            item = self.items.mutable(name)
+            origin = items[name].location if name in items else None
+            if origin in self.places and name in self.places[origin].items:
+                self.places.mutable(origin).remove_item(name)
+            item.in_inventory = location is None
+            if location is not None:
+                self.places.mutable(location).add_item(item)
+            self._move_item(name, location)
+        for name in deltas.get("used", ()):
+            if name in self.items:
+                self.items.mutable(name).used = True
+        for name, index in deltas.get("dialog_indexes", {}).items():
+            if name in npcs:
+                npc = self.npcs.mutable(name)
+                npc.current_dialog_index = index % len(npc.dialog)
+
+    def apply_diff(self, diff) -> None:
+        """Leva às cópias desta sessão um recarregamento do mundo já aplicado ao template (ver world_reload).
+
+        O que a sessão mudou é preservado: itens carregados ou largados em outro lugar continuam onde o
+        jogador os deixou, mesmo que o registro tenha sido removido, e o diálogo dos NPCs segue de onde estava.
+        """
+        places, own_places = self.places, self.places.owned()
+        for name, (_, data) in diff.places.items():
+            if name in own_places:
+                if data is None:
+                    places.discard(name)
+                else:
+                    own_places[name].update(data["description"], data["takes_to"])
+
+        for name, (old, data) in diff.items.items():
+            item = self._reload_item(name, data)
+            if name in self.item_locations:
+                location = self.item_locations[name]
+                # O item aparece onde a sessão o deixou, não onde o template o colocou agora
+                target = data["location"] if data is not None else None
+                if target != location and target in places and name in places[target].items:
+                    places.mutable(target).remove_item(name)
+                if location in own_places and item is not None:
+                    own_places[location].add_item(item)
+                continue
+            origin = old["location"] if old is not None else None
+            target = data["location"] if data is not None else None
+            if origin != target and origin in own_places:
+                own_places[origin].remove_item(name)
+            if target in own_places and item is not None:
+                own_places[target].add_item(item)
+
+        for name, (old, data) in diff.npcs.items():
+            own = self.npcs.owned().get(name)
+            origin = own.location if own is not None else old["location"] if old is not None else None
+            target = data["location"] if data is not None else None
+            npc = self._reload_npc(name, data)
+            if npc is not None and npc is own:
+                npc.location = target
+            if origin != target and origin in own_places:
+                own_places[origin].remove_character(name)
+            if target in own_places and npc is not None:
+                own_places[target].add_character(npc)
+
+        if self.on_reload is not None:
+            self.on_reload(diff)
+
+    def _reload_item(self, name: str, data: Optional[Dict]) -> Any:
+        """Atualiza a cópia da sessão de um item recarregado e retorna o objeto que a sessão deve usar."""
+        template_item = self.template.items.get(name)
+        own = self.items.owned().get(name)
+        if own is None:
+            return template_item
+        if data is None:
+            # Removido do mundo: só continua existindo se a sessão o tiver movido (por exemplo, no inventário)
+            if name not in self.item_locations:
+                self.items.discard(name)
+                return None
+            return own
+        if type(own) is type(template_item):
+            own.update_from(template_item, keep=("used", "in_inventory", "location"))
+            return own
+        replacement = template_item.clone()
+        replacement.used, replacement.in_inventory, replacement.location = own.used, own.in_inventory, own.location
+        self.items.owned()[name] = replacement
+        return replacement
+
+    def _reload_npc(self, name: str, data: Optional[Dict]) -> Any:
+        """Atualiza a cópia da sessão de um NPC recarregado e retorna o objeto que a sessão deve usar."""
+        own = self.npcs.owned().get(name)
+        if own is None:
+            return self.template.npcs.get(name)
+        if data is None:
+            self.npcs.discard(name)
+            return None
+        own.update_from(self.template.npcs[name], keep=("location", "current_dialog_index", "inventory"))
+        own.current_dialog_index %= len(own.dialog)
+        return own
@@ -0,0 +1,133 @@
+import os
+import sys
+from typing import TYPE_CHECKING, Iterable, List, Optional, Set
+
+from world_index import INVENTORY, WorldIndex
+from world_overlay import WorldOverlay
+from world_template import WorldTemplate
+
+if TYPE_CHECKING:
+    from world_tick import WorldScheduler
+
+
+class WorldQuery:
+    """Consultas de uma sessão sobre os índices do template, corrigidos pelo que a sessão moveu.
+
+    Os itens levados ou largados pelo jogador vêm do registro de movimentos do overlay; os NPCs,
+    do relógio do mundo quando a sessão o usa. Nenhuma consulta percorre todos os itens do mundo.
+    """
+
+    def __init__(self, overlay: WorldOverlay, simulation: Optional["WorldScheduler"] = None) -> None:
+        self.overlay = overlay
+        self.simulation = simulation
+
+    @property
+    def index(self) -> WorldIndex:
+        return self.overlay.template.index
+
+    def locate_item(self, name: str) -> Optional[str]:
+        """Local atual do item na sessão (INVENTORY quando está com o jogador)."""
+        moved = self.overlay.item_locations
+        if name in moved:
+            return moved[name]
+        return self.index.item_location(name)
+
+    def items_at(self, location: Optional[str]) -> Set[str]:
+        """Itens que estão no local (INVENTORY para os carregados pelo jogador)."""
+        moved = self.overlay.item_locations
+        found = {name for name in self.index.item_locations.get(location, ()) if name not in moved}
+        found |= self.overlay.items_moved_to.get(location, set())
+        return found
+
+    def find_items(self, item_type: Optional[str] = None, places: Optional[Iterable[Optional[str]]] = None,
+                   pickable: Optional[bool] = None) -> List[str]:
+        """Itens que atendem a todos os filtros informados, em ordem alfabética.
+
+        places pode incluir INVENTORY. Os conjuntos são intersectados a partir do menor.
+        """
+        index = self.index
+        sets = []
+        if item_type is not None:
+            sets.append(index.item_types.get(item_type, set()))
+        if places is not None:
+            found: Set[str] = set()
+            for location in places:
+                found |= self.items_at(location)
+            sets.append(found)
+        if pickable:
+            sets.append(index.pickable)
+        if sets:
+            sets.sort(key=len)
+            names = set(sets[0])
+            for other in sets[1:]:
+                names &= other
+        else:
+            names = set(index.item_names())
+        if pickable is False:
+            names -= index.pickable
+        return sorted(names)
+
+    def region(self, center: str, radius: int) -> List[str]:
+        """Lugares a até radius ligações do centro, para consultas como "poções nesta região"."""
+        return self.overlay.template.graph.within(center, radius)
+
+    def locate_npc(self, name: str) -> Optional[str]:
+        simulation = self.simulation
+        if simulation is not None and name in simulation.npc_positions:
+            return simulation.where(name)
+        return self.index.npc_location(name)
+
+    def npcs_at(self, place_name: str) -> List[str]:
+        if self.simulation is not None:
+            return sorted(self.simulation.npcs_at(place_name))
+        return sorted(self.index.npc_locations.get(place_name, ()))
+
+
+def describe_location(location: Optional[str]) -> str:
+    return "inventário" if location is INVENTORY else str(location)
+
+
+def main() -> None:
+    # O argparse e o json só servem à linha de comando; o GameEngine importa este módulo sem precisar deles
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Consulta itens e NPCs de um world.json pelos índices secundários.")
+    parser.add_argument("world", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "world.json"),
+                        help="caminho do world.json")
+    parser.add_argument("--type", help="tipo do item (weapon, armor, key, potion, quest_item, ...)")
+    parser.add_argument("--place", action="append", help="lugar (pode repetir)")
+    parser.add_argument("--radius", type=int, help="inclui os lugares a até N ligações de cada --place")
+    parser.add_argument("--pickable", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--npcs", action="store_true", help="lista os NPCs dos lugares em vez dos itens")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    template = WorldTemplate.load_compiled(args.world) or WorldTemplate.load(args.world)
+    query = WorldQuery(WorldOverlay(template))
+    places = None
+    if args.place:
+        places = []
+        for place in args.place:
+            if place not in template.places:
+                sys.exit(f"Lugar '{place}' não encontrado.")
+            places.extend(query.region(place, args.radius) if args.radius else [place])
+
+    if args.npcs:
+        result = {place: query.npcs_at(place) for place in places or template.places}
+        result = {place: names for place, names in result.items() if names}
+    else:
+        names = query.find_items(args.type, places, args.pickable)
+        result = {}
+        for name in names:
+            result.setdefault(describe_location(query.locate_item(name)), []).append(name)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        for location, names in result.items():
+            print(f"{location}: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from world_snapshot import BONUS_FIELDS
+from world_template import WorldTemplate, item_record
+
+DEFAULT_DIALOG = ["Olá, aventureiro!"]
+
+# Registro antes e depois do recarregamento; None quando o nome não existe naquele lado
+Change = Tuple[Optional[Dict], Optional[Dict]]
+
+
+def _place_record(data: Dict) -> Dict:
+    return {
+        "name": data.get("name", ""),
+        "description": data.get("description", ""),
+        "takes_to": list(data.get("takes_to", [])),
+    }
+
+
+def _item_record(data: Dict) -> Dict:
+    item_type = data.get("type", "generic")
+    record = {
+        "name": data.get("name"),
+        "description": data.get("description", ""),
+        "location": data.get("location"),
+        "type": item_type,
+        "pickable": bool(data.get("pickable", False)),
+    }
+    if item_type in BONUS_FIELDS:
+        record[BONUS_FIELDS[item_type]] = int(data.get(BONUS_FIELDS[item_type], 0))
+    return record
+
+
+def _npc_record(data: Dict) -> Dict:
+    return {
+        "name": data.get("name"),
+        "description": data.get("description"),
+        "location": data.get("location"),
+        "dialog": list(data.get("dialog") or DEFAULT_DIALOG),
+    }
+
+
+@dataclass
+class WorldDiff:
+    """Registros que mudaram entre duas versões do mundo, por nome de lugar, item e NPC.
+
+    Cada entrada guarda (registro antigo, registro novo) já com os valores padrão de WorldTemplate,
+    para que uma chave omitida no JSON não conte como mudança.
+    """
+
+    places: Dict[str, Change] = field(default_factory=dict)
+    items: Dict[str, Change] = field(default_factory=dict)
+    npcs: Dict[str, Change] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.places) + len(self.items) + len(self.npcs)
+
+    def summary(self) -> str:
+        parts = []
+        for kind, changes in (("lugares", self.places), ("itens", self.items), ("NPCs", self.npcs)):
+            added = sum(1 for old, _ in changes.values() if old is None)
+            removed = sum(1 for _, new in changes.values() if new is None)
+            parts.append(f"{kind}: {added} novos, {len(changes) - added - removed} alterados, {removed} removidos")
+        return "; ".join(parts)
+
+
+def _changes(old: Iterable[Dict], new: Iterable[Dict], normalize: Callable[[Dict], Dict]) -> Dict[str, Change]:
+    # Nomes repetidos ficam com o último registro, como no carregamento
+    before = {record["name"]: record for record in map(normalize, old)}
+    after = {record["name"]: record for record in map(normalize, new)}
+    changes: Dict[str, Change] = {
+        name: (before.get(name), record) for name, record in after.items() if before.get(name) != record
+    }
+    changes.update((name, (record, None)) for name, record in before.items() if name not in after)
+    return changes
+
+
+def diff_worlds(old: Dict, new: Dict) -> WorldDiff:
+    """Compara dois conteúdos de world.json registro a registro, pelo nome."""
+    return WorldDiff(
+        _changes(old.get("locations", []), new.get("locations", []), _place_record),
+        _changes(old.get("items", []), new.get("items", []), _item_record),
+        _changes(old.get("characters", []), new.get("characters", []), _npc_record),
+    )
+
+
+# Impressões digitais de registros crus, iguais quando as versões normalizadas por _*_record são iguais
+def _place_fingerprint(data: Dict) -> int:
+    return hash((data.get("description", ""), tuple(data.get("takes_to", []))))
+
+
+def _item_fingerprint(data: Dict) -> int:
+    item_type = data.get("type", "generic")
+    bonus = int(data.get(BONUS_FIELDS[item_type], 0)) if item_type in BONUS_FIELDS else None
+    return hash((data.get("description", ""), data.get("location"), item_type, bool(data.get("pickable", False)), bonus))
+
+
+def _npc_fingerprint(data: Dict) -> int:
+    return hash((data.get("description"), data.get("location"), tuple(data.get("dialog") or DEFAULT_DIALOG)))
+
+
+def _place_of(place) -> Dict:
+    return _place_record({"name": place.name, "description": place.description, "takes_to": place.takes_to})
+
+
+def _npc_of(npc) -> Dict:
+    return _npc_record({"name": npc.name, "description": npc.description, "location": npc.location, "dialog": npc.dialog})
+
+
+# Seção do world.json, coleção do template, normalização e impressão digital de um registro e registro de um objeto
+KINDS = (
+    ("locations", "places", _place_record, _place_fingerprint, _place_of),
+    ("items", "items", _item_record, _item_fingerprint, lambda item: _item_record(item_record(item))),
+    ("characters", "npcs", _npc_record, _npc_fingerprint, _npc_of),
+)
+
+
+def record_hashes(template: WorldTemplate) -> Dict[str, Dict[str, int]]:
+    """Impressões digitais dos registros do template, por tipo e nome, calculadas no primeiro recarregamento."""
+    if template.record_hashes is None:
+        world = current_world(template)
+        template.record_hashes = {
+            kind: {data.get("name"): fingerprint(data) for data in world.get(key, [])}
+            for key, kind, _, fingerprint, _ in KINDS
+        }
+    return template.record_hashes
+
+
+def diff_template(template: WorldTemplate, world: Dict) -> Tuple[WorldDiff, Dict[str, Dict[str, int]]]:
+    """Compara um conteúdo novo com o que o template carregou, pelas impressões digitais dos registros.
+
+    Só os registros alterados são normalizados e lidos do template (materializados, em templates de
+    snapshot) para montar a diferença. Retorna também as impressões digitais do conteúdo novo.
+    """
+    known = record_hashes(template)
+    changes = []
+    fresh: Dict[str, Dict[str, int]] = {}
+    for key, kind, normalize, fingerprint, of_object in KINDS:
+        objects, hashes = getattr(template, kind), known[kind]
+        # Nomes repetidos ficam com o último registro, como no carregamento
+        after = {data.get("name"): data for data in world.get(key, [])}
+        fingerprints = fresh[kind] = {name: fingerprint(data) for name, data in after.items()}
+
+        def old(name: str) -> Optional[Dict]:
+            current = objects.get(name) if name in hashes else None
+            return of_object(current) if current is not None else None
+
+        kind_changes: Dict[str, Change] = {
+            name: (old(name), normalize(after[name]))
+            for name, value in fingerprints.items() if hashes.get(name) != value
+        }
+        kind_changes.update((name, (old(name), None)) for name in hashes if name not in fingerprints)
+        changes.append(kind_changes)
+    return WorldDiff(*changes), fresh
+
+
+def current_world(template: WorldTemplate) -> Dict:
+    """Conteúdo que o template carregou: o JSON original ou, em templates de snapshot, os registros decodificados."""
+    if template.world:
+        return template.world
+    return template.snapshot.to_world()
+
+
+def apply_diff(template: WorldTemplate, diff: WorldDiff) -> None:
+    """Aplica a diferença ao template e leva as mudanças a todas as sessões abertas sobre ele."""
+    if not diff:
+        return
+    template.apply_diff(diff)
+    for overlay in list(template.overlays):
+        overlay.apply_diff(diff)
+
+
+def reload_world(template: WorldTemplate, world: Dict) -> WorldDiff:
+    """Recarrega o conteúdo do mundo no template vivo, sem reiniciar o processo nem derrubar sessões.
+
+    A comparação percorre só o conteúdo novo, contra as impressões digitais guardadas no template; o
+    custo de aplicar é proporcional ao número de registros alterados (e de sessões que têm cópia deles).
+    """
+    if not world.get("locations"):
+        raise KeyError("Chave 'locations' não encontrada nos dados do mundo.")
+    if not world.get("items"):
+        raise KeyError("Chave 'items' não encontrada nos dados do mundo.")
+    diff, fingerprints = diff_template(template, world)
+    apply_diff(template, diff)
+    template.record_hashes = fingerprints
+    template.world = world
+    return diff
+
+
+def reload_file(template: WorldTemplate, path: str) -> WorldDiff:
+    """Lê o world.json do caminho e o recarrega no template."""
+    with open(path, "r", encoding="utf8") as f:
+        return reload_world(template, json.load(f))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mostra o que um recarregamento do world.json alteraria.")
+    parser.add_argument("old", help="world.json atual")
+    parser.add_argument("new", help="world.json novo")
+    parser.add_argument("--json", action="store_true", help="imprime as mudanças em JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with open(args.old, "r", encoding="utf8") as f:
+        old = json.load(f)
+    with open(args.new, "r", encoding="utf8") as f:
+        new = json.load(f)
+    diff = diff_worlds(old, new)
+    if args.json:
+        print(json.dumps({"places": diff.places, "items": diff.items, "npcs": diff.npcs}, ensure_ascii=False, indent=2))
+    else:
+        print(f"{diff.summary()} ({time.perf_counter() - started:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
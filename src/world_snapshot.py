@@ -0,0 +1,521 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from place import Place
+from character import NPC
+from item import Item, Weapon, Armor, Key, Potion, QuestItem
+
+MAGIC = b"GWSN"
+VERSION = 1
+NONE = -1
+
+# Cabeçalho: magic, versão, ordem dos bytes, tamanho e mtime do JSON de origem e seu sha256
+HEADER = struct.Struct("<4sHHQQ32s")
+SECTION = struct.Struct("<QQ")
+SECTIONS = (
+    "string_offsets", "string_data", "places", "place_index", "items", "item_index",
+    "npcs", "npc_index", "adjacency", "dialog", "warnings",
+)
+SECTION_TYPECODES = {"string_offsets": "q", "string_data": "B"}
+BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+
+# Campos de cada registro (inteiros de 32 bits)
+PLACE_FIELDS = 8   # nome, descrição, adj_início, adj_qtd, itens_início, itens_qtd, npcs_início, npcs_qtd
+ITEM_FIELDS = 6    # nome, descrição, local, tipo, pegável, bônus
+NPC_FIELDS = 5     # nome, descrição, local, diálogo_início, diálogo_qtd
+
+BONUS_FIELDS = {"weapon": "offense_bonus", "armor": "defense_bonus", "potion": "heal_amount"}
+
+
+class SnapshotError(Exception):
+    """Snapshot ausente, corrompido ou gerado por outra versão do formato."""
+
+
+def snapshot_path_for(world_path: str) -> str:
+    """Retorna o caminho padrão do snapshot compilado de um arquivo de mundo."""
+    return os.path.splitext(world_path)[0] + ".wsnap"
+
+
+def _file_sha256(path: str) -> bytes:
+    # Só é chamado quando o mtime do world.json mudou; o hashlib fica fora da partida do motor
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.offsets = array("q", [0])
+        self.data = bytearray()
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.ids)
+            self.ids[value] = string_id
+            self.data += value.encode("utf8")
+            self.offsets.append(len(self.data))
+        return string_id
+
+
+def _last_by_name(records: List[Dict]) -> List[Dict]:
+    """Remove nomes duplicados mantendo o último, como faria um dict."""
+    by_name = {}
+    for data in records:
+        by_name[data.get("name")] = data
+    return list(by_name.values())
+
+
+def compile_world(world: Dict, source_path: Optional[str] = None) -> bytes:
+    """Compila os dados de um mundo para o formato binário de snapshot."""
+    strings = _StringTable()
+    places_data = _last_by_name(world.get("locations", []))
+    items_data = _last_by_name(world.get("items", []))
+    npcs_data = _last_by_name(world.get("characters", []))
+    place_position = {data.get("name", ""): i for i, data in enumerate(places_data)}
+    warnings: List[str] = []
+
+    # Itens e NPCs são agrupados pelo lugar onde estão, para que cada lugar aponte para um intervalo
+    def group(records: List[Dict], kind: str) -> Tuple[List[Dict], List[Tuple[int, int]]]:
+        buckets: List[List[Dict]] = [[] for _ in places_data]
+        orphans = []
+        for data in records:
+            position = place_position.get(data.get("location"))
+            if position is None:
+                warnings.append(f"⚠️ Local '{data.get('location')}' não encontrado para o {kind} '{data.get('name')}'")
+                orphans.append(data)
+            else:
+                buckets[position].append(data)
+        ordered, ranges = [], []
+        for bucket in buckets:
+            ranges.append((len(ordered), len(bucket)))
+            ordered.extend(bucket)
+        return ordered + orphans, ranges
+
+    items_ordered, item_ranges = group(items_data, "item")
+    npcs_ordered, npc_ranges = group(npcs_data, "NPC")
+
+    adjacency = array("i")
+    places = array("i")
+    for i, data in enumerate(places_data):
+        takes_to = data.get("takes_to", [])
+        places.extend((
+            strings.add(data.get("name", "")), strings.add(data.get("description", "")),
+            len(adjacency), len(takes_to), *item_ranges[i], *npc_ranges[i],
+        ))
+        adjacency.extend(strings.add(name) for name in takes_to)
+
+    items = array("i")
+    for data in items_ordered:
+        item_type = data.get("type", "generic")
+        bonus_field = BONUS_FIELDS.get(item_type)
+        items.extend((
+            strings.add(data.get("name")), strings.add(data.get("description", "")),
+            strings.add(data.get("location")), strings.add(item_type),
+            1 if data.get("pickable", False) else 0, int(data.get(bonus_field, 0)) if bonus_field else 0,
+        ))
+
+    dialog = array("i")
+    npcs = array("i")
+    for data in npcs_ordered:
+        lines = data.get("dialog", ["Olá, aventureiro!"])
+        npcs.extend((
+            strings.add(data.get("name")), strings.add(data.get("description")),
+            strings.add(data.get("location")), len(dialog), len(lines),
+        ))
+        dialog.extend(strings.add(line) for line in lines)
+
+    def sorted_index(records: List[Dict]) -> array:
+        return array("i", sorted(range(len(records)), key=lambda i: records[i].get("name") or ""))
+
+    sections = {
+        "string_offsets": strings.offsets,
+        "string_data": strings.data,
+        "places": places,
+        "place_index": sorted_index(places_data),
+        "items": items,
+        "item_index": sorted_index(items_ordered),
+        "npcs": npcs,
+        "npc_index": sorted_index(npcs_ordered),
+        "adjacency": adjacency,
+        "dialog": dialog,
+        "warnings": array("i", (strings.add(warning) for warning in warnings)),
+    }
+
+    source_size, source_mtime, source_hash = 0, 0, bytes(32)
+    if source_path is not None:
+        stat = os.stat(source_path)
+        source_size, source_mtime, source_hash = stat.st_size, stat.st_mtime_ns, _file_sha256(source_path)
+
+    header = HEADER.pack(MAGIC, VERSION, BYTE_ORDER, source_size, source_mtime, source_hash)
+    offset = HEADER.size + SECTION.size * len(SECTIONS)
+    table, blobs = [], []
+    for name in SECTIONS:
+        blob = bytes(sections[name])
+        padding = -offset % 8
+        offset += padding
+        table.append(SECTION.pack(offset, len(sections[name])))
+        blobs.append(b"\0" * padding + blob)
+        offset += len(blob)
+    return header + b"".join(table) + b"".join(blobs)
+
+
+def compile_file(world_path: str, snapshot_path: Optional[str] = None) -> str:
+    """Compila um world.json para um snapshot em disco e retorna o caminho gerado."""
+    snapshot_path = snapshot_path or snapshot_path_for(world_path)
+    with open(world_path, "r", encoding="utf8") as f:
+        data = compile_world(json.load(f), world_path)
+    temp_path = snapshot_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    # Troca atômica para que processos lendo o snapshot antigo não vejam um arquivo pela metade
+    os.replace(temp_path, snapshot_path)
+    return snapshot_path
+
+
+class WorldSnapshot:
+    """Leitura de um snapshot compilado a partir de qualquer buffer (mmap, memória compartilhada, bytes)."""
+
+    def __init__(self, buffer) -> None:
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise SnapshotError("Snapshot truncado.")
+        magic, version, byte_order, self.source_size, self.source_mtime, self.source_hash = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise SnapshotError("Arquivo não é um snapshot de mundo.")
+        if version != VERSION or byte_order != BYTE_ORDER:
+            raise SnapshotError(f"Snapshot de versão {version} não suportado.")
+
+        self.sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, count = SECTION.unpack_from(view, HEADER.size + i * SECTION.size)
+            typecode = SECTION_TYPECODES.get(name, "i")
+            size = count * struct.calcsize(typecode)
+            if offset + size > len(view):
+                raise SnapshotError("Snapshot truncado.")
+            self.sections[name] = view[offset:offset + size].cast(typecode)
+
+        self._string_offsets = self.sections["string_offsets"]
+        self._string_data = self.sections["string_data"]
+        self.place_count = len(self.sections["places"]) // PLACE_FIELDS
+        self.item_count = len(self.sections["items"]) // ITEM_FIELDS
+        self.npc_count = len(self.sections["npcs"]) // NPC_FIELDS
+
+    @classmethod
+    def open(cls, path: str) -> "WorldSnapshot":
+        """Mapeia o snapshot em memória; vários processos compartilham o mesmo page cache."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self) -> None:
+        """Libera as views sobre o buffer, permitindo fechá-lo (mmap ou memória compartilhada)."""
+        for view in self.sections.values():
+            view.release()
+        self.sections = {}
+
+    def is_fresh(self, world_path: str) -> bool:
+        """Indica se o snapshot foi compilado a partir da versão atual do arquivo de mundo."""
+        try:
+            stat = os.stat(world_path)
+        except OSError:
+            return True
+        if stat.st_size != self.source_size:
+            return False
+        if stat.st_mtime_ns == self.source_mtime:
+            return True
+        return _file_sha256(world_path) == self.source_hash
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NONE:
+            return None
+        start = self._string_offsets[string_id]
+        end = self._string_offsets[string_id + 1]
+        return str(self._string_data[start:end], "utf8")
+
+    def record(self, section: str, fields: int, position: int) -> memoryview:
+        start = position * fields
+        return self.sections[section][start:start + fields]
+
+    def find(self, section: str, index: str, fields: int, name: str) -> int:
+        """Busca binária pelo nome no índice ordenado; retorna a posição do registro ou -1."""
+        records = self.sections[section]
+        order = self.sections[index]
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            position = order[middle]
+            current = self.string(records[position * fields]) or ""
+            if current < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order):
+            position = order[low]
+            if self.string(records[position * fields]) == name:
+                return position
+        return -1
+
+    def warnings(self) -> List[str]:
+        return [self.string(string_id) for string_id in self.sections["warnings"]]
+
+    def to_world(self) -> Dict:
+        """Decodifica os registros de volta para o formato do world.json (usado para comparar recarregamentos)."""
+        string = self.string
+        places, adjacency = self.sections["places"], self.sections["adjacency"]
+        locations = []
+        for start in range(0, len(places), PLACE_FIELDS):
+            first, count = places[start + 2], places[start + 3]
+            locations.append({
+                "name": string(places[start]), "description": string(places[start + 1]),
+                "takes_to": [string(string_id) for string_id in adjacency[first:first + count]],
+            })
+        records = self.sections["items"]
+        items = []
+        for start in range(0, len(records), ITEM_FIELDS):
+            item_type = string(records[start + 3])
+            data = {
+                "name": string(records[start]), "description": string(records[start + 1]),
+                "location": string(records[start + 2]), "type": item_type, "pickable": bool(records[start + 4]),
+            }
+            if item_type in BONUS_FIELDS:
+                data[BONUS_FIELDS[item_type]] = records[start + 5]
+            items.append(data)
+        records, dialog = self.sections["npcs"], self.sections["dialog"]
+        characters = []
+        for start in range(0, len(records), NPC_FIELDS):
+            first, count = records[start + 3], records[start + 4]
+            characters.append({
+                "name": string(records[start]), "description": string(records[start + 1]),
+                "location": string(records[start + 2]),
+                "dialog": [string(string_id) for string_id in dialog[first:first + count]],
+            })
+        return {"locations": locations, "items": items, "characters": characters}
+
+
+class _LazyMapping(Mapping):
+    """Mapeamento nome -> objeto que materializa cada registro do snapshot no primeiro acesso.
+
+    Um recarregamento do mundo pode trocar, incluir ou remover objetos (ver world_reload); esses ficam
+    em overrides, fixos na memória, e têm precedência sobre o snapshot.
+    """
+
+    section = ""
+    index = ""
+    fields = 0
+
+    def __init__(self, snapshot: WorldSnapshot, template: "SnapshotWorld") -> None:
+        self.snapshot = snapshot
+        self.template = template
+        self.cache: Dict[str, object] = {}
+        self.count = len(snapshot.sections[self.section]) // self.fields
+        self.overrides: Dict[str, object] = {}
+        self.added: Dict[str, None] = {}
+        self.removed: Set[str] = set()
+
+    def __getitem__(self, name: str):
+        obj = self.overrides.get(name)
+        if obj is not None:
+            return obj
+        if name in self.removed:
+            raise KeyError(name)
+        obj = self.cache.get(name)
+        if obj is None:
+            position = self.snapshot.find(self.section, self.index, self.fields, name)
+            if position < 0:
+                raise KeyError(name)
+            obj = self.at(position)
+        return obj
+
+    def __contains__(self, name: object) -> bool:
+        if name in self.cache or name in self.overrides:
+            return True
+        if name in self.removed:
+            return False
+        return isinstance(name, str) and self._in_snapshot(name)
+
+    def __iter__(self) -> Iterator[str]:
+        records = self.snapshot.sections[self.section]
+        removed = self.removed
+        for position in range(self.count):
+            name = self.snapshot.string(records[position * self.fields])
+            if name not in removed:
+                yield name
+        yield from list(self.added)
+
+    def __len__(self) -> int:
+        return self.count - len(self.removed) + len(self.added)
+
+    def __setitem__(self, name: str, obj) -> None:
+        """Troca ou inclui o objeto de um nome, que passa a ficar fixo na memória."""
+        self.overrides[name] = obj
+        self.cache.pop(name, None)
+        if name in self.removed:
+            self.removed.discard(name)
+        elif name not in self.added and not self._in_snapshot(name):
+            self.added[name] = None
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self:
+            raise KeyError(name)
+        self.overrides.pop(name, None)
+        self.cache.pop(name, None)
+        if name in self.added:
+            del self.added[name]
+        else:
+            self.removed.add(name)
+
+    def _in_snapshot(self, name: str) -> bool:
+        return self.snapshot.find(self.section, self.index, self.fields, name) >= 0
+
+    def name_at(self, position: int) -> str:
+        return self.snapshot.string(self.snapshot.sections[self.section][position * self.fields])
+
+    def at(self, position: int):
+        """Retorna o objeto do registro na posição dada, materializando-o se preciso."""
+        name = self.name_at(position)
+        obj = self.overrides.get(name) or self.cache.get(name)
+        if obj is None:
+            obj = self.materialize(self.snapshot.record(self.section, self.fields, position))
+            self.cache[name] = obj
+        return obj
+
+    def materialize(self, record: memoryview):
+        raise NotImplementedError
+
+
+class _LazyItems(_LazyMapping):
+    section, index, fields = "items", "item_index", ITEM_FIELDS
+
+    def materialize(self, record: memoryview) -> Item:
+        string = self.snapshot.string
+        name, description, location, item_type = (string(record[i]) for i in range(4))
+        pickable, bonus = bool(record[4]), record[5]
+        if item_type == "weapon":
+            return Weapon(name, description, location, pickable, bonus)
+        if item_type == "armor":
+            return Armor(name, description, location, pickable, bonus)
+        if item_type == "key":
+            return Key(name, description, location, pickable)
+        if item_type == "potion":
+            return Potion(name, description, location, pickable, bonus)
+        if item_type == "quest_item":
+            return QuestItem(name, description, location, pickable)
+        return Item(name, description, location, pickable, item_type)
+
+
+class _LazyNPCs(_LazyMapping):
+    section, index, fields = "npcs", "npc_index", NPC_FIELDS
+
+    def materialize(self, record: memoryview) -> NPC:
+        string = self.snapshot.string
+        dialog_ids = self.snapshot.sections["dialog"][record[3]:record[3] + record[4]]
+        dialog = [string(string_id) for string_id in dialog_ids]
+        return NPC(string(record[0]), string(record[1]), string(record[2]), dialog)
+
+
+class _LazyPlaces(_LazyMapping):
+    """Lugares materializados por região: o lugar junto com seus itens e NPCs.
+
+    Com max_resident, mantém só as regiões usadas mais recentemente; as mais antigas são descartadas
+    e materializadas de novo se voltarem a ser acessadas. Isso é seguro porque os objetos do template
+    nunca são alterados: as mudanças de cada sessão vivem nas cópias do WorldOverlay.
+    """
+
+    section, index, fields = "places", "place_index", PLACE_FIELDS
+
+    def __init__(self, snapshot: WorldSnapshot, template: "SnapshotWorld", max_resident: Optional[int] = None) -> None:
+        super().__init__(snapshot, template)
+        self.cache: "OrderedDict[str, Place]" = OrderedDict()
+        self.max_resident = max_resident
+        self.evictions = 0
+
+    def __getitem__(self, name: str) -> Place:
+        place = self.cache.get(name)
+        if place is None:
+            return super().__getitem__(name)
+        if self.max_resident is not None:
+            self.cache.move_to_end(name)
+        return place
+
+    def at(self, position: int) -> Place:
+        place = super().at(position)
+        if self.max_resident is not None and place.name in self.cache:
+            self.cache.move_to_end(place.name)
+            while len(self.cache) > self.max_resident:
+                self._evict_oldest()
+        return place
+
+    def _evict_oldest(self) -> None:
+        _, place = self.cache.popitem(last=False)
+        for item_name in place.items:
+            self.template.items.cache.pop(item_name, None)
+        for npc_name in place.characters:
+            self.template.npcs.cache.pop(npc_name, None)
+        self.evictions += 1
+
+    def materialize(self, record: memoryview) -> Place:
+        string = self.snapshot.string
+        takes_to = [string(string_id) for string_id in self.snapshot.sections["adjacency"][record[2]:record[2] + record[3]]]
+        place = Place(string(record[0]), string(record[1]), takes_to)
+        self._fill(place, self.template.items, range(record[4], record[4] + record[5]), place.add_item)
+        self._fill(place, self.template.npcs, range(record[6], record[6] + record[7]), place.add_character)
+        return place
+
+    @staticmethod
+    def _fill(place: Place, objects: _LazyMapping, positions: range, add) -> None:
+        """Coloca no lugar os objetos da sua região, respeitando o que um recarregamento removeu ou moveu."""
+        if not objects.overrides and not objects.removed:
+            for position in positions:
+                add(objects.at(position))
+            return
+        for position in positions:
+            if objects.name_at(position) not in objects.removed:
+                obj = objects.at(position)
+                if obj.location == place.name:
+                    add(obj)
+        for obj in objects.overrides.values():
+            if obj.location == place.name:
+                add(obj)
+
+
+class SnapshotWorld:
+    """Conteúdo de um snapshot exposto como os dicionários places/items/npcs de um WorldTemplate."""
+
+    def __init__(self, snapshot: WorldSnapshot, max_resident_places: Optional[int] = None) -> None:
+        self.snapshot = snapshot
+        self.items = _LazyItems(snapshot, self)
+        self.npcs = _LazyNPCs(snapshot, self)
+        self.places = _LazyPlaces(snapshot, self, max_resident_places)
+
+    @property
+    def resident_places(self) -> int:
+        """Quantidade de lugares materializados no momento."""
+        return len(self.places.cache)
+
+
+def main() -> None:
+    # Importado aqui: o módulo está no caminho de carga do motor, que não precisa do argparse
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compila world.json para um snapshot binário.")
+    parser.add_argument("world", help="caminho do world.json")
+    parser.add_argument("-o", "--output", help="caminho do snapshot (padrão: <world>.wsnap)")
+    args = parser.parse_args()
+    print(compile_file(args.world, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from output_sink import BytesSink
+from world_constants import START_PLACE
+from world_graph import WorldGraph
+from world_template import WorldTemplate
+
+# Tipos de item que o mundo precisa deixar alcançar: itens de missão pegos e chaves usadas
+GOAL_TYPES = ("quest_item", "key")
+# Tipos cujo uso marca o item como usado
+USABLE_TYPES = ("key", "potion")
+# Código de local de um item carregado pelo jogador (os demais são posição do lugar + 1)
+HELD = 0
+DEFAULT_MAX_STATES = 2_000_000
+DEFAULT_MAX_DEPTH = 256
+# Estratégias: "graph" responde pela alcançabilidade dos lugares; "bfs" e "iddfs" buscam nos estados de jogo
+STRATEGIES = ("graph", "bfs", "iddfs")
+
+# (comando, argumento), como o jogador digitaria
+Action = Tuple[str, str]
+
+
+@dataclass
+class TrackedItem:
+    name: str
+    item_type: str
+    origin: int
+    pickable: bool
+
+
+class StateLayout:
+    """Codificação de um estado de sessão em um único int.
+
+    Guarda o lugar atual e o local e a flag used de cada item acompanhado. Um estado é imutável e
+    hashable, então bifurcar é uma conta com inteiros e estados já vistos são descartados por um set.
+    Itens fora do layout, o diálogo dos NPCs e o resto da sessão não entram no estado: nenhuma regra do
+    motor tem pré-condição sobre eles, então deixá-los de fora não muda o que é alcançável.
+    """
+
+    def __init__(self, place_count: int, items: Sequence[TrackedItem]) -> None:
+        self.items = list(items)
+        self.place_bits = max(1, place_count.bit_length())
+        self.place_mask = (1 << self.place_bits) - 1
+        self.location_bits = (place_count + 1).bit_length()
+        self.location_mask = (1 << self.location_bits) - 1
+        shift = self.place_bits
+        self.item_shifts: List[int] = []
+        for _ in self.items:
+            self.item_shifts.append(shift)
+            shift += self.location_bits + 1
+
+    def initial(self, place: int) -> int:
+        """Estado do começo do jogo: itens nos locais de origem, nenhum usado."""
+        state = place
+        for item, shift in zip(self.items, self.item_shifts):
+            state |= (item.origin + 1) << shift
+        return state
+
+    def place(self, state: int) -> int:
+        return state & self.place_mask
+
+    def item_location(self, state: int, index: int) -> int:
+        return (state >> self.item_shifts[index]) & self.location_mask
+
+    def with_item_location(self, state: int, index: int, code: int) -> int:
+        shift = self.item_shifts[index]
+        return (state & ~(self.location_mask << shift)) | (code << shift)
+
+    def used(self, state: int, index: int) -> bool:
+        return bool(state >> (self.item_shifts[index] + self.location_bits) & 1)
+
+    def with_used(self, state: int, index: int) -> int:
+        return state | 1 << (self.item_shifts[index] + self.location_bits)
+
+
+@dataclass
+class GoalResult:
+    """Resultado da busca por um objetivo: pegar um item de missão ou usar uma chave."""
+    name: str
+    item_type: str
+    location: Optional[str]
+    reachable: bool = False
+    reason: str = ""
+    plan: List[str] = field(default_factory=list)
+    verified: Optional[bool] = None
+    states: int = 0
+    truncated: bool = False
+    # Lugares de onde, sem o objetivo cumprido, não há mais como cumpri-lo (None quando não foi verificado)
+    dead_end_places: Optional[List[str]] = None
+
+
+@dataclass
+class SolverReport:
+    """Resultado do solver: objetivos alcançáveis com um plano, inalcançáveis com o motivo e becos sem saída."""
+    place_count: int = 0
+    strategy: str = "graph"
+    jobs: int = 1
+    joint: bool = False
+    goals: List[GoalResult] = field(default_factory=list)
+    # No modo conjunto, se existe um estado com todos os objetivos alcançáveis cumpridos ao mesmo tempo
+    all_goals_reachable: Optional[bool] = None
+    states: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def dead_ends(self) -> Dict[str, List[str]]:
+        """Lugar -> objetivos que deixam de ser alcançáveis quando o jogador chega lá sem cumpri-los."""
+        places: Dict[str, List[str]] = {}
+        for goal in self.goals:
+            for place in goal.dead_end_places or ():
+                places.setdefault(place, []).append(goal.name)
+        return places
+
+    @property
+    def errors(self) -> List[str]:
+        """Problemas que impedem completar o mundo."""
+        errors = [f"'{goal.name}' ({goal.item_type}) inalcançável: {goal.reason}"
+                  for goal in self.goals if not goal.reachable and not goal.truncated]
+        errors.extend(f"O plano para '{goal.name}' falhou no motor do jogo"
+                      for goal in self.goals if goal.verified is False)
+        if self.all_goals_reachable is False:
+            errors.append("Não há como cumprir todos os objetivos alcançáveis na mesma partida.")
+        return errors
+
+    @property
+    def warnings(self) -> List[str]:
+        """Situações que não impedem completar o mundo, mas prendem o jogador ou deixaram a busca incompleta."""
+        warnings = [f"De '{place}' não é mais possível cumprir: {', '.join(goals)}"
+                    for place, goals in self.dead_ends.items()]
+        warnings.extend(f"Busca por '{goal.name}' interrompida pelos limites da busca ({goal.states} estados)"
+                        for goal in self.goals if goal.truncated)
+        return warnings
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["errors"] = self.errors
+        data["warnings"] = self.warnings
+        return data
+
+
+class WorldSolver:
+    """Explora os estados de jogo alcançáveis a partir do início para provar que os objetivos do mundo são cumpríveis.
+
+    Nenhuma regra do motor condiciona pegar ou usar um item a outra coisa além de estar no lugar dele,
+    então, na estratégia "graph" (padrão), um objetivo é cumprível se e só se o lugar do item é
+    alcançável a partir do início. Duas BFS sobre o grafo CSR, feitas uma vez para todos os objetivos,
+    respondem isso e dão os planos mais curtos e os becos sem saída (lugares de onde não se volta ao
+    início; para itens fora da componente do início, uma BFS reversa por lugar de origem).
+
+    As estratégias "bfs" e "iddfs", e o modo joint, buscam nos estados de jogo: ints de um StateLayout,
+    com transições que seguem as regras do motor (ir para um lugar ligado, pegar um item pegável do
+    lugar, usar uma chave ou poção carregada e, se allow_drop, largar um item). joint=True acompanha
+    todos os objetivos juntos e também verifica se podem ser cumpridos na mesma partida. Cada plano
+    encontrado é conferido executando os comandos em uma sessão headless do GameEngine.
+    """
+
+    def __init__(self, template: WorldTemplate, allow_drop: bool = False, strategy: str = "graph",
+                 max_states: int = DEFAULT_MAX_STATES, max_depth: int = DEFAULT_MAX_DEPTH, verify: bool = True) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia desconhecida: {strategy}")
+        self.template = template
+        self.graph: WorldGraph = template.graph
+        self.graph.compact()
+        self.index = template.index
+        self.allow_drop = allow_drop
+        self.strategy = strategy
+        self.max_states = max_states
+        self.max_depth = max_depth
+        self.verify = verify
+        self._reachability: Optional[Tuple[array, array]] = None
+        self._dead_ends: Dict[int, List[str]] = {}
+
+    def goal_names(self) -> List[str]:
+        """Itens que são objetivos do mundo, em ordem alfabética."""
+        item_types = self.index.item_types
+        return sorted(name for item_type in GOAL_TYPES for name in item_types.get(item_type, ()))
+
+    def reachability(self) -> Tuple[array, array]:
+        """Árvores das BFS a partir do início e até ele, pelas ligações invertidas (pais; -1 fora da árvore).
+
+        Calculadas uma vez, sobre os arrays CSR, para todos os objetivos.
+        """
+        if self._reachability is None:
+            start = self.graph.positions[START_PLACE]
+            self._reachability = (self.graph.bfs_tree(start), self.graph.bfs_tree(start, reverse=True))
+        return self._reachability
+
+    def _goal(self, name: str) -> Tuple[GoalResult, Optional[TrackedItem]]:
+        """Resultado inicial do objetivo e o item acompanhado, ou None se ele já é inalcançável por definição."""
+        index = self.index
+        if not index.has_item(name):
+            return GoalResult(name, "", None, reason="o item não existe"), None
+        item_type, location = index.item_type(name), index.item_location(name)
+        result = GoalResult(name, item_type, location)
+        position = self.graph.positions.get(location)
+        if position is None:
+            result.reason = f"local '{location}' não existe"
+            return result, None
+        if name not in index.pickable:
+            result.reason = "o item não pode ser pego"
+            return result, None
+        return result, TrackedItem(name, item_type, position, True)
+
+    def _predicate(self, layout: StateLayout, index: int) -> Callable[[int], bool]:
+        """Condição de cumprimento do objetivo: item de missão carregado, chave (ou poção) usada."""
+        if layout.items[index].item_type in USABLE_TYPES:
+            return lambda state: layout.used(state, index)
+        return lambda state: layout.item_location(state, index) == HELD
+
+    def successors(self, layout: StateLayout, state: int) -> List[int]:
+        """Estados seguintes, na ordem: mover, pegar, usar, largar. O comando de cada um sai de action()."""
+        place = state & layout.place_mask
+        offsets = self.graph.offsets
+        base = state & ~layout.place_mask
+        moves = [base | target for target in self.graph.targets[offsets[place]:offsets[place + 1]]]
+        here = place + 1
+        # As mesmas contas de with_item_location() e with_used(), feitas aqui direto: é o laço mais quente da busca
+        location_mask, location_bits = layout.location_mask, layout.location_bits
+        for item, shift in zip(layout.items, layout.item_shifts):
+            code = (state >> shift) & location_mask
+            if code == here:
+                if item.pickable:
+                    moves.append(state & ~(location_mask << shift))
+            elif code == HELD:
+                used = 1 << (shift + location_bits)
+                if item.item_type in USABLE_TYPES and not state & used:
+                    moves.append(state | used)
+                if self.allow_drop:
+                    moves.append(state | here << shift)
+        return moves
+
+    def action(self, layout: StateLayout, state: int, successor: int) -> Action:
+        """Comando que leva de um estado ao seguinte; as transições não guardam o comando, só o estado."""
+        place = layout.place(successor)
+        if place != layout.place(state):
+            return "ir para", self.graph.names[place]
+        for index, item in enumerate(layout.items):
+            code = layout.item_location(successor, index)
+            if code != layout.item_location(state, index):
+                return ("pegar" if code == HELD else "largar"), item.name
+            if layout.used(successor, index) != layout.used(state, index):
+                return "usar", item.name
+        raise ValueError("Os estados não são ligados por uma transição.")
+
+    def _explore(self, layout: StateLayout, start: int, predicates: Dict[str, Callable[[int], bool]]
+                 ) -> Tuple[Dict[int, int], Dict[str, List[int]], Dict[int, List[int]], bool]:
+        """BFS completo: pai de cada estado (para montar planos), estados que cumprem cada objetivo e predecessores.
+
+        Estados que cumprem todos os objetivos não são expandidos. Para quando o número de estados passa
+        de max_states, indicando que a busca ficou incompleta.
+        """
+        parents: Dict[int, int] = {start: start}
+        predecessors: Dict[int, List[int]] = {start: []}
+        hits: Dict[str, List[int]] = {name: [] for name in predicates}
+        checks = list(predicates.items())
+        frontier = [start]
+        truncated = False
+        while frontier and not truncated:
+            next_frontier = []
+            for state in frontier:
+                done = True
+                for name, predicate in checks:
+                    if predicate(state):
+                        hits[name].append(state)
+                    else:
+                        done = False
+                if done:
+                    continue
+                for successor in self.successors(layout, state):
+                    if successor in parents:
+                        predecessors[successor].append(state)
+                        continue
+                    parents[successor] = state
+                    predecessors[successor] = [state]
+                    next_frontier.append(successor)
+                if len(parents) > self.max_states:
+                    truncated = True
+                    break
+            frontier = next_frontier
+        return parents, hits, predecessors, truncated
+
+    @staticmethod
+    def _can_reach(targets: List[int], predecessors: Dict[int, List[int]]) -> set:
+        """Estados a partir dos quais algum dos alvos é alcançável (BFS reverso)."""
+        seen = set(targets)
+        pending = list(targets)
+        while pending:
+            state = pending.pop()
+            for predecessor in predecessors[state]:
+                if predecessor not in seen:
+                    seen.add(predecessor)
+                    pending.append(predecessor)
+        return seen
+
+    def _plan(self, layout: StateLayout, states: Sequence[int]) -> List[str]:
+        """Comandos que percorrem a sequência de estados."""
+        return [" ".join(self.action(layout, state, successor)) for state, successor in zip(states, states[1:])]
+
+    def _path(self, parents: Dict[int, int], state: int) -> List[int]:
+        states = [state]
+        while parents[state] != state:
+            state = parents[state]
+            states.append(state)
+        states.reverse()
+        return states
+
+    def _iddfs(self, layout: StateLayout, start: int, predicate: Callable[[int], bool]) -> Tuple[Optional[List[str]], int, bool]:
+        """Aprofundamento iterativo: plano mais curto com memória proporcional à profundidade.
+
+        Uma tabela de transposição guarda a maior profundidade restante com que cada estado já foi
+        expandido na iteração, para não repetir subárvores.
+        """
+        if predicate(start):
+            return [], 1, False
+        visited = 0
+        for limit in range(1, self.max_depth + 1):
+            best: Dict[int, int] = {start: limit}
+            path = [start]
+            stack = [iter(self.successors(layout, start))]
+            while stack:
+                state = next(stack[-1], None)
+                if state is None:
+                    stack.pop()
+                    path.pop()
+                    continue
+                remaining = limit - len(stack)
+                if best.get(state, -1) >= remaining:
+                    continue
+                best[state] = remaining
+                visited += 1
+                if predicate(state):
+                    return self._plan(layout, path + [state]), visited, False
+                if visited > self.max_states:
+                    return None, visited, True
+                if remaining:
+                    path.append(state)
+                    stack.append(iter(self.successors(layout, state)))
+            if all(depth > 0 for depth in best.values()):
+                # Nenhum estado ficou na borda: a iteração seguinte não encontraria nada novo
+                return None, visited, False
+        return None, visited, True
+
+    def solve_goal(self, name: str) -> GoalResult:
+        """Resolve um objetivo pelo grafo ou, nas estratégias bfs e iddfs, em um espaço que só acompanha o item dele."""
+        result, item = self._goal(name)
+        if item is None:
+            return result
+        start_position = self.graph.positions.get(START_PLACE)
+        if start_position is None:
+            result.reason = f"lugar inicial '{START_PLACE}' não existe"
+            return result
+        if self.strategy == "graph":
+            plan = self._graph_plan(item)
+            result.dead_end_places = self._graph_dead_ends(item.origin) if plan is not None else []
+            self._finish(result, plan)
+            return result
+
+        layout = StateLayout(len(self.graph), [item])
+        start = layout.initial(start_position)
+        predicate = self._predicate(layout, 0)
+        if self.strategy == "iddfs":
+            plan, result.states, result.truncated = self._iddfs(layout, start, predicate)
+        else:
+            parents, hits, predecessors, result.truncated = self._explore(layout, start, {name: predicate})
+            result.states = len(parents)
+            # Em BFS o primeiro estado que cumpre o objetivo é o de plano mais curto
+            plan = self._plan(layout, self._path(parents, hits[name][0])) if hits[name] else None
+            if not result.truncated:
+                result.dead_end_places = self._dead_end_places(layout, parents, hits[name], predecessors)
+        self._finish(result, plan)
+        return result
+
+    def _graph_plan(self, item: TrackedItem) -> Optional[List[str]]:
+        """Rota mais curta até o lugar do item, pela árvore da BFS, seguida de pegar (e usar) o item."""
+        parents = self.reachability()[0]
+        position = item.origin
+        if parents[position] < 0:
+            return None
+        route = []
+        while parents[position] != position:
+            route.append(position)
+            position = parents[position]
+        names = self.graph.names
+        plan = [f"ir para {names[position]}" for position in reversed(route)]
+        plan.append(f"pegar {item.name}")
+        if item.item_type in USABLE_TYPES:
+            plan.append(f"usar {item.name}")
+        return plan
+
+    def _graph_dead_ends(self, origin: int) -> List[str]:
+        """Lugares alcançáveis a partir do início de onde o lugar de origem do item já não é alcançável."""
+        forward, back = self.reachability()
+        # Uma origem que volta ao início é alcançável de todo lugar que volta ao início, e só deles:
+        # esses objetivos compartilham a resposta, e só os demais pedem uma BFS reversa própria
+        key = -1 if back[origin] >= 0 else origin
+        dead_ends = self._dead_ends.get(key)
+        if dead_ends is None:
+            alive = back if key < 0 else self.graph.bfs_tree(origin, reverse=True)
+            names = self.graph.names
+            dead_ends = self._dead_ends[key] = [
+                names[position] for position in range(len(names)) if forward[position] >= 0 and alive[position] < 0
+            ]
+            dead_ends.sort()
+        return list(dead_ends)
+
+    def _dead_end_places(self, layout: StateLayout, parents: Dict, hits: List[int],
+                         predecessors: Dict[int, List[int]]) -> List[str]:
+        """Lugares dos estados explorados de onde nenhum estado que cumpre o objetivo é alcançável."""
+        if not hits:
+            return []
+        alive = self._can_reach(hits, predecessors)
+        names = self.graph.names
+        return sorted({names[layout.place(state)] for state in parents if state not in alive})
+
+    def _finish(self, result: GoalResult, plan: Optional[List[str]]) -> None:
+        if plan is None:
+            if not result.reason:
+                result.reason = ("busca interrompida pelos limites de estados ou de profundidade" if result.truncated
+                                 else f"'{result.location}' não é alcançável a partir de '{START_PLACE}'")
+            return
+        result.reachable = True
+        result.plan = plan
+        if self.verify:
+            result.verified = replay(self.template, plan, result.name)
+
+    def solve(self, goals: Optional[Sequence[str]] = None, joint: bool = False) -> SolverReport:
+        """Busca todos os objetivos (ou os informados), um por vez ou, com joint, em um único espaço de estados."""
+        started = time.perf_counter()
+        names = list(goals) if goals is not None else self.goal_names()
+        report = SolverReport(place_count=len(self.graph), strategy=self.strategy, joint=joint)
+        if joint:
+            self._solve_joint(names, report)
+        else:
+            report.goals = [self.solve_goal(name) for name in names]
+            report.states = sum(goal.states for goal in report.goals)
+        report.elapsed = round(time.perf_counter() - started, 3)
+        return report
+
+    def _solve_joint(self, names: List[str], report: SolverReport) -> None:
+        """Um único BFS acompanhando todos os objetivos: também mostra se cabem na mesma partida."""
+        tracked: List[TrackedItem] = []
+        for name in names:
+            result, item = self._goal(name)
+            report.goals.append(result)
+            if item is not None:
+                tracked.append(item)
+        start_position = self.graph.positions.get(START_PLACE)
+        if not tracked or start_position is None:
+            return
+        layout = StateLayout(len(self.graph), tracked)
+        predicates = {item.name: self._predicate(layout, index) for index, item in enumerate(tracked)}
+        parents, hits, predecessors, truncated = self._explore(layout, layout.initial(start_position), predicates)
+        report.states = len(parents)
+        results = {goal.name: goal for goal in report.goals}
+        for item in tracked:
+            result = results[item.name]
+            result.states, result.truncated = len(parents), truncated
+            plan = self._plan(layout, self._path(parents, hits[item.name][0])) if hits[item.name] else None
+            if not truncated:
+                result.dead_end_places = self._dead_end_places(layout, parents, hits[item.name], predecessors)
+            self._finish(result, plan)
+        if not truncated:
+            reachable = [predicates[item.name] for item in tracked if hits[item.name]]
+            report.all_goals_reachable = any(all(predicate(state) for predicate in reachable) for state in parents)
+
+
+def replay(template: WorldTemplate, plan: Sequence[str], goal: str) -> bool:
+    """Executa o plano em uma sessão headless e confere se o objetivo foi cumprido de fato."""
+    # Importado aqui: o resto do solver não precisa do motor
+    from game_engine import GameEngine
+
+    engine = GameEngine(template, sink=BytesSink())
+    if not engine.start("Solver").ok:
+        return False
+    for command in plan:
+        if not engine.step(command).ok:
+            return False
+    item = engine.item_object_dict.get(goal)
+    if item is None or goal not in engine.player.inventory:
+        return False
+    return item.used if item.item_type in USABLE_TYPES else True
+
+
+# Solver de cada processo do pool, criado uma vez pelo inicializador
+_worker_solver: Optional[WorldSolver] = None
+
+
+def _init_worker(path: str, options: Dict) -> None:
+    global _worker_solver
+    _worker_solver = WorldSolver(load_template(path), **options)
+
+
+def _solve_in_worker(name: str) -> GoalResult:
+    return _worker_solver.solve_goal(name)
+
+
+def load_template(path: str) -> WorldTemplate:
+    return WorldTemplate.load_compiled(path) or WorldTemplate.load(path)
+
+
+def solve_world(path: str, jobs: int = 1, goals: Optional[Sequence[str]] = None, joint: bool = False,
+                **options) -> SolverReport:
+    """Resolve o world.json do caminho; com jobs > 1, os objetivos são divididos entre processos."""
+    solver = WorldSolver(load_template(path), **options)
+    if jobs <= 1 or joint:
+        return solver.solve(goals, joint)
+    started = time.perf_counter()
+    names = list(goals) if goals is not None else solver.goal_names()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(jobs, initializer=_init_worker, initargs=(path, options)) as pool:
+        results = pool.map(_solve_in_worker, names, chunksize=max(1, len(names) // (jobs * 4)))
+    report = SolverReport(place_count=len(solver.graph), strategy=solver.strategy, jobs=jobs, goals=results)
+    report.states = sum(goal.states for goal in results)
+    report.elapsed = round(time.perf_counter() - started, 3)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prova que os objetivos de um world.json podem ser cumpridos.")
+    parser.add_argument("world", help="caminho do world.json")
+    parser.add_argument("--goal", action="append", help="item objetivo (pode repetir; padrão: itens de missão e chaves)")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="graph",
+                        help="graph: alcançabilidade dos lugares; bfs/iddfs: busca nos estados de jogo")
+    parser.add_argument("--joint", action="store_true", help="busca todos os objetivos em um único espaço de estados")
+    parser.add_argument("--drop", action="store_true", help="inclui a ação de largar itens")
+    parser.add_argument("--jobs", type=int, default=1, help="processos para buscar os objetivos em paralelo")
+    parser.add_argument("--max-states", type=int, default=DEFAULT_MAX_STATES, help="limite de estados por busca")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH, help="profundidade máxima do IDDFS")
+    parser.add_argument("--no-verify", action="store_true", help="não confere os planos no motor do jogo")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    parser.add_argument("--limit", type=int, default=20, help="máximo de problemas listados por tipo")
+    parser.add_argument("--strict", action="store_true", help="também falha quando houver avisos")
+    args = parser.parse_args()
+
+    report = solve_world(
+        args.world, args.jobs, args.goal, args.joint, allow_drop=args.drop, strategy=args.strategy,
+        max_states=args.max_states, max_depth=args.max_depth, verify=not args.no_verify,
+    )
+
+    errors, warnings = report.errors, report.warnings
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        reachable = sum(1 for goal in report.goals if goal.reachable)
+        searched = f", {report.states} estados explorados" if report.states else ""
+        print(f"{len(report.goals)} objetivos, {reachable} alcançáveis{searched} "
+              f"({report.strategy}, {report.jobs} processo(s), {report.elapsed}s)")
+        if report.all_goals_reachable is not None:
+            print(f"Todos os objetivos alcançáveis na mesma partida: {'sim' if report.all_goals_reachable else 'não'}")
+        for title, messages in (("Erros", errors), ("Avisos", warnings)):
+            if messages:
+                print(f"\n{title} ({len(messages)}):")
+                for message in messages[:args.limit]:
+                    print(f"- {message}")
+                if len(messages) > args.limit:
+                    print(f"- ... e mais {len(messages) - args.limit}")
+    sys.exit(1 if errors or (args.strict and warnings) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import os
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional
+
+from place import Place
+from character import NPC
+from item import Item, Weapon, Armor, Key, Potion, QuestItem
+from instrumentation import instrumented
+from world_graph import WorldGraph
+from world_index import WorldIndex
+
+# world_snapshot (mmap, struct), world_tick (random) e json são importados nos métodos que os usam:
+# importar o motor não deve custar o que só o carregamento, a simulação ou o recarregamento precisam
+if TYPE_CHECKING:
+    from world_snapshot import WorldSnapshot
+    from world_tick import WorldScheduler
+
+
+def build_item(data: Dict) -> Item:
+    """Cria o item da classe certa a partir de um registro de item do world.json."""
+    name = data.get("name")
+    description = data.get("description", "")
+    location = data.get("location")
+    pickable = data.get("pickable", False)
+    item_type = data.get("type", "generic")
+
+    # Cria o tipo apropriado de item
+    if item_type == "weapon":
+        offense_bonus = data.get("offense_bonus", 0)
+        return Weapon(name, description, location, pickable, offense_bonus)
+    if item_type == "armor":
+        defense_bonus = data.get("defense_bonus", 0)
+        return Armor(name, description, location, pickable, defense_bonus)
+    if item_type == "key":
+        return Key(name, description, location, pickable)
+    if item_type == "potion":
+        heal_amount = data.get("heal_amount", 0)
+        return Potion(name, description, location, pickable, heal_amount)
+    if item_type == "quest_item":
+        return QuestItem(name, description, location, pickable)
+    return Item(name, description, location, pickable, item_type)
+
+
+def item_record(item: Item) -> Dict:
+    """Registro do world.json que build_item() transformaria no item."""
+    data = {
+        "name": item.name,
+        "description": item.description,
+        "location": item.location,
+        "type": item.item_type,
+        "pickable": item.pickable,
+    }
+    from world_snapshot import BONUS_FIELDS
+
+    bonus = BONUS_FIELDS.get(item.item_type)
+    if bonus is not None:
+        data[bonus] = getattr(item, bonus)
+    return data
+
+
+class WorldTemplate:
+    """Mundo imutável carregado uma única vez por processo e compartilhado por todas as sessões.
+
+    Os objetos do template nunca são alterados; as mudanças de cada sessão ficam em um WorldOverlay.
+    """
+
+    _shared: Dict[str, "WorldTemplate"] = {}
+
+    def __init__(self, world: Dict) -> None:
+        self.world = world
+        self.places: Mapping[str, Place] = {}
+        self.items: Mapping[str, Item] = {}
+        self.npcs: Mapping[str, NPC] = {}
+        self.warnings: List[str] = []
+        self.snapshot: Optional["WorldSnapshot"] = None
+        self._graph: Optional[WorldGraph] = None
+        self._index: Optional[WorldIndex] = None
+        self._scheduler: Optional["WorldScheduler"] = None
+        # Impressão digital de cada registro carregado, por tipo e nome (mantida por world_reload)
+        self.record_hashes: Optional[Dict[str, Dict[str, int]]] = None
+        # Overlays das sessões abertas, que recebem as mudanças de um recarregamento do mundo
+        self.overlays: "weakref.WeakSet" = weakref.WeakSet()
+
+    @classmethod
+    def from_world(cls, world: Dict) -> "WorldTemplate":
+        """Constrói o template a partir dos dados já decodificados do mundo."""
+        template = cls(world)
+        template.load_places()
+        template.load_items()
+        template.load_npcs()
+        return template
+
+    @classmethod
+    def load(cls, path: str) -> "WorldTemplate":
+        """Lê e constrói o template a partir de um arquivo JSON."""
+        import json
+
+        with open(path, 'r', encoding='utf8') as f:
+            return cls.from_world(json.load(f))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: "WorldSnapshot", max_resident_places: Optional[int] = None) -> "WorldTemplate":
+        """Constrói um template cujos objetos são materializados sob demanda a partir do snapshot.
+
+        max_resident_places limita quantas regiões (lugar, itens e NPCs) ficam materializadas ao mesmo tempo.
+        """
+        from world_snapshot import SnapshotWorld
+
+        template = cls({})
+        world = SnapshotWorld(snapshot, max_resident_places)
+        template.places, template.items, template.npcs = world.places, world.items, world.npcs
+        template.warnings = snapshot.warnings()
+        template.snapshot = snapshot
+        return template
+
+    @classmethod
+    def load_compiled(cls, path: str, max_resident_places: Optional[int] = None) -> Optional["WorldTemplate"]:
+        """Abre o snapshot compilado do arquivo, ou retorna None se ele não existir ou estiver desatualizado."""
+        from world_snapshot import SnapshotError, WorldSnapshot, snapshot_path_for
+
+        try:
+            snapshot = WorldSnapshot.open(snapshot_path_for(path))
+        except (OSError, ValueError, SnapshotError):
+            return None
+        if not snapshot.is_fresh(path):
+            return None
+        return cls.from_snapshot(snapshot, max_resident_places)
+
+    @classmethod
+    def load_lazy(cls, path: str, max_resident_places: Optional[int] = None) -> "WorldTemplate":
+        """Carrega o mundo no modo preguiçoso, compilando o snapshot indexado antes se ele faltar ou estiver velho."""
+        template = cls.load_compiled(path, max_resident_places)
+        if template is None:
+            from world_snapshot import WorldSnapshot, compile_file, snapshot_path_for
+
+            compile_file(path)
+            template = cls.from_snapshot(WorldSnapshot.open(snapshot_path_for(path)), max_resident_places)
+        return template
+
+    @classmethod
+    def shared(cls, path: str, lazy: bool = False, max_resident_places: Optional[int] = None) -> "WorldTemplate":
+        """Retorna o template do arquivo, carregando-o apenas na primeira chamada do processo.
+
+        Usa o snapshot compilado quando ele está em dia com o JSON; caso contrário lê o JSON, a não
+        ser que lazy seja True, quando o snapshot é compilado e os lugares são materializados sob demanda.
+        """
+        key = os.path.abspath(path)
+        template = cls._shared.get(key)
+        if template is None:
+            if lazy:
+                template = cls.load_lazy(key, max_resident_places)
+            else:
+                template = cls.load_compiled(key, max_resident_places) or cls.load(key)
+            cls._shared[key] = template
+        return template
+
+    @property
+    def graph(self) -> WorldGraph:
+        """Grafo de ligações entre os lugares, compilado no primeiro uso."""
+        if self._graph is None:
+            if self.snapshot is not None:
+                self._graph = WorldGraph.from_snapshot(self.snapshot)
+            else:
+                self._graph = WorldGraph.from_places(self.places)
+        return self._graph
+
+    @property
+    def index(self) -> WorldIndex:
+        """Índices secundários de itens e NPCs, montados no primeiro uso e mantidos por load_items/load_npcs."""
+        if self._index is None:
+            if self.snapshot is not None:
+                self._index = WorldIndex.from_snapshot(self.snapshot)
+            else:
+                self._index = WorldIndex.from_objects(self.items, self.npcs)
+        return self._index
+
+    @property
+    def scheduler(self) -> "WorldScheduler":
+        """Relógio que move os NPCs deste mundo, criado no primeiro uso e compartilhado pelas sessões."""
+        if self._scheduler is None:
+            from world_tick import WorldScheduler
+
+            self._scheduler = WorldScheduler(self)
+        return self._scheduler
+
+    @classmethod
+    def clear_shared(cls) -> None:
+        """Esquece os templates compartilhados, forçando uma nova leitura."""
+        cls._shared.clear()
+
+    @instrumented("load.places")
+    def load_places(self) -> None:
+        """Carrega os lugares do mundo do jogo."""
+        if not self.world:
+            raise ValueError('Mundo não foi carregado corretamente.')
+
+        locations = self.world.get("locations", [])
+        if not locations:
+            raise KeyError("Chave 'locations' não encontrada nos dados do mundo.")
+
+        for data in locations:
+            name = data.get("name", "")
+            description = data.get("description", "")
+            takes_to = data.get("takes_to", [])
+            place = Place(name, description, takes_to)
+            self.places[place.name] = place
+
+    @instrumented("load.items")
+    def load_items(self) -> None:
+        """Carrega os itens do mundo do jogo."""
+        if not self.world:
+            raise ValueError('Mundo não foi carregado corretamente.')
+
+        items_data = self.world.get("items", [])
+        if not items_data:
+            raise KeyError("Chave 'items' não encontrada nos dados do mundo.")
+
+        for data in items_data:
+            item = build_item(data)
+            name, location = item.name, item.location
+            self.items[item.name] = item
+            if self._index is not None:
+                self._index.add_item(item.name, item.item_type, item.location, item.pickable)
+
+            # Adiciona o item ao seu local
+            if location in self.places:
+                self.places[location].add_item(item)
+            else:
+                self.warnings.append(f"⚠️ Local '{location}' não encontrado para o item '{name}'")
+
+    @instrumented("load.npcs")
+    def load_npcs(self) -> None:
+        """Carrega os NPCs do mundo do jogo."""
+        if not self.world:
+            self.warnings.append('Mundo não foi carregado corretamente.')
+            return
+
+        characters_data = self.world.get("characters", [])
+        for data in characters_data:
+            name = data.get("name")
+            description = data.get("description")
+            location = data.get("location")
+            dialog = data.get("dialog", ["Olá, aventureiro!"])
+
+            npc = NPC(name, description, location, dialog)
+            self.npcs[npc.name] = npc
+            if self._index is not None:
+                self._index.add_npc(npc.name, npc.location)
+
+            # Adiciona o NPC ao seu local
+            if location in self.places:
+                self.places[location].add_character(npc)
+            else:
+                self.warnings.append(f"⚠️ Local '{location}' não encontrado para o NPC '{name}'")
+
+    def apply_diff(self, diff) -> None:
+        """Aplica aos objetos do template um WorldDiff de recarregamento (ver world_reload).
+
+        Só os registros alterados são tocados. Objetos que continuam da mesma classe são atualizados no
+        lugar, para que as sessões que já os referenciam vejam o conteúdo novo. Grafo e índices já montados
+        são atualizados junto; em templates de snapshot eles são montados antes, porque depois não poderiam
+        mais ser refeitos a partir dos registros.
+        """
+        snapshot_backed = self.snapshot is not None
+        graph = self.graph if self._graph is not None or snapshot_backed else None
+        index = self.index if self._index is not None or snapshot_backed else None
+        places, items, npcs = self.places, self.items, self.npcs
+
+        links = {}
+        for name, (old, data) in diff.places.items():
+            takes_to = data["takes_to"] if data is not None else []
+            if old is None or old["takes_to"] != takes_to:
+                links[name] = takes_to
+            if data is None:
+                if name in places:
+                    del places[name]
+                continue
+            place = places.get(name)
+            if place is None:
+                place = Place(name, data["description"], data["takes_to"])
+                # Itens e NPCs que apontavam para um lugar que ainda não existia
+                for item_name in list(self.index.item_locations.get(name, ())):
+                    place.add_item(items[item_name])
+                for npc_name in list(self.index.npc_locations.get(name, ())):
+                    place.add_character(npcs[npc_name])
+            else:
+                place.update(data["description"], data["takes_to"])
+            places[name] = place
+        if graph is not None and links:
+            graph.update_many(links)
+
+        for name, (old, data) in diff.items.items():
+            item = items.get(name)
+            origin = places.get(old["location"]) if old is not None else None
+            target = places.get(data["location"]) if data is not None else None
+            if origin is not None and origin is not target and name in origin.items:
+                origin.remove_item(name)
+                places[origin.name] = origin
+            if data is None:
+                if item is not None:
+                    del items[name]
+                if index is not None and index.has_item(name):
+                    index.remove_item(name)
+                continue
+            new_item = build_item(data)
+            if item is not None and type(item) is type(new_item):
+                item.update_from(new_item)
+            else:
+                item = new_item
+            items[name] = item
+            if target is not None:
+                target.add_item(item)
+                places[target.name] = target
+            else:
+                self.warnings.append(f"⚠️ Local '{item.location}' não encontrado para o item '{name}'")
+            if index is not None:
+                index.add_item(name, item.item_type, item.location, item.pickable)
+
+        for name, (old, data) in diff.npcs.items():
+            npc = npcs.get(name)
+            origin = places.get(old["location"]) if old is not None else None
+            target = places.get(data["location"]) if data is not None else None
+            if origin is not None and origin is not target and name in origin.characters:
+                origin.remove_character(name)
+                places[origin.name] = origin
+            if data is None:
+                if npc is not None:
+                    del npcs[name]
+                if index is not None and index.has_npc(name):
+                    index.remove_npc(name)
+                continue
+            new_npc = NPC(name, data["description"], data["location"], data["dialog"])
+            if npc is not None:
+                npc.update_from(new_npc)
+            else:
+                npc = new_npc
+            npcs[name] = npc
+            if target is not None:
+                target.add_character(npc)
+                places[target.name] = target
+            else:
+                self.warnings.append(f"⚠️ Local '{npc.location}' não encontrado para o NPC '{name}'")
+            if index is not None:
+                index.add_npc(name, npc.location)
+        if self._scheduler is not None and diff.npcs:
+            self._scheduler.refresh({name: data["location"] if data is not None else None
+                                     for name, (_, data) in diff.npcs.items()})
@@ -0,0 +1,169 @@
+import math
+import random
+import time
+from array import array
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+if TYPE_CHECKING:
+    from world_template import WorldTemplate
+
+NOWHERE = -1
+
+
+class WorldScheduler:
+    """Relógio do mundo: move os NPCs pelas ligações takes_to, um tick de cada vez.
+
+    Há um por WorldTemplate (ver WorldTemplate.scheduler), compartilhado por todas as sessões, e quem
+    o avança é um timer (o do servidor, ou catch_up() no jogo local), não os comandos dos jogadores.
+    A posição e o lugar anterior de cada NPC ficam em colunas de inteiros (índice do NPC -> valor), e
+    cada lugar tem o conjunto dos NPCs que estão nele. Em vez de sortear a cada tick se cada NPC anda,
+    o tick do próximo movimento é sorteado quando ele chega (descanso mais uma espera geométrica) e
+    guardado na agenda: um tick só percorre os NPCs que se movem nele.
+
+    Nem os Place do template nem as cópias das sessões são tocados aqui: as posições ficam só nestas
+    colunas, e cada sessão lê os NPCs do lugar que está mostrando com npcs_at().
+    """
+
+    def __init__(self, template: "WorldTemplate", interval: float = 1.0, seed: int = 0, move_chance: float = 0.2,
+                 rest_ticks: int = 2, max_catch_up: int = 10) -> None:
+        self.graph = template.graph
+        self.interval = interval
+        self.move_chance = move_chance
+        self.rest_ticks = rest_ticks
+        self.max_catch_up = max_catch_up
+        self.tick_count = 0
+        self._rng = random.Random(seed)
+        self._last = time.monotonic()
+        index = template.index
+        self.names: List[str] = list(index.npc_names())
+        self.npc_positions: Dict[str, int] = {name: npc for npc, name in enumerate(self.names)}
+        positions = self.graph.positions
+        self.location = array("i", (positions.get(index.npc_location(name), NOWHERE) for name in self.names))
+        self.origin = array("i", self.location)
+        self.due = array("i", [NOWHERE]) * len(self.names)
+        self.buckets: Dict[int, Set[int]] = {}
+        self.agenda: Dict[int, List[int]] = {}
+        for npc, position in enumerate(self.location):
+            if position != NOWHERE:
+                self.buckets.setdefault(position, set()).add(npc)
+                self._schedule(npc, 0)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _schedule(self, npc: int, rest: int) -> None:
+        """Sorteia o tick do próximo movimento: rest ticks parado e depois move_chance por tick."""
+        if self.move_chance <= 0:
+            self.due[npc] = NOWHERE
+            return
+        due = self.tick_count + rest + self._wait()
+        self.due[npc] = due
+        self.agenda.setdefault(due, []).append(npc)
+
+    def _wait(self) -> int:
+        """Ticks até o primeiro sucesso de move_chance (distribuição geométrica, por inversão)."""
+        return 1 + int(math.log(1.0 - self._rng.random()) * self._wait_scale())
+
+    def _wait_scale(self) -> float:
+        """Fator de _wait() para o laço de tick(): 0 quando todo tick é um sucesso."""
+        return 0.0 if self.move_chance >= 1 else 1.0 / math.log(1.0 - self.move_chance)
+
+    def tick(self) -> int:
+        """Avança um tick e retorna quantos NPCs mudaram de lugar."""
+        self.tick_count += 1
+        tick = self.tick_count
+        movers = self.agenda.pop(tick, ())
+        if not movers:
+            return 0
+        offsets, targets, overflow = self.graph.offsets, self.graph.targets, self.graph.overflow
+        location, origin, due, buckets, agenda = self.location, self.origin, self.due, self.buckets, self.agenda
+        # _wait() e randrange() em linha, sobre o mesmo gerador: o laço é o custo inteiro do tick
+        rand, log, scale = self._rng.random, math.log, self._wait_scale()
+        rest = tick + self.rest_ticks + 1
+        moved = 0
+        for npc in movers:
+            if due[npc] != tick:
+                # Remarcado ou removido por um recarregamento do mundo
+                continue
+            here = location[npc]
+            row, start, end = targets, offsets[here], offsets[here + 1]
+            if overflow and here in overflow:
+                # Linha trocada por um recarregamento (ver WorldGraph.update_many)
+                row = overflow[here]
+                start, end = 0, len(row)
+            if start < end:
+                there = row[start + int(rand() * (end - start))]
+                buckets[here].discard(npc)
+                bucket = buckets.get(there)
+                if bucket is None:
+                    bucket = buckets[there] = set()
+                bucket.add(npc)
+                origin[npc] = here
+                location[npc] = there
+                moved += 1
+            # Um lugar sem saída pode ganhar ligações num recarregamento, então o NPC continua na agenda
+            next_tick = due[npc] = rest + int(log(1.0 - rand()) * scale)
+            later = agenda.get(next_tick)
+            if later is None:
+                agenda[next_tick] = [npc]
+            else:
+                later.append(npc)
+        return moved
+
+    def catch_up(self, now: Optional[float] = None) -> int:
+        """Roda os ticks vencidos desde o último, um a cada interval segundos; retorna quantos rodou.
+
+        Depois de uma pausa longa, no máximo max_catch_up ticks rodam de uma vez e o resto é descartado.
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = int((now - self._last) / self.interval)
+        if elapsed <= 0:
+            return 0
+        self._last += elapsed * self.interval
+        ticks = min(elapsed, self.max_catch_up)
+        for _ in range(ticks):
+            self.tick()
+        return ticks
+
+    def npcs_at(self, place_name: str) -> List[str]:
+        """NPCs que estão no lugar segundo a simulação."""
+        position = self.graph.positions.get(place_name)
+        names = self.names
+        return [names[npc] for npc in self.buckets.get(position, ())]
+
+    def where(self, name: str) -> Optional[str]:
+        """Lugar atual do NPC segundo a simulação."""
+        position = self.location[self.npc_positions[name]]
+        return None if position == NOWHERE else self.graph.names[position]
+
+    def came_from(self, name: str) -> Optional[str]:
+        """Lugar de onde o NPC veio no último movimento (o atual, se ainda não se moveu)."""
+        position = self.origin[self.npc_positions[name]]
+        return None if position == NOWHERE else self.graph.names[position]
+
+    def refresh(self, npcs: Dict[str, Optional[str]]) -> None:
+        """Acompanha um recarregamento do mundo: NPC -> novo local (None quando removido).
+
+        NPCs alterados vão direto para o local do registro novo. As posições dos lugares não mudam com o
+        recarregamento (ver WorldGraph.update_many); lugares novos entram no fim.
+        """
+        positions = self.graph.positions
+        for name, location in npcs.items():
+            position = positions.get(location, NOWHERE)
+            npc = self.npc_positions.get(name)
+            if npc is None:
+                if position == NOWHERE:
+                    continue
+                npc = self.npc_positions[name] = len(self.names)
+                self.names.append(name)
+                self.location.append(NOWHERE)
+                self.origin.append(NOWHERE)
+                self.due.append(NOWHERE)
+            elif self.location[npc] != NOWHERE:
+                self.buckets[self.location[npc]].discard(npc)
+            self.location[npc] = self.origin[npc] = position
+            if position == NOWHERE:
+                self.due[npc] = NOWHERE
+            else:
+                self.buckets.setdefault(position, set()).add(npc)
+                self._schedule(npc, 0)
@@ -0,0 +1,39 @@
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+from game_engine import GameEngine  # noqa: E402
+from output_sink import BytesSink  # noqa: E402
+from world_template import WorldTemplate  # noqa: E402
+
+WORLD_PATH = os.path.join(SRC, "world.json")
+
+
+@pytest.fixture
+def world():
+    """Dados do world.json de exemplo, para os testes que alteram o mundo antes de recarregá-lo."""
+    with open(WORLD_PATH, encoding="utf8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def template(world):
+    """Template próprio do teste: recarregamentos não vazam para os demais."""
+    return WorldTemplate.from_world(copy.deepcopy(world))
+
+
+@pytest.fixture
+def new_engine(template):
+    """Cria sessões headless sobre o template do teste."""
+    def factory(name=None):
+        engine = GameEngine(template, sink=BytesSink())
+        if name is not None:
+            assert engine.start(name).ok
+        return engine
+    return factory
@@ -0,0 +1,59 @@
+import pytest
+
+from command_parser import CommandParser
+from game_engine import GameEngine
+
+
+@pytest.fixture
+def parser():
+    parser = CommandParser()
+    parser.register("ir", "ir", takes_argument=True)
+    parser.register("ir para", "ir_para", takes_argument=True)
+    parser.register("inventario", "inventario", aliases=("i", "inv"))
+    parser.register("pegar", "pegar", takes_argument=True)
+    parser.register("largar", "largar", takes_argument=True)
+    parser.register("olhar", "olhar", aliases=("l",))
+    return parser
+
+
+def parsed(parser, text):
+    command, argument = parser.parse(text)
+    return (command.name if command else None), argument
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("pegar Espada", ("pegar", "Espada")),
+    ("peg   Poção de Cura", ("pegar", "Poção de Cura")),
+    ("ir para Igreja", ("ir para", "Igreja")),
+    ("ir pa Caverna", ("ir para", "Caverna")),
+    ("ir Igreja", ("ir", "Igreja")),
+    ("i", ("inventario", "")),
+    ("inv", ("inventario", "")),
+])
+def test_longest_word_boundary_match_wins(parser, text, expected):
+    assert parsed(parser, text) == expected
+
+
+def test_ambiguous_and_unknown_prefixes_are_not_guessed(parser):
+    parser.register("pular", "pular")
+    # "p" leva a pegar e pular; "dançar" não leva a nada
+    assert parsed(parser, "p Espada") == (None, "p Espada")
+    assert parsed(parser, "dançar") == (None, "dançar")
+    # A abreviação precisa terminar em fim de palavra
+    assert parsed(parser, "pegarEspada") == (None, "pegarEspada")
+
+
+def test_unregister_and_alias_rebuild_the_table(parser):
+    parser.unregister("largar")
+    assert "largar" not in parser
+    assert parsed(parser, "largar Espada") == (None, "largar Espada")
+    parser.alias("examinar", "olhar")
+    assert parsed(parser, "exam") == ("olhar", "")
+
+
+def test_engine_table_accepts_the_documented_synonyms(new_engine):
+    engine = new_engine("Ana")
+    assert engine.step("inv").ok
+    assert engine.step("peg espada").changes == {"picked": "Espada"}
+    assert not engine.step("onde Espada").ok
+    assert GameEngine.commands.get("onde") is None
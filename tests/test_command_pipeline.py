@@ -0,0 +1,54 @@
+import io
+
+from command_result import STATUS_ERROR, STATUS_QUIT
+from game_engine import GameEngine
+from journal import JournaledSession, SessionJournal
+from output_sink import PlainTextSink
+
+
+def test_pipelined_commands_run_in_order_and_merge_their_changes(new_engine):
+    engine = new_engine("Ana")
+    result = engine.step("pegar Espada; ir para Igreja ;; pegar Chave;")
+    assert result.ok
+    assert result.changes == {"picked": "Chave", "moved_to": "Igreja"}
+    assert set(engine.player.inventory) == {"Espada", "Chave"}
+
+
+def test_the_first_failure_stops_the_line_and_reports_what_was_skipped(new_engine):
+    engine = new_engine("Ana")
+    result = engine.step("pegar Espada; pegar Dragão; ir para Igreja; olhar")
+    assert result.status == STATUS_ERROR and result.running
+    assert result.messages[-1] == "Comandos não executados: ir para Igreja; olhar."
+    assert engine.current_place.name == "Floresta"
+    assert "Espada" in engine.player.inventory
+
+
+def test_quitting_mid_line_skips_the_rest_without_a_report(new_engine):
+    engine = new_engine("Ana")
+    result = engine.step("pegar Espada; sair; ir para Igreja")
+    assert result.status == STATUS_QUIT
+    assert not any("não executados" in message for message in result.messages)
+    assert engine.current_place.name == "Floresta"
+
+
+def test_a_pipelined_line_is_rendered_as_one_turn(template):
+    stream = io.StringIO()
+    engine = GameEngine(template, sink=PlainTextSink(stream))
+    engine.start("Ana")
+    engine.sink.flush()
+    assert engine.process_command("ir para Igreja; ir para Floresta")
+    engine.sink.flush()
+    output = stream.getvalue()
+    assert output.index("Você foi para Igreja") < output.index("Você foi para Floresta")
+    # Cada descrição vem entre separadores, mas o que fica entre as duas não é repetido
+    assert output.count("=" * 60) == 3
+
+
+def test_a_pipelined_line_replays_from_the_journal(tmp_path, new_engine):
+    session, _ = JournaledSession.create(new_engine(), SessionJournal(str(tmp_path), "ana"), "Ana")
+    session.step("pegar Espada; ir para Igreja; pegar Chave")
+    session.close()
+    restored = JournaledSession.restore(new_engine(), SessionJournal(str(tmp_path), "ana"))
+    assert restored.engine.current_place.name == "Igreja"
+    assert set(restored.engine.player.inventory) == {"Espada", "Chave"}
+    restored.close()
@@ -0,0 +1,45 @@
+import io
+
+from command_result import EVENT_DIALOG, EVENT_ERROR, STATUS_ERROR, STATUS_QUIT
+from game_engine import GameEngine
+from output_sink import PlainTextSink
+
+
+def test_step_returns_results_without_writing_to_the_sink(template):
+    stream = io.StringIO()
+    engine = GameEngine(template, sink=PlainTextSink(stream))
+    assert engine.start("Ana").ok
+
+    result = engine.step("pegar Espada")
+    assert result.ok and result.changes == {"picked": "Espada"}
+    assert any("Espada" in message for message in result.messages)
+    assert engine.step("ir para Igreja").changes == {"moved_to": "Igreja"}
+    engine.sink.flush()
+    assert stream.getvalue() == ""
+
+
+def test_errors_and_quit_are_statuses_not_exceptions(new_engine):
+    engine = new_engine("Ana")
+    unknown = engine.step("dançar")
+    assert unknown.status == STATUS_ERROR and unknown.running
+    assert [event.kind for event in unknown.events] == [EVENT_ERROR]
+    assert engine.step("pegar Dragão").status == STATUS_ERROR
+    assert engine.step("sair").status == STATUS_QUIT
+
+
+def test_dialog_events_name_the_speaker(new_engine):
+    engine = new_engine("Ana")
+    npc = next(iter(engine.current_place.characters))
+    result = engine.step(f"falar com {npc}")
+    assert result.changes == {"talked_to": npc}
+    assert [event.speaker for event in result.events if event.kind == EVENT_DIALOG] == [npc]
+
+
+def test_process_command_renders_the_result_once_into_the_sink(template):
+    stream = io.StringIO()
+    engine = GameEngine(template, sink=PlainTextSink(stream))
+    engine.start("Ana")
+    assert engine.process_command("inventario")
+    engine.sink.flush()
+    assert "Seu inventário está vazio." in stream.getvalue()
+    assert not engine.process_command("sair")
@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from instrumentation import Histogram, Instrumentation, PeriodicDump, metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    """Liga as métricas globais do processo só durante o teste."""
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def test_commands_are_counted_per_verb_with_their_errors(enabled_metrics, new_engine):
+    engine = new_engine("Ana")
+    engine.process_command("pegar Espada")
+    engine.process_command("pegar Dragão")
+    engine.process_command("dançar")
+    operations = enabled_metrics.snapshot()["operations"]
+    assert operations["command.pegar"]["count"] == 2
+    assert operations["command.pegar"]["errors"] == 1
+    assert operations["command.desconhecido"]["errors"] == 1
+    assert operations["render.result"]["count"] == 3
+
+
+def test_disabled_instrumentation_records_nothing(new_engine):
+    metrics.reset()
+    assert not metrics.enabled
+    new_engine("Ana").process_command("olhar")
+    assert metrics.snapshot()["operations"] == {}
+
+
+def test_histogram_percentiles_stay_within_the_bucket_error():
+    histogram = Histogram()
+    for micros in range(1, 1001):
+        histogram.add(float(micros))
+    assert histogram.count == 1000 and histogram.minimum == 1 and histogram.maximum == 1000
+    assert 500 <= histogram.percentile(0.50) <= 550
+    assert 990 <= histogram.percentile(0.99) <= 1000
+    assert histogram.percentile(1.0) == 1000
+    assert Histogram().percentile(0.5) == 0.0
+
+
+def test_measure_marks_errors_and_dump_writes_json_and_text(tmp_path):
+    instrumentation = Instrumentation()
+    with instrumentation.measure("desligado"):
+        pass
+    instrumentation.enable()
+    with instrumentation.measure("ok"):
+        pass
+    with pytest.raises(ValueError):
+        with instrumentation.measure("falha"):
+            raise ValueError
+    assert "desligado" not in instrumentation.metrics
+    assert instrumentation.metrics["ok"].errors == 0
+    assert instrumentation.metrics["falha"].errors == 1
+
+    stream = io.StringIO()
+    instrumentation.dump(fmt="json", stream=stream)
+    assert set(json.loads(stream.getvalue())["operations"]) == {"falha", "ok"}
+    stream = io.StringIO()
+    instrumentation.dump(fmt="text", stream=stream)
+    lines = stream.getvalue().splitlines()
+    assert lines[0].startswith("operação") and len(lines) == 3
+
+    path = str(tmp_path / "metrics.json")
+    dump = PeriodicDump(instrumentation, interval=60.0, path=path)
+    dump.start()
+    dump.stop()
+    with open(path, encoding="utf8") as f:
+        assert json.load(f)["operations"]["ok"]["count"] == 1
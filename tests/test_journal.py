@@ -0,0 +1,50 @@
+from journal import JournaledSession, SessionJournal, fsync_all
+
+COMMANDS = ["pegar Espada", "usar Espada", "ir para Igreja", "pegar Chave", "ir para Passagem Secreta",
+            "pegar Pergaminho", "largar Chave"]
+
+
+def test_checkpoint_and_tail_replay_rebuild_the_same_state(tmp_path, new_engine):
+    journal = SessionJournal(str(tmp_path), "ana")
+    session, result = JournaledSession.create(new_engine(), journal, "Ana", checkpoint_every=3)
+    assert result.ok
+    for command in COMMANDS:
+        session.step(command)
+    session.close()
+    expected = session.engine.snapshot_state()
+
+    # Houve checkpoint depois do inicial, e a cauda ainda tem comandos a reexecutar
+    state, tail = SessionJournal(str(tmp_path), "ana").load()
+    assert state["player"]["inventory"] != []
+    assert tail
+
+    restored = JournaledSession.restore(new_engine(), SessionJournal(str(tmp_path), "ana"), checkpoint_every=3)
+    assert restored is not None
+    assert restored.engine.snapshot_state() == expected
+    restored.close()
+
+
+def test_restore_without_checkpoint_returns_none(tmp_path, new_engine):
+    assert JournaledSession.restore(new_engine(), SessionJournal(str(tmp_path), "ninguem")) is None
+
+
+def test_append_only_buffers_and_the_host_syncs(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr("journal.os.fsync", synced.append)
+    journal = SessionJournal(str(tmp_path), "ana", sync_every=2, sync_interval=3600)
+
+    journal.append("pegar Espada")
+    journal.append("usar Espada")
+    journal.append("ir para Igreja")
+    assert synced == []
+    assert journal.sync_due
+    # As entradas já estão no arquivo, mesmo sem fsync
+    assert SessionJournal(str(tmp_path), "ana").load()[1] == ["pegar Espada", "usar Espada", "ir para Igreja"]
+
+    descriptor = journal.detach_sync()
+    assert descriptor is not None and journal.pending == 0 and not journal.sync_due
+    monkeypatch.setattr("journal.os.fsync", lambda fd: synced.append("fsync"))
+    fsync_all([descriptor])
+    assert synced == ["fsync"]
+    assert journal.detach_sync() is None
+    journal.close()
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from game_engine import GameEngine
+from output_sink import BytesSink
+from world_generator import generate_world
+from world_template import WorldTemplate
+
+
+@pytest.fixture
+def big_world_path(tmp_path):
+    path = tmp_path / "big.json"
+    path.write_text(json.dumps(generate_world(places=200, items=400, npcs=40, seed=5), ensure_ascii=False),
+                    encoding="utf8")
+    return str(path)
+
+
+def test_only_visited_regions_are_materialized(big_world_path):
+    template = WorldTemplate.load_lazy(big_world_path, max_resident_places=4)
+    places = template.places
+    assert len(places) == 200
+    assert not places.cache
+    engine = GameEngine(template, sink=BytesSink())
+    assert engine.start("Ana").ok
+    assert len(places.cache) <= 4
+    # Os itens e NPCs materializados são os das regiões residentes
+    assert len(template.items.cache) < 400
+
+
+def test_evicted_regions_come_back_identical_and_session_changes_survive(big_world_path):
+    template = WorldTemplate.load_lazy(big_world_path, max_resident_places=2)
+    engine = GameEngine(template, sink=BytesSink())
+    engine.start("Ana")
+    start = engine.current_place.name
+    description = template.places[start].get_full_description()
+    # O gerador sempre põe uma arma pegável no lugar inicial
+    item = "Espada 0"
+    assert engine.step(f"pegar {item}").ok
+
+    for _ in range(30):
+        engine.step(f"ir para {engine.current_place.takes_to[-1]}")
+    assert template.places.evictions > 0
+    assert len(template.places.cache) <= 2
+
+    assert template.places[start].get_full_description() == description
+    assert item in engine.player.inventory
+    assert item not in engine.place_object_dict[start].items
@@ -0,0 +1,35 @@
+import pytest
+
+from memory_report import FACTORIES, measure, measure_session
+
+# Bytes por objeto medidos com memory_report.report() no CPython 3.11 (64 bits)
+MEASURED = {
+    "GameObject": 48,
+    "Item": 88,
+    "Weapon": 96,
+    "Armor": 96,
+    "Key": 88,
+    "Potion": 96,
+    "QuestItem": 88,
+    "Character": 136,
+    "Player": 312,
+    "NPC": 152,
+    "Place": 328,
+}
+
+# Folga sobre o medido: três ponteiros. Cobre uma mudança no cabeçalho do objeto ou do GC numa versão de
+# correção do Python, que não mexe no layout dos slots; perder os __slots__ (um __dict__ por instância, uns
+# 40 bytes a mais já com dois atributos) ou ganhar vários campos novos ainda passa do limite
+TOLERANCE = 24
+
+
+@pytest.mark.parametrize("name", sorted(FACTORIES))
+def test_objects_stay_within_their_budget(name):
+    size = measure(FACTORIES[name], 2000)
+    assert size <= MEASURED[name] + TOLERANCE, f"{name}: {size:.1f} bytes/objeto (medido {MEASURED[name]})"
+
+
+def test_session_costs_are_measured_on_the_template(template):
+    costs = measure_session(template, count=20)
+    assert set(costs) == {"session", "place_copy", "item_copy", "npc_copy"}
+    assert costs["session"] > costs["place_copy"] > 0
@@ -0,0 +1,65 @@
+from game_engine import GameEngine
+from item import Item
+from name_index import NameIndex, edit_distance, normalize_name
+from place import Place
+
+ARMORY = ["Espada Enferrujada", "Espada Longa", "Escudo de Madeira", "Elmo de Ferro", "Poção de Cura", "Chave"]
+
+
+def test_edit_distance_counts_transpositions_and_caps_at_the_limit():
+    assert edit_distance("chave", "chave", 1) == 0
+    assert edit_distance("chave", "cahve", 2) == 1
+    assert edit_distance("chave", "chaves", 2) == 1
+    assert edit_distance("chave", "xhavr", 2) == 2
+    assert edit_distance("chave", "espada", 2) == 3
+    assert edit_distance("elmo", "elmo de ferro", 3) == 4
+
+
+def test_typos_and_partial_names_resolve_when_unambiguous():
+    index = NameIndex(ARMORY)
+    assert index.resolve("cahve") == "Chave"
+    assert index.resolve("pocao de crua") == "Poção de Cura"
+    assert index.resolve("esc") == "Escudo de Madeira"
+    assert index.resolve("esp enf") == "Espada Enferrujada"
+    assert index.resolve("elmo") == "Elmo de Ferro"
+
+
+def test_ambiguous_queries_do_not_resolve_but_suggest():
+    index = NameIndex(ARMORY)
+    assert index.resolve("espada") is None
+    assert sorted(index.suggestions("espada")) == ["Espada Enferrujada", "Espada Longa"]
+    assert index.suggestions("espada", limit=1) == ["Espada Longa"]
+    assert index.resolve("dragao") is None and index.suggestions("dragao") == []
+    assert index.resolve("e") is None
+
+
+def test_grams_follow_adds_and_removes_after_the_first_fuzzy_lookup():
+    index = NameIndex(ARMORY)
+    assert index.resolve("cahve") == "Chave"
+    index.remove("Chave")
+    assert index.resolve("cahve") is None
+    index.add("Cajado")
+    assert index.resolve("cajdo") == "Cajado"
+    index.add("Chave")
+    assert index.resolve("cahve") == "Chave"
+    # Remover um nome com outra grafia não apaga o original
+    index.remove("CHAVE")
+    assert index.get("chave") == "Chave"
+    copy = index.copy()
+    copy.remove("Chave")
+    assert copy.resolve("cahve") is None and index.resolve("cahve") == "Chave"
+
+
+def test_normalize_name_strips_accents_case_and_spacing():
+    assert normalize_name("  Poção   DE cura ") == "pocao de cura"
+
+
+def test_the_engine_resolves_typos_and_lists_suggestions(new_engine):
+    engine = new_engine("Ana")
+    assert engine.step("pegar espda").changes == {"picked": "Espada"}
+    assert engine.step("ir para igrja").changes == {"moved_to": "Igreja"}
+    place = Place("Arsenal", "Armas.", [])
+    for name in ARMORY[:2]:
+        place.add_item(Item(name, "Uma espada.", "Arsenal", True, "weapon"))
+    message = GameEngine._not_found("Não há espada aqui.", place.suggest_items("espada"))
+    assert message == "Não há espada aqui. Você quis dizer: Espada Longa ou Espada Enferrujada?"
@@ -0,0 +1,45 @@
+import io
+
+from output_sink import BytesSink, PlainTextSink
+
+
+class CountingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+def test_a_turn_is_sent_in_a_single_write(new_engine):
+    stream = CountingStream()
+    engine = new_engine("Ana")
+    engine.sink = PlainTextSink(stream)
+    engine.process_command("olhar")
+    engine.display_available_actions()
+    assert stream.writes == 0
+    pending = engine.sink.getvalue()
+    engine.sink.flush()
+    assert stream.writes == 1
+    assert stream.getvalue() == pending
+    engine.sink.flush()
+    assert stream.writes == 1
+
+
+def test_bytes_sink_encodes_crlf_and_drains():
+    sink = BytesSink()
+    sink.write("Olá")
+    sink.write("> ", end="")
+    assert sink.drain() == "Olá\r\n> ".encode("utf8")
+    assert sink.drain() == b""
+
+
+def test_plain_sink_has_no_escape_codes(new_engine):
+    stream = io.StringIO()
+    engine = new_engine("Ana")
+    engine.sink = PlainTextSink(stream)
+    engine.process_command("pegar Dragão")
+    engine.sink.flush()
+    assert stream.getvalue() == ">>> Não há dragão aqui.\n"
@@ -0,0 +1,48 @@
+from character import NPC, Player
+from item import Item, Potion
+from place import Place
+
+
+def make_place():
+    place = Place("Taverna", "Uma taverna.", ["Centro da cidade"])
+    place.add_item(Potion("Poção de Cura", "Cura.", "Taverna", True, 20))
+    place.add_character(NPC("Taverneiro", "Um homem.", "Taverna", ["Olá!"]))
+    return place
+
+
+def test_place_lookups_ignore_case_and_accents():
+    place = make_place()
+    assert place.find_item("POCAO DE CURA") == "Poção de Cura"
+    assert place.find_character("taverneiro") == "Taverneiro"
+    assert place.find_destination("centro da cidade") == "Centro da cidade"
+
+
+def test_place_indexes_follow_adds_and_removes():
+    place = make_place()
+    assert place.find_item("poção de cura")
+    place.remove_item("Poção de Cura")
+    assert place.find_item("poção de cura") is None
+    place.add_item(Item("Caneca", "Vazia.", "Taverna", True, "generic"))
+    assert place.find_item("caneca") == "Caneca"
+    place.remove_character("Taverneiro")
+    assert place.find_character("taverneiro") is None
+
+
+def test_clones_keep_their_own_indexes():
+    place = make_place()
+    assert place.find_item("pocao de cura")
+    copy = place.clone()
+    copy.remove_item("Poção de Cura")
+    assert copy.find_item("pocao de cura") is None
+    assert place.find_item("pocao de cura") == "Poção de Cura"
+
+
+def test_player_inventory_index_tracks_pick_up_and_drop():
+    player = Player("Ana")
+    potion = Potion("Poção de Cura", "Cura.", "Taverna", True, 20)
+    player.pick_up_item(potion)
+    assert player.find_item("POÇÃO de cura") == "Poção de Cura"
+    copy = player.clone()
+    player.drop_item("Poção de Cura")
+    assert player.find_item("poção de cura") is None
+    assert copy.find_item("poção de cura") == "Poção de Cura"
@@ -0,0 +1,40 @@
+def test_place_description_is_reused_until_the_place_changes(template):
+    place = template.places["Floresta"]
+    description = place.get_full_description()
+    assert place.get_full_description() is description
+
+    copy = place.clone()
+    copy.remove_item("Espada")
+    assert "Espada" not in copy.get_full_description()
+    assert place.get_full_description() is description
+
+
+def test_actions_text_is_rebuilt_only_after_a_change(new_engine):
+    engine = new_engine("Ana")
+    text = engine.render_available_actions()
+    assert engine.render_available_actions() is text
+    engine.step("olhar")
+    assert engine.render_available_actions() is text
+
+    engine.step("pegar Espada")
+    changed = engine.render_available_actions()
+    assert changed is not text
+    assert "usar Espada" in changed and "pegar Espada" not in changed
+    engine.step("ir para Igreja")
+    assert "pegar Chave" in engine.render_available_actions()
+
+
+def test_inventory_and_status_follow_the_player(new_engine):
+    engine = new_engine("Ana")
+    player = engine.player
+    assert player.show_inventory() == "Seu inventário está vazio."
+    engine.step("pegar Espada")
+    inventory = player.show_inventory()
+    assert "Espada" in inventory and player.show_inventory() is inventory
+
+    status = player.get_status()
+    assert player.get_status() is status
+    engine.step("usar Espada")
+    assert "Arma equipada: Espada" in player.get_status()
+    player.health -= 10
+    assert f"Vida: {player.health}/" in player.get_status()
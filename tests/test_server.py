@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+from game_engine import GameEngine
+from journal import SessionJournal, journal_key
+from output_sink import BytesSink
+from server import GameServer, SessionProtocol
+
+
+def new_protocol(template, journal_dir):
+    return SessionProtocol(GameEngine(template, sink=BytesSink()), journal_dir=journal_dir)
+
+
+def test_first_name_defers_the_checkpoint_and_a_second_login_replays_the_journal(template, tmp_path):
+    journal_dir = str(tmp_path)
+    protocol = new_protocol(template, journal_dir)
+    protocol.prefetch("Ana")
+    assert protocol.feed("Ana")
+    # O checkpoint inicial só é gravado por write_checkpoint(), que o servidor roda fora do loop
+    assert protocol.checkpoint_pending
+    assert not os.path.exists(SessionJournal(journal_dir, journal_key("Ana")).checkpoint_path)
+    protocol.write_checkpoint()
+    assert not protocol.checkpoint_pending
+    protocol.feed("pegar Espada")
+    protocol.feed("ir para Igreja")
+    protocol.close()
+
+    again = new_protocol(template, journal_dir)
+    again.prefetch("Ana")
+    assert again.feed("Ana")
+    assert not again.checkpoint_pending
+    assert "Bem-vindo de volta, Ana!" in again.sink.drain().decode("utf8")
+    assert again.engine.current_place.name == "Igreja"
+    assert "Espada" in again.engine.player.inventory
+    again.close()
+
+
+def test_a_command_before_write_checkpoint_writes_it_first(template, tmp_path):
+    protocol = new_protocol(template, str(tmp_path))
+    protocol.feed("Ana")
+    protocol.feed("pegar Espada")
+    assert not protocol.checkpoint_pending
+    state, tail = SessionJournal(str(tmp_path), journal_key("Ana")).load()
+    assert state["player"]["name"] == "Ana" and tail == ["pegar Espada"]
+    protocol.close()
+
+
+async def _play(server, lines):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    await reader.readuntil(b": ")
+    for line in lines:
+        writer.write(line.encode("utf8") + b"\n")
+        await writer.drain()
+        await reader.readuntil(b"fazer? ")
+    writer.close()
+    await writer.wait_closed()
+
+
+def test_server_builds_sessions_and_ticks_the_clock_on_its_own_template(template, tmp_path):
+    server = GameServer(port=0, journal_dir=str(tmp_path), tick_interval=0.001, template=template)
+    before = template.scheduler.tick_count
+
+    async def scenario():
+        await server.start()
+        await _play(server, ["Ana", "pegar Espada"])
+        await asyncio.sleep(0.02)
+        await server.close()
+
+    asyncio.run(scenario())
+    assert server.world_template is template
+    assert template.scheduler.tick_count > before
+    state, tail = SessionJournal(str(tmp_path), journal_key("Ana")).load()
+    assert state is not None and tail == ["pegar Espada"]
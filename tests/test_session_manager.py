@@ -0,0 +1,102 @@
+import asyncio
+import functools
+import threading
+
+from game_engine import GameEngine
+from journal import SessionJournal, journal_key
+from session_manager import ManagedGameServer, SessionManager
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_manager(tmp_path, template, **options):
+    clock = Clock()
+    factory = functools.partial(GameEngine, template)
+    return SessionManager(str(tmp_path / "sessions"), factory, idle_after=0, clock=clock, **options), clock
+
+
+def play(manager, clock, key, name, *commands):
+    protocol = manager.open(key)
+    protocol.feed(name)
+    for command in commands:
+        protocol.feed(command)
+    manager.touch(key)
+    clock.now += 1
+    return protocol.engine.snapshot_state()
+
+
+def test_evict_and_rehydrate_give_the_same_state(tmp_path, template):
+    manager, clock = make_manager(tmp_path, template, max_resident=1)
+    expected = {
+        0: play(manager, clock, 0, "Ana", "pegar Espada", "ir para Igreja"),
+        1: play(manager, clock, 1, "Bia", "ir para Centro da cidade"),
+        2: play(manager, clock, 2, "Caio", "ir para Caverna", "pegar Mapa Antigo"),
+    }
+    assert manager.resident_count == 1
+    assert manager.evicted_count == 2
+
+    assert manager.get(0).engine.snapshot_state() == expected[0]
+    manager.flush()
+    # Gravada em disco: a leitura vai para o executor
+    protocol = asyncio.run(manager.get_async(1))
+    assert protocol.engine.snapshot_state() == expected[1]
+    assert protocol.feed("olhar")
+
+    for key in expected:
+        manager.close(key)
+    assert len(manager) == 0
+    manager.shutdown()
+    assert not list((tmp_path / "sessions").iterdir())
+
+
+def test_memory_budget_uses_measured_costs(tmp_path, template):
+    manager, clock = make_manager(tmp_path, template, max_resident=None, max_memory=1)
+    play(manager, clock, 0, "Ana", "pegar Espada")
+    play(manager, clock, 1, "Bia")
+    assert manager.costs["session"] > 0
+    assert manager.costs["place_copy"] > 0
+    assert manager.evicted_count >= 1
+    manager.shutdown()
+
+
+def test_rehydrate_waits_for_the_journal_close_of_the_eviction(tmp_path, template):
+    journal_dir = str(tmp_path / "journals")
+    manager, clock = make_manager(tmp_path, template, max_resident=1, journal_dir=journal_dir)
+    play(manager, clock, 0, "Ana", "pegar Espada")
+    # A gravação do despejo de Ana fica na fila atrás de gate
+    gate = threading.Event()
+    manager._writer.submit(gate.wait)
+    play(manager, clock, 1, "Bia")
+    assert manager.evicted_count == 1
+
+    async def rehydrate():
+        asyncio.get_running_loop().call_later(0.01, gate.set)
+        return await manager.get_async(0)
+
+    protocol = asyncio.run(rehydrate())
+    assert gate.is_set()
+    assert not protocol.checkpoint_pending
+    protocol.feed("ir para Igreja")
+    state, tail = SessionJournal(journal_dir, journal_key("Ana")).load()
+    assert state["player"]["inventory"] == ["Espada"]
+    assert tail == ["ir para Igreja"]
+    manager.shutdown()
+
+
+def test_managed_server_calibrates_before_listening(tmp_path, template):
+    manager, _ = make_manager(tmp_path, template)
+    server = ManagedGameServer(port=0, manager=manager, template=template)
+
+    async def scenario():
+        await server.start()
+        await server.close()
+
+    asyncio.run(scenario())
+    assert manager.costs["session"] > 0
+    manager.shutdown()
@@ -0,0 +1,43 @@
+from session_store import SessionStore
+
+
+def test_save_flush_load_round_trip(tmp_path, new_engine):
+    path = str(tmp_path / "contas.db")
+    engine = new_engine("Ana")
+    for command in ("pegar Espada", "usar Espada", "ir para Igreja", "pegar Chave"):
+        engine.step(command)
+    state = engine.snapshot_state()
+
+    store = SessionStore(path, flush_interval=60)
+    store.save("Ana", state)
+    # Antes da gravação, o estado pendente já é o que load() retorna
+    assert store.load("Ana") == state
+    assert store.flush() == 1
+    store.close()
+
+    store = SessionStore(path, flush_interval=60)
+    try:
+        assert store.load("Ana") == state
+        assert store.load("Bia") is None
+        restored = new_engine()
+        restored.restore_state(store.load("Ana"))
+        assert restored.snapshot_state() == state
+    finally:
+        store.close()
+
+
+def test_flush_coalesces_saves_and_applies_deletes(tmp_path, new_engine):
+    store = SessionStore(str(tmp_path / "contas.db"), flush_interval=60)
+    try:
+        engine = new_engine("Ana")
+        store.save("Ana", engine.snapshot_state())
+        engine.step("pegar Espada")
+        store.save("Ana", engine.snapshot_state())
+        assert store.flush() == 1
+        assert store.load("Ana")["player"]["inventory"] == ["Espada"]
+
+        store.delete("Ana")
+        store.flush()
+        assert store.load("Ana") is None
+    finally:
+        store.close()
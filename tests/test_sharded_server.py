@@ -0,0 +1,45 @@
+import asyncio
+
+from conftest import WORLD_PATH
+from sharded_server import ShardedGameServer
+
+PROMPT = b"fazer? "
+
+
+async def _send(reader, writer, line, until=PROMPT):
+    writer.write(line.encode("utf8") + b"\n")
+    await writer.drain()
+    return (await asyncio.wait_for(reader.readuntil(until), 10)).decode("utf8")
+
+
+def test_sessions_of_a_crashed_worker_are_reopened_with_a_notice():
+    server = ShardedGameServer(port=0, workers=1, world_path=WORLD_PATH, health_interval=3600)
+
+    async def scenario():
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            await asyncio.wait_for(reader.readuntil(b": "), 10)
+            await _send(reader, writer, "Ana")
+            await _send(reader, writer, "pegar Espada")
+            session = next(iter(server.sessions.values()))
+            assert session.commands == 1
+
+            server.workers[0].process.kill()
+            await server.restart_worker(0, graceful=False)
+            notice = (await asyncio.wait_for(reader.readuntil(b": "), 10)).decode("utf8")
+            assert "reiniciou" in notice
+            assert "Digite seu nome" in notice
+
+            output = await _send(reader, writer, "Ana")
+            assert "Floresta" in output
+            assert session.commands == 1
+            output = await _send(reader, writer, "inventario")
+            assert "Seu inventário está vazio." in output
+            assert session.commands == 2
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
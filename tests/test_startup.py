@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SRC
+
+RUNS = 5
+
+# Módulos que importar game_engine não pode carregar: cada um só é necessário em um uso específico
+# (terminal colorido, dataclasses/inspect, medição de memória, simulação, snapshot, servidores e ferramentas)
+FORBIDDEN = ("colorama", "argparse", "tracemalloc", "dataclasses", "inspect", "asyncio", "sqlite3",
+             "multiprocessing", "zlib", "threading", "random", "mmap")
+
+# Limites em milissegundos, com bytecode já compilado. O medido numa máquina de desenvolvimento é cerca de
+# metade disso (importação ~35 ms, motor iniciado ~55 ms): a folga absorve máquinas de CI mais lentas e o
+# ruído de processos novos, e uma regressão que reimporte dataclasses, json ou o world_snapshot ainda passa dela
+BUDGETS = {
+    "import": 60.0,
+    "engine": 120.0,
+}
+
+# Importa o motor, carrega o mundo e inicia uma sessão sem terminal; imprime os tempos e os módulos carregados
+ENGINE_SCRIPT = """
+import time
+started = time.perf_counter()
+import game_engine
+imported = time.perf_counter()
+import sys
+modules = sorted(sys.modules)
+import io
+from output_sink import PlainTextSink
+engine = game_engine.GameEngine(sink=PlainTextSink(io.StringIO()))
+result = engine.start("Jogador")
+elapsed = time.perf_counter() - started
+import json
+print(json.dumps({"ok": result.ok, "import": imported - started, "engine": elapsed, "modules": modules}))
+"""
+
+
+@pytest.fixture(scope="module")
+def samples(tmp_path_factory):
+    """Medições em processos novos, com o bytecode num diretório temporário (fora da árvore do projeto)."""
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=str(tmp_path_factory.mktemp("pycache")))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    def run():
+        output = subprocess.run([sys.executable, "-c", ENGINE_SCRIPT], capture_output=True, text=True, check=True,
+                                cwd=SRC, env=env).stdout
+        return json.loads(output)
+
+    # A primeira execução compila o bytecode, como numa instalação
+    run()
+    return [run() for _ in range(RUNS)]
+
+
+def test_engine_starts(samples):
+    assert all(sample["ok"] for sample in samples)
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS))
+def test_startup_within_budget(samples, name):
+    # O menor tempo descarta o ruído de escalonamento
+    best = min(sample[name] for sample in samples) * 1000
+    assert best <= BUDGETS[name], f"{name}: {best:.1f} ms (limite {BUDGETS[name]:.0f} ms)"
+
+
+def test_import_does_not_load_forbidden_modules(samples):
+    loaded = set(samples[0]["modules"])
+    assert [name for name in FORBIDDEN if name in loaded] == []
@@ -0,0 +1,42 @@
+import sys
+
+from command_result import CommandResult, EVENT_DIALOG, EVENT_ERROR, EVENT_SEPARATOR, GameEvent
+from output_sink import BytesSink
+from text_formatter import PlainTextFormatter, TextFormatter
+
+
+def render(formatter):
+    result = CommandResult("olhar")
+    result.emit(EVENT_SEPARATOR)
+    result.emit(EVENT_ERROR, "Nada aqui.")
+    result.emit(EVENT_DIALOG, "Olá!", speaker="Padre")
+    sink = BytesSink(formatter)
+    sink.write_result(result)
+    return sink.drain().decode("utf8")
+
+
+def test_colored_formatter_renders_through_bytes_sink():
+    text = render(TextFormatter())
+    assert "\x1b[31m>>> Nada aqui." in text
+    assert ">>> Padre: Olá!" in text
+
+
+def test_plain_formatter_has_no_escape_codes():
+    text = render(PlainTextFormatter())
+    assert "\x1b" not in text
+    assert ">>> Nada aqui." in text
+
+
+def test_colored_formatter_does_not_wrap_stdout():
+    stdout = sys.stdout
+    TextFormatter().format_separator()
+    assert sys.stdout is stdout
+
+
+def test_command_result_equality_and_repr():
+    result = CommandResult("pegar Espada")
+    result.emit("success", "Você pegou Espada.")
+    assert result == CommandResult("pegar Espada", events=[GameEvent("success", "Você pegou Espada.")])
+    assert result != CommandResult("pegar Espada")
+    assert "GameEvent(kind='success'" in repr(result)
+    assert result.ok and result.running and result.messages == ["Você pegou Espada."]
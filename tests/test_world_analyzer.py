@@ -0,0 +1,62 @@
+from array import array
+
+from world_analyzer import _components, analyze
+from world_generator import generate_world
+from world_graph import WorldGraph
+
+
+def place(name, *takes_to):
+    return {"name": name, "description": "", "takes_to": list(takes_to)}
+
+
+def test_example_world_has_no_errors(world):
+    report = analyze(world)
+    assert report.errors == []
+    assert report.place_count == len(world["locations"])
+    assert report.component_count >= 1
+
+
+def test_broken_references_unreachable_places_and_traps_are_reported():
+    world = {
+        "locations": [
+            place("Floresta", "Vila", "Poço"), place("Vila", "Floresta", "Nada"), place("Poço"),
+            place("Ilha", "Floresta"), place("Vila", "Floresta"),
+        ],
+        "items": [{"name": "Pá", "location": "Lua"}],
+        "characters": [{"name": "Eco", "location": "Poço"}],
+    }
+    report = analyze(world)
+    assert report.duplicate_places == {"Vila": 2}
+    # A segunda 'Vila' substitui a primeira, como no carregamento
+    assert report.dangling_links == []
+    assert report.dangling_items == [("Pá", "Lua")]
+    assert report.unreachable == ["Ilha"]
+    assert report.dead_ends == ["Poço"]
+    assert report.traps == ["Poço"]
+    assert report.one_way_links == 2
+    assert len(report.errors) == 3 and len(report.warnings) == 2
+
+
+def test_missing_start_place_is_an_error():
+    report = analyze({"locations": [place("Vila")]})
+    assert report.missing_start
+    assert report.errors == ["Lugar inicial 'Floresta' não existe."]
+
+
+def test_strongly_connected_components():
+    # {a, b, c} em ciclo, d sozinho (só sai), {e, f} ida e volta
+    graph = WorldGraph.from_adjacency([
+        ("a", ["b"]), ("b", ["c"]), ("c", ["a", "e"]), ("d", ["a"]), ("e", ["f"]), ("f", ["e"]),
+    ])
+    reverse_offsets, reverse_targets = graph.transposed()
+    component = _components(len(graph), graph.offsets, graph.targets, reverse_offsets, reverse_targets)
+    assert isinstance(component, array)
+    assert component[0] == component[1] == component[2]
+    assert component[4] == component[5] != component[0]
+    assert len({component[3], component[0], component[4]}) == 3
+
+
+def test_generated_worlds_are_a_single_component():
+    report = analyze(generate_world(places=300, items=10, npcs=5, seed=2))
+    assert report.errors == [] and report.traps == []
+    assert report.component_count == 1 and report.largest_component == 300
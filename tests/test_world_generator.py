@@ -0,0 +1,23 @@
+from world_generator import GOAL_TYPES, generate_world
+from world_solver import WorldSolver
+from world_template import WorldTemplate
+
+
+def test_same_seed_gives_the_same_world():
+    assert generate_world(30, items=40, npcs=5, seed=7) == generate_world(30, items=40, npcs=5, seed=7)
+    assert generate_world(30, items=40, npcs=5, seed=7) != generate_world(30, items=40, npcs=5, seed=8)
+
+
+def test_only_decorative_items_can_be_unpickable():
+    items = generate_world(40, items=300, npcs=5, seed=1)["items"]
+    fixed = [item for item in items if not item["pickable"]]
+    assert fixed, "a semente deveria gerar algum item decorativo fixo"
+    assert all(item["type"] not in GOAL_TYPES for item in fixed)
+
+
+def test_solver_accepts_generated_worlds():
+    for seed in range(3):
+        report = WorldSolver(WorldTemplate.from_world(generate_world(60, items=120, npcs=10, seed=seed))).solve()
+        assert report.goals
+        assert report.errors == []
+        assert all(goal.reachable for goal in report.goals)
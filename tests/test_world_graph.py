@@ -0,0 +1,59 @@
+import pytest
+
+from world_graph import WorldGraph
+
+
+@pytest.fixture
+def graph():
+    # a <-> b -> c -> d, a -> e (sem volta), e "x" aponta para um lugar que não existe
+    return WorldGraph.from_adjacency([
+        ("a", ["b", "e"]), ("b", ["a", "c"]), ("c", ["d"]), ("d", ["c"]), ("e", ["x"]),
+    ])
+
+
+def test_csr_rows_drop_unknown_targets(graph):
+    assert graph.neighbors("a") == ["b", "e"]
+    assert graph.neighbors("e") == []
+    assert graph.edge_count == 6
+
+
+def test_shortest_paths_are_cached_until_the_graph_changes(graph):
+    assert graph.shortest_path("a", "d") == ["a", "b", "c", "d"]
+    assert graph.shortest_path("e", "a") is None
+    assert len(graph._paths) == 2
+    graph.update("a", ["c"])
+    assert not graph._paths
+    assert graph.shortest_path("a", "d") == ["a", "c", "d"]
+
+
+def test_updates_of_another_size_go_to_overflow_until_compact():
+    # Uma linha trocada entre muitas fica no transbordo, sem recompilar os arrays
+    graph = WorldGraph.from_adjacency([(f"p{i}", [f"p{(i + 1) % 40}"]) for i in range(40)])
+    graph.update("p0", ["p1", "p20"])
+    assert set(graph.overflow) == {0}
+    assert graph.shortest_path("p0", "p21") == ["p0", "p20", "p21"]
+    graph.update("novo", ["p0"])
+    assert graph.positions["novo"] == 40 and graph.shortest_path("novo", "p20") == ["novo", "p0", "p20"]
+    graph.compact()
+    assert not graph.overflow
+    assert graph.neighbors("p0") == ["p1", "p20"] and graph.neighbors("novo") == ["p0"]
+
+
+def test_reverse_bfs_finds_who_can_reach_a_place(graph):
+    start = graph.positions["a"]
+    forward = graph.bfs_tree(start)
+    backward = graph.bfs_tree(start, reverse=True)
+    names = graph.names
+    assert {names[p] for p, parent in enumerate(forward) if parent >= 0} == {"a", "b", "c", "d", "e"}
+    assert {names[p] for p, parent in enumerate(backward) if parent >= 0} == {"a", "b"}
+
+
+def test_travel_walks_the_shortest_route_in_one_turn(new_engine):
+    engine = new_engine("Ana")
+    result = engine.step("viajar para passagem secreta")
+    route = result.changes["route"]
+    assert route[0] == "Floresta" and route[-1] == "Passagem Secreta"
+    assert engine.current_place.name == "Passagem Secreta"
+    assert route == engine.world_overlay.template.graph.shortest_path("Floresta", "Passagem Secreta")
+    assert not engine.step("viajar para passagem secreta").ok
+    assert not engine.step("viajar para atlantida").ok
@@ -0,0 +1,26 @@
+def test_sessions_on_one_template_do_not_share_changes(template, new_engine):
+    ana, bia = new_engine("Ana"), new_engine("Bia")
+
+    assert ana.step("pegar Espada").ok
+
+    assert "Espada" in ana.player.inventory
+    assert "Espada" not in ana.current_place.items
+    # A outra sessão e o template continuam vendo a espada no lugar
+    assert "Espada" in bia.current_place.items
+    assert "Espada" in template.places["Floresta"].items
+    assert template.items["Espada"].location == "Floresta"
+    assert bia.step("pegar Espada").ok
+
+
+def test_copies_are_made_only_on_change(template, new_engine):
+    ana = new_engine("Ana")
+    overlay = ana.world_overlay
+    before = set(overlay.places.owned())
+
+    ana.step("olhar")
+    assert set(overlay.places.owned()) == before
+
+    ana.step("pegar Espada")
+    assert "Floresta" in overlay.places.owned()
+    assert overlay.places["Floresta"] is not template.places["Floresta"]
+    assert overlay.places["Igreja"] is template.places["Igreja"]
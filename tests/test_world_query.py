@@ -0,0 +1,72 @@
+import pytest
+
+from game_engine import GameEngine
+from output_sink import BytesSink
+from world_index import INVENTORY, WorldIndex
+from world_template import WorldTemplate
+
+
+@pytest.fixture
+def altar_template(world):
+    """O mundo de exemplo com um item fixo na Igreja, para os filtros de pegáveis."""
+    world["items"].append({"name": "Altar", "description": "Um altar de pedra.", "location": "Igreja",
+                           "pickable": False, "type": "generic"})
+    return WorldTemplate.from_world(world)
+
+
+def test_world_index_moves_entries_between_keys():
+    index = WorldIndex()
+    index.add_item("Chave", "key", "Igreja", True)
+    index.add_item("Chave", "key", "Caverna", False)
+    assert index.item_locations == {"Caverna": {"Chave"}}
+    assert index.pickable == set()
+    assert index.resolve_item("chav") == "Chave"
+    index.remove_item("Chave")
+    assert index.item_types == {} and index.item_locations == {}
+    assert index.resolve_item("chave") is None
+    index.add_npc("Bardo", "Taverna")
+    index.add_npc("Bardo", "Igreja")
+    assert index.npc_locations == {"Igreja": {"Bardo"}}
+
+
+def test_find_items_intersects_type_place_and_pickable(altar_template):
+    query = GameEngine(altar_template, sink=BytesSink()).query
+    assert query.find_items("quest_item") == ["Mapa Antigo", "Pergaminho"]
+    assert query.find_items(places=["Igreja"]) == ["Altar", "Chave"]
+    assert query.find_items(places=["Igreja"], pickable=True) == ["Chave"]
+    assert query.find_items(pickable=False) == ["Altar"]
+    assert query.find_items("key", ["Taverna"]) == []
+    region = query.region("Igreja", 1)
+    assert sorted(region) == ["Floresta", "Igreja", "Passagem Secreta"]
+    assert query.find_items("quest_item", region) == ["Pergaminho"]
+
+
+def test_session_moves_are_seen_by_its_own_queries_only(new_engine):
+    engine = new_engine("Ana")
+    other = new_engine("Bia")
+    engine.step("pegar Espada")
+    engine.step("ir para Igreja")
+    assert engine.query.locate_item("Espada") is INVENTORY
+    assert engine.query.items_at(INVENTORY) == {"Espada"}
+    engine.step("largar Espada")
+    assert engine.query.locate_item("Espada") == "Igreja"
+    assert engine.query.find_items("weapon", ["Igreja"]) == ["Espada"]
+    assert other.query.locate_item("Espada") == "Floresta"
+    assert other.query.find_items(places=["Igreja"]) == ["Chave"]
+
+
+def test_admin_commands_locate_and_filter(template):
+    engine = GameEngine(template, sink=BytesSink(), admin=True)
+    engine.start("Ana")
+    engine.step("pegar Espada")
+    assert engine.step("onde espada").messages == ["Espada está em: inventário."]
+    assert engine.step("onde sacerdote").messages == ["Sacerdote está em: Igreja."]
+    assert not engine.step("onde dragão").ok
+    found = "\n".join(engine.step("consultar tipo=quest_item lugar=igreja raio=1").messages)
+    assert "Itens encontrados: 1" in found and "- Passagem Secreta: Pergaminho" in found
+    assert engine.step("consultar cor=azul").messages == ["Filtro desconhecido: cor."]
+    assert not engine.step("consultar lugar=atlantida").ok
+    # Sessões comuns não conhecem os comandos de administração
+    player = GameEngine(template, sink=BytesSink())
+    player.start("Bia")
+    assert not player.step("onde espada").ok
@@ -0,0 +1,37 @@
+from world_reload import reload_world
+
+
+def test_reload_keeps_held_item_removed_from_the_world(template, world, new_engine):
+    ana = new_engine("Ana")
+    ana.step("pegar Espada")
+
+    world["items"] = [item for item in world["items"] if item["name"] != "Espada"]
+    reload_world(template, world)
+
+    assert "Espada" not in template.items
+    assert "Espada" in ana.player.inventory
+    assert ana.world_overlay.items["Espada"].name == "Espada"
+    assert ana.step("usar Espada").ok
+
+    # O item órfão sobrevive a snapshot e restauração
+    restored = new_engine()
+    restored.restore_state(ana.snapshot_state())
+    assert "Espada" in restored.player.inventory
+    assert "Espada" in restored.world_overlay.items
+
+
+def test_reload_keeps_session_copies_and_applies_template_changes(template, world, new_engine):
+    ana, bia = new_engine("Ana"), new_engine("Bia")
+    ana.step("pegar Espada")
+
+    for place in world["locations"]:
+        if place["name"] == "Floresta":
+            place["description"] = "Uma floresta recarregada."
+    reload_world(template, world)
+
+    for engine in (ana, bia):
+        assert engine.world_overlay.places["Floresta"].description == "Uma floresta recarregada."
+    # A cópia da sessão continua sem a espada; a outra sessão ainda a vê no lugar
+    assert "Espada" not in ana.world_overlay.places["Floresta"].items
+    assert "Espada" in bia.world_overlay.places["Floresta"].items
+    assert "Espada" in ana.player.inventory
@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+
+from game_engine import GameEngine
+from output_sink import BytesSink
+from world_snapshot import SnapshotError, WorldSnapshot, compile_file, compile_world, snapshot_path_for
+from world_template import WorldTemplate
+
+COMMANDS = ["pegar Espada", "ir para Igreja", "pegar Chave", "usar Chave", "ir para Passagem Secreta",
+            "pegar Pergaminho", "status", "inventario"]
+
+
+@pytest.fixture
+def world_file(tmp_path, world):
+    path = tmp_path / "world.json"
+    path.write_text(json.dumps(world, ensure_ascii=False), encoding="utf8")
+    return str(path)
+
+
+def test_records_survive_the_round_trip(world):
+    decoded = WorldSnapshot(compile_world(world)).to_world()
+    assert decoded["locations"] == world["locations"]
+    fields = ("name", "description", "location", "type", "pickable")
+    assert ([{key: item[key] for key in fields} for item in decoded["items"]]
+            == [{key: item.get(key, True) for key in fields} for item in world["items"]])
+    # Os NPCs são agrupados por lugar no snapshot
+    assert (sorted((npc["name"], npc["location"], npc["dialog"]) for npc in decoded["characters"])
+            == sorted((npc["name"], npc["location"], npc["dialog"]) for npc in world["characters"]))
+
+
+def test_compiled_template_plays_like_the_json_one(world_file, template):
+    compile_file(world_file)
+    compiled = WorldTemplate.load_compiled(world_file)
+    assert compiled is not None and compiled.snapshot is not None
+
+    outputs = []
+    for world in (template, compiled):
+        engine = GameEngine(world, sink=BytesSink())
+        engine.start("Ana")
+        outputs.append([engine.step(command).messages for command in COMMANDS])
+    assert outputs[0] == outputs[1]
+
+
+def test_a_changed_world_file_makes_the_snapshot_stale(world_file, world):
+    compile_file(world_file)
+    assert WorldSnapshot.open(snapshot_path_for(world_file)).is_fresh(world_file)
+
+    world["locations"][0]["description"] += "!"
+    with open(world_file, "w", encoding="utf8") as f:
+        json.dump(world, f, ensure_ascii=False)
+    assert not WorldSnapshot.open(snapshot_path_for(world_file)).is_fresh(world_file)
+    assert WorldTemplate.load_compiled(world_file) is None
+
+
+def test_touching_the_file_without_changing_it_keeps_the_snapshot_fresh(world_file):
+    compile_file(world_file)
+    stat = os.stat(world_file)
+    os.utime(world_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert WorldSnapshot.open(snapshot_path_for(world_file)).is_fresh(world_file)
+
+
+@pytest.mark.parametrize("data", [b"", b"x" * 64])
+def test_garbage_is_rejected(data):
+    with pytest.raises(SnapshotError):
+        WorldSnapshot(data)
+
+
+def test_truncated_snapshot_is_rejected(world):
+    data = compile_world(world)
+    with pytest.raises(SnapshotError):
+        WorldSnapshot(data[:len(data) // 2])
@@ -0,0 +1,96 @@
+import pytest
+
+from world_solver import WorldSolver, replay
+from world_template import WorldTemplate
+
+
+def add_place(world, name, takes_to, reached_from=()):
+    world["locations"].append({"name": name, "description": f"{name}.", "takes_to": list(takes_to)})
+    for place in world["locations"]:
+        if place["name"] in reached_from:
+            place["takes_to"].append(name)
+
+
+def add_item(world, name, location, item_type="quest_item", pickable=True):
+    world["items"].append({"name": name, "description": f"{name}.", "location": location,
+                           "pickable": pickable, "type": item_type})
+
+
+@pytest.fixture
+def trap_template(world):
+    """Mundo de exemplo com um poço sem volta na Caverna, uma ilha sem acesso e uma estátua fixa."""
+    add_place(world, "Poço", [], reached_from=["Caverna"])
+    add_place(world, "Ilha", ["Floresta"])
+    add_item(world, "Tesouro", "Ilha")
+    add_item(world, "Estátua", "Taverna", pickable=False)
+    return WorldTemplate.from_world(world)
+
+
+@pytest.mark.parametrize("strategy", ["graph", "bfs", "iddfs"])
+def test_strategies_find_the_same_shortest_verified_plans(template, strategy):
+    report = WorldSolver(template, strategy=strategy).solve()
+    goals = {goal.name: goal for goal in report.goals}
+    assert sorted(goals) == ["Chave", "Mapa Antigo", "Pergaminho"]
+    assert report.errors == [] and report.warnings == []
+    assert goals["Chave"].plan == ["ir para Igreja", "pegar Chave", "usar Chave"]
+    assert goals["Pergaminho"].plan == ["ir para Igreja", "ir para Passagem Secreta", "pegar Pergaminho"]
+    assert all(goal.verified for goal in report.goals)
+
+
+def test_unreachable_and_unpickable_goals_are_errors(trap_template):
+    report = WorldSolver(trap_template).solve(["Tesouro", "Estátua", "Dragão"])
+    reasons = {goal.name: goal.reason for goal in report.goals}
+    assert reasons == {
+        "Tesouro": "'Ilha' não é alcançável a partir de 'Floresta'",
+        "Estátua": "o item não pode ser pego",
+        "Dragão": "o item não existe",
+    }
+    assert len(report.errors) == 3 and not any(goal.reachable for goal in report.goals)
+
+
+@pytest.mark.parametrize("strategy", ["graph", "bfs"])
+def test_places_without_a_way_back_are_dead_ends(trap_template, strategy):
+    report = WorldSolver(trap_template, strategy=strategy).solve(["Chave", "Pergaminho"])
+    assert report.dead_ends == {"Poço": ["Chave", "Pergaminho"]}
+    assert report.warnings == ["De 'Poço' não é mais possível cumprir: Chave, Pergaminho"]
+    assert report.errors == []
+
+
+def test_joint_mode_detects_goals_that_cannot_share_a_game(world):
+    add_place(world, "Poço", [], reached_from=["Caverna"])
+    add_place(world, "Torre", [], reached_from=["Taverna"])
+    add_item(world, "Ídolo", "Poço")
+    add_item(world, "Coroa", "Torre")
+    solver = WorldSolver(WorldTemplate.from_world(world))
+    separate = solver.solve(["Ídolo", "Coroa"])
+    assert all(goal.reachable for goal in separate.goals) and separate.all_goals_reachable is None
+
+    joint = solver.solve(["Ídolo", "Coroa"], joint=True)
+    assert all(goal.reachable and goal.verified for goal in joint.goals)
+    assert joint.all_goals_reachable is False
+    assert "Não há como cumprir todos os objetivos alcançáveis na mesma partida." in joint.errors
+
+
+def test_joint_mode_on_the_sample_world_fits_every_goal(template):
+    report = WorldSolver(template, strategy="bfs").solve(joint=True)
+    assert report.all_goals_reachable is True
+    assert report.states == report.goals[0].states > len(report.goals)
+
+
+def test_search_limits_truncate_instead_of_failing(template):
+    goal = WorldSolver(template, strategy="iddfs", max_depth=2).solve_goal("Pergaminho")
+    assert not goal.reachable and goal.truncated
+    report = WorldSolver(template, strategy="bfs", max_states=3).solve(["Pergaminho"])
+    assert report.errors == [] and report.warnings[0].startswith("Busca por 'Pergaminho' interrompida")
+
+
+def test_replay_checks_plans_in_the_engine(template):
+    assert replay(template, ["ir para Igreja", "pegar Chave", "usar Chave"], "Chave")
+    # Pegar a chave sem usá-la não cumpre o objetivo, e um comando inválido interrompe o plano
+    assert not replay(template, ["ir para Igreja", "pegar Chave"], "Chave")
+    assert not replay(template, ["ir para Passagem Secreta", "pegar Pergaminho"], "Pergaminho")
+
+
+def test_unknown_strategy_is_rejected(template):
+    with pytest.raises(ValueError):
+        WorldSolver(template, strategy="dfs")
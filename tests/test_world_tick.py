@@ -0,0 +1,102 @@
+from game_engine import GameEngine
+from output_sink import BytesSink
+from world_tick import NOWHERE, WorldScheduler
+
+
+def test_npcs_only_walk_along_takes_to_and_buckets_follow_them(template):
+    scheduler = WorldScheduler(template, seed=3, move_chance=0.5)
+    graph = template.graph
+    moved = 0
+    for _ in range(200):
+        moved += scheduler.tick()
+        for npc, position in enumerate(scheduler.location):
+            if position == NOWHERE:
+                continue
+            assert npc in scheduler.buckets[position]
+            origin = scheduler.origin[npc]
+            if origin != position:
+                assert graph.names[position] in template.places[graph.names[origin]].takes_to
+    assert moved > 0
+    assert sum(len(bucket) for bucket in scheduler.buckets.values()) == len(scheduler.npc_positions)
+
+
+def test_ticks_do_not_grow_the_session_overlays(template):
+    engine = GameEngine(template, sink=BytesSink(), simulate_npcs=True)
+    assert engine.start("Ana").ok
+    scheduler = template.scheduler
+    scheduler.move_chance = 1.0
+    overlay = engine.world_overlay
+    for _ in range(100):
+        scheduler.tick()
+        engine.step("olhar")
+        here = scheduler.npcs_at(engine.current_place.name)
+        actions = dict(engine.get_available_actions())
+        assert actions.get("PERSONAGENS COM QUEM VOCÊ PODE FALAR", []) == [f"falar com {name}" for name in sorted(here)]
+    assert not overlay.places.owned()
+    assert not overlay.npcs.owned()
+    assert engine.snapshot_state()["world"] == overlay.deltas()
+
+
+def test_the_player_sees_npcs_arrive_and_leave(template):
+    engine = GameEngine(template, sink=BytesSink(), simulate_npcs=True)
+    assert engine.start("Ana").ok
+    scheduler = template.scheduler
+    place = engine.current_place.name
+    before = set(scheduler.npcs_at(place))
+    while set(scheduler.npcs_at(place)) == before:
+        scheduler.tick()
+    after = set(scheduler.npcs_at(place))
+    texts = [event.text for event in engine.step("olhar").events]
+    for name in after - before:
+        assert any(text.startswith(f"{name} chegou") for text in texts)
+    for name in before - after:
+        assert f"{name} partiu para {scheduler.where(name)}." in texts
+    description = engine.step("olhar").events[1].text
+    for name in after:
+        assert f"- {name}:" in description
+
+
+def test_same_seed_same_walk_and_npcs_rest_after_moving(template):
+    first = WorldScheduler(template, seed=5, move_chance=1.0, rest_ticks=2)
+    second = WorldScheduler(template, seed=5, move_chance=1.0, rest_ticks=2)
+    last_move = {}
+    for tick in range(1, 31):
+        before = list(first.location)
+        first.tick()
+        second.tick()
+        assert first.location == second.location
+        for npc, position in enumerate(first.location):
+            if position != before[npc]:
+                # Depois de andar, o NPC fica rest_ticks ticks parado
+                assert npc not in last_move or tick - last_move[npc] > first.rest_ticks
+                last_move[npc] = tick
+    assert len(last_move) == len(first)
+
+
+def test_npcs_stay_put_without_move_chance(template):
+    scheduler = WorldScheduler(template, move_chance=0.0)
+    assert scheduler.agenda == {}
+    assert sum(scheduler.tick() for _ in range(50)) == 0
+    assert scheduler.where("Guerreiro") == scheduler.came_from("Guerreiro") == "Floresta"
+
+
+def test_catch_up_runs_elapsed_ticks_up_to_the_cap(template):
+    scheduler = WorldScheduler(template, interval=0.5, max_catch_up=4)
+    start = scheduler._last
+    assert scheduler.catch_up(start + 0.4) == 0
+    assert scheduler.catch_up(start + 1.0) == 2
+    assert scheduler.catch_up(start + 100.0) == 4
+    assert scheduler.tick_count == 6
+    # Os ticks descartados não se acumulam para a próxima chamada
+    assert scheduler.catch_up(start + 100.2) == 0
+
+
+def test_refresh_moves_adds_and_removes_npcs(template):
+    scheduler = WorldScheduler(template, move_chance=0.0)
+    scheduler.refresh({"Guerreiro": "Caverna", "Mago": "Igreja", "Bardo": None, "Fantasma": None})
+    assert scheduler.where("Guerreiro") == "Caverna"
+    assert "Guerreiro" not in scheduler.npcs_at("Floresta")
+    assert sorted(scheduler.npcs_at("Igreja")) == ["Mago", "Sacerdote"]
+    assert scheduler.where("Bardo") is None and scheduler.npcs_at("Taverna") == []
+    assert "Fantasma" not in scheduler.npc_positions
+    assert len(scheduler) == 5